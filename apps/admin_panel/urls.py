@@ -28,4 +28,7 @@ urlpatterns = [
     # Feedback management
     path('feedback/', views.admin_feedback, name='feedback'),
     path('feedback/<int:rating_id>/delete/', views.admin_delete_rating, name='delete_rating'),
+    
+    # Request profiling
+    path('profiling/', views.admin_profiling, name='profiling'),
 ]
@@ -2,6 +2,7 @@
 Views for the admin panel.
 """
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -17,6 +18,7 @@ from apps.users.models import CustomUser, UserRating
 from apps.learning_sessions.models import Session, Booking, SessionRequest
 from apps.payments.models import Payment, MentorPayout
 from apps.notifications.models import Notification
+from apps.core.search import site_search
 
 def admin_required(view_func):
     """
@@ -106,15 +108,13 @@ def admin_users(request):
         users = users.filter(is_active=False)
     
     if search:
-        users = users.filter(
-            Q(username__icontains=search) | 
-            Q(first_name__icontains=search) | 
-            Q(last_name__icontains=search) | 
-            Q(email__icontains=search)
-        )
+        # Best matches first
+        users = site_search.search(users, search, **({'role': role} if role else {}))
+    else:
+        users = users.order_by('-date_joined')
     
     # Paginate results
-    paginator = Paginator(users.order_by('-date_joined'), 20)
+    paginator = Paginator(users, 20)
     page_number = request.GET.get('page', 1)
     users_page = paginator.get_page(page_number)
     
@@ -467,3 +467,24 @@ def admin_mark_payout_complete(request, payout_id):
         return redirect('admin_panel:payments')
     
     return redirect('admin_panel:payments')
+
+@admin_required
+def admin_profiling(request):
+    """Slowest endpoints and N+1 offenders from the recent request profiles."""
+    from apps.core.profiling import profile_buffer
+    
+    if request.method == 'POST':
+        profile_buffer.clear()
+        messages.success(request, "Request profiles cleared.")
+        return redirect('admin_panel:profiling')
+    
+    context = {
+        'profile_count': len(profile_buffer.profiles()),
+        'slowest_endpoints': profile_buffer.slowest_endpoints(),
+        'n_plus_one_offenders': profile_buffer.n_plus_one_offenders(),
+        'sample_rate': getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0),
+        'profiling_header': getattr(settings, 'PROFILING_HEADER', 'X-Profile'),
+        'duplicate_threshold': profile_buffer.duplicate_threshold,
+    }
+    
+    return render(request, 'admin_dash/profiling.html', context)
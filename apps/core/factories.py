@@ -0,0 +1,155 @@
+"""
+Synthetic data for benchmarks.
+
+seed_dataset() bulk-creates a realistic platform: mentors with past and
+upcoming sessions, learners booking them, payments for paid bookings,
+pending session requests and notifications. Everything is created with
+bulk inserts so thousands of rows take seconds, then the mentor
+leaderboard is rebuilt as the periodic refresh would; call it inside a
+transaction that is rolled back afterwards.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+TOPICS = [
+    'python', 'django', 'javascript', 'react', 'machine learning', 'data science',
+    'sql', 'devops', 'system design', 'career', 'interviews', 'ui design',
+]
+
+
+@dataclass
+class Dataset:
+    """The users a benchmark acts as, and how much data was created."""
+    mentor: object
+    learner: object
+    admin: object
+    counts: dict
+
+
+def create_users(prefix, role, count, rng, **fields):
+    """Create `count` users with the given role and return them."""
+    User = get_user_model()
+    password = make_password(None)
+    User.objects.bulk_create([
+        User(
+            username=f'{prefix}_{role}_{i}',
+            email=f'{prefix}_{role}_{i}@example.com',
+            first_name=role.title(),
+            last_name=str(i),
+            role=role,
+            password=password,
+            interests=rng.sample(TOPICS, 3) if role == User.LEARNER else [],
+            expertise=rng.sample(TOPICS, 2) if role == User.MENTOR else [],
+            **fields
+        )
+        for i in range(count)
+    ], batch_size=500)
+    return list(User.objects.filter(username__startswith=f'{prefix}_{role}_').order_by('id'))
+
+
+def seed_dataset(mentors=2000, learners=5000, sessions_per_mentor=3, bookings_per_session=4,
+                 notifications_per_user=5, seed=0):
+    """
+    Create a synthetic platform and return a Dataset. The first mentor and
+    learner have the most activity and are the ones benchmarks log in as.
+    """
+    from apps.learning_sessions.models import Booking, Session, SessionRequest
+    from apps.notifications.models import Notification
+    from apps.payments.models import Payment
+    from apps.users.leaderboard import leaderboard
+
+    User = get_user_model()
+    rng = random.Random(seed)
+    prefix = f'bench_{uuid.uuid4().hex[:8]}'
+    now = timezone.now()
+
+    mentor_list = create_users(prefix, User.MENTOR, mentors, rng)
+    learner_list = create_users(prefix, User.LEARNER, learners, rng)
+    admin = create_users(prefix, User.ADMIN, 1, rng, is_staff=True)[0]
+
+    new_sessions = []
+    for mentor in mentor_list:
+        for i in range(sessions_per_mentor):
+            # Spread sessions from two weeks ago to two weeks ahead
+            schedule = now + timedelta(hours=rng.randint(-14 * 24, 14 * 24))
+            new_sessions.append(Session(
+                mentor=mentor,
+                title=f'Session {i} by {mentor.username}',
+                description='Synthetic session for benchmarks.',
+                topics=rng.sample(TOPICS, 2),
+                schedule=schedule,
+                status=Session.COMPLETED if schedule < now else Session.SCHEDULED,
+                price=rng.choice([Decimal('0'), Decimal('199'), Decimal('499')]),
+                max_participants=bookings_per_session + 1,
+            ))
+    Session.objects.bulk_create(new_sessions, batch_size=500)
+    sessions = list(Session.objects.filter(mentor__username__startswith=prefix).order_by('id'))
+
+    # The first learner books the first sessions of many mentors
+    bookings = []
+    for index, session in enumerate(sessions):
+        chosen = {learner_list[(index * bookings_per_session + j) % len(learner_list)] for j in range(bookings_per_session)}
+        if index % sessions_per_mentor == 0 and index < 50 * sessions_per_mentor:
+            chosen.add(learner_list[0])
+        status = Booking.COMPLETED if session.status == Session.COMPLETED else Booking.CONFIRMED
+        bookings.extend(Booking(session=session, learner=learner, status=status) for learner in chosen)
+    Booking.objects.bulk_create(bookings, batch_size=500)
+
+    paid = Booking.objects.filter(session__in=[s for s in sessions if s.price]).select_related('session')
+    Payment.objects.bulk_create([
+        Payment(
+            booking=booking,
+            amount=booking.session.price,
+            status=Payment.PAID,
+            mentor_share=booking.session.price * Decimal('0.8'),
+            platform_fee=booking.session.price * Decimal('0.2'),
+        )
+        for booking in paid
+    ], batch_size=500)
+
+    SessionRequest.objects.bulk_create([
+        SessionRequest(
+            learner=learner,
+            mentor=mentor_list[0] if i % 10 == 0 else rng.choice(mentor_list),
+            title=f'Help with {rng.choice(TOPICS)}',
+            description='Synthetic session request for benchmarks.',
+            proposed_time=now + timedelta(days=rng.randint(1, 14)),
+        )
+        for i, learner in enumerate(learner_list)
+    ], batch_size=500)
+
+    Notification.objects.bulk_create([
+        Notification(
+            user=user,
+            title=f'Notification {i}',
+            message=f'Synthetic notification {i}. Details follow.',
+            read=i % 3 != 0,
+        )
+        for user in [*mentor_list, *learner_list]
+        for i in range(notifications_per_user)
+    ], batch_size=1000)
+
+    # Bulk inserts send no signals, so rank the new mentors in one pass
+    leaderboard.refresh()
+
+    return Dataset(
+        mentor=mentor_list[0],
+        learner=learner_list[0],
+        admin=admin,
+        counts={
+            'mentors': len(mentor_list),
+            'learners': len(learner_list),
+            'sessions': len(sessions),
+            'bookings': len(bookings),
+            'payments': len(paid),
+            'session_requests': len(learner_list),
+            'notifications': (len(mentor_list) + len(learner_list)) * notifications_per_user,
+        }
+    )
@@ -0,0 +1,113 @@
+"""
+Structured logging that keeps log I/O off the event loop.
+
+LOGGING in settings sends every record to AsyncStreamHandler, which puts
+it on a bounded queue and returns. A QueueListener thread formats the
+records, as one JSON object per line with JsonFormatter, and writes them
+to the stream. A WebSocket consumer that logs therefore never waits on
+stdout, and records below the configured level are dropped by the logger
+before any message is built, as long as callers pass arguments
+(`logger.debug("Received %s", message_type)`) rather than f-strings.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# LogRecord attributes; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+# Arguments that can be formatted later because the caller cannot change them
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one line of JSON with its time, level, logger and
+    message, any fields passed with `extra`, and the traceback if any.
+    """
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exception'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
+
+
+class AsyncStreamHandler(QueueHandler):
+    """
+    Hands records to a background thread that formats them and writes them
+    to `stream` (stderr by default).
+
+    Unlike the stdlib QueueHandler, the message is merged with its
+    arguments in the background thread when every argument is immutable.
+    When the queue holds `queue_size` records, new ones are counted in
+    `dropped` and discarded rather than blocking the caller.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # dictConfig sets the formatter on this handler; the writer uses it
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def start(self):
+        """Start the writer thread, again in a forked worker that lost it."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.listener = QueueListener(self.queue, self.target)
+            self.listener.start()
+            self._pid = os.getpid()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Write out the queued records and stop the writer thread."""
+        with self._start_lock:
+            if self._pid == os.getpid() and self.listener is not None:
+                self.listener.stop()
+            self._pid = None
+
+    def prepare(self, record):
+        if record.args and not (isinstance(record.args, tuple)
+                                and all(isinstance(arg, _IMMUTABLE) for arg in record.args)):
+            # The caller may change these objects after the call returns
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,194 @@
+"""
+Command to hold the dashboard views to query-count and latency budgets.
+"""
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.template import TemplateDoesNotExist
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.core.factories import seed_dataset
+
+BASELINE_FILE = Path(__file__).resolve().parents[2] / 'dashboard_budgets.json'
+
+# (name, URL name, Dataset attribute of the user it is rendered for)
+VIEWS = [
+    ('learner_dashboard', 'users:learner_dashboard', 'learner'),
+    ('learner_activity_partial', 'users:learner_activity_partial', 'learner'),
+    ('mentor_dashboard', 'users:mentor_dashboard', 'mentor'),
+    ('mentor_sessions', 'users:mentor_sessions', 'mentor'),
+    ('admin_overview', 'admin_panel:overview', 'admin'),
+]
+
+
+class QueryTimer:
+    """Connection execute wrapper that counts queries and times them precisely."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class Command(BaseCommand):
+    """Render each dashboard view against a synthetic dataset and check it against the baseline."""
+
+    help = (
+        'Seeds a synthetic dataset, renders the dashboard views and fails if one exceeds '
+        'its query count or latency budget in dashboard_budgets.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mentors', type=int, default=2000, help='Mentors to create')
+        parser.add_argument('--learners', type=int, default=5000, help='Learners to create')
+        parser.add_argument('--sessions-per-mentor', type=int, default=3, help='Sessions per mentor')
+        parser.add_argument('--bookings-per-session', type=int, default=4, help='Bookings per session')
+        parser.add_argument('--notifications-per-user', type=int, default=5, help='Notifications per user')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Renders per view after a warm-up render; median times are reported',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(BASELINE_FILE),
+            help='JSON file with the per-view budgets',
+        )
+        parser.add_argument(
+            '--time-tolerance',
+            type=float,
+            default=1.0,
+            help='Fraction by which a view may exceed its baseline DB and total time',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write this run as the new baseline instead of checking against it',
+        )
+
+    def handle(self, *args, **options):
+        """Seed, measure and compare inside one rolled back transaction."""
+        with transaction.atomic():
+            started = time.perf_counter()
+            dataset = seed_dataset(
+                mentors=options['mentors'],
+                learners=options['learners'],
+                sessions_per_mentor=options['sessions_per_mentor'],
+                bookings_per_session=options['bookings_per_session'],
+                notifications_per_user=options['notifications_per_user'],
+            )
+            self.stdout.write(
+                f"Seeded {', '.join(f'{count} {name}' for name, count in dataset.counts.items())} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            results = self.measure(dataset, options['repeat'])
+            transaction.set_rollback(True)
+
+        baseline_file = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline_file.write_text(json.dumps({'dataset': dataset.counts, 'views': results}, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote baseline to {baseline_file}'))
+            return
+
+        if not baseline_file.exists():
+            raise CommandError(f'No baseline at {baseline_file}; run with --update-baseline first')
+        baseline = json.loads(baseline_file.read_text())
+        if baseline.get('dataset') != dataset.counts:
+            self.stdout.write(self.style.WARNING('The dataset differs from the baseline\'s; times are not comparable'))
+
+        failures = self.compare(results, baseline['views'], options['time_tolerance'])
+        if failures:
+            raise CommandError('Over budget:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All dashboard views are within budget'))
+
+    def measure(self, dataset, repeat):
+        """Render every view and return {name: {queries, db_ms, total_ms}}."""
+        self.stdout.write(f"{'view':>26} {'status':>11} {'queries':>8} {'db ms':>8} {'total ms':>9}")
+        # Render through the full middleware stack on the test client's host,
+        # without logging the missing admin templates as server errors
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                return self.measure_views(dataset, repeat)
+        finally:
+            request_logger.setLevel(level)
+
+    def measure_views(self, dataset, repeat):
+        """Render each view `repeat` times after a warm-up and record the medians."""
+        results = {}
+        for name, url_name, role in VIEWS:
+            client = Client()
+            client.force_login(getattr(dataset, role))
+            url = reverse(url_name)
+            self.get(client, url)
+
+            db_times, total_times = [], []
+            for _ in range(repeat):
+                timer = QueryTimer()
+                with connection.execute_wrapper(timer):
+                    started = time.perf_counter()
+                    status = self.get(client, url)
+                    total_times.append((time.perf_counter() - started) * 1000)
+                db_times.append(timer.seconds * 1000)
+
+            if status not in (200, 'no template'):
+                raise CommandError(f'{name} returned {status}')
+            results[name] = {
+                'queries': timer.queries,
+                'db_ms': round(statistics.median(db_times), 2),
+                'total_ms': round(statistics.median(total_times), 2),
+            }
+            self.stdout.write(
+                f"{name:>26} {status:>11} {results[name]['queries']:>8} "
+                f"{results[name]['db_ms']:>8.2f} {results[name]['total_ms']:>9.2f}"
+            )
+        return results
+
+    @staticmethod
+    def get(client, url):
+        """
+        Request `url` and return the status code, or 'no template' if the
+        view ran but its template is missing from this checkout (the admin
+        panel templates are); its queries are still measured.
+        """
+        try:
+            return client.get(url).status_code
+        except TemplateDoesNotExist:
+            return 'no template'
+
+    @staticmethod
+    def compare(results, budgets, time_tolerance):
+        """
+        Return a description of every budget a view exceeds. Query counts
+        are exact; times may exceed the baseline by `time_tolerance`.
+        """
+        failures = []
+        for name, result in results.items():
+            budget = budgets.get(name)
+            if budget is None:
+                failures.append(f'{name}: no budget in the baseline')
+                continue
+            if result['queries'] > budget['queries']:
+                failures.append(f"{name}: {result['queries']} queries, budget {budget['queries']}")
+            for key in ('db_ms', 'total_ms'):
+                limit = budget[key] * (1 + time_tolerance)
+                if result[key] > limit:
+                    failures.append(f'{name}: {key} {result[key]:.2f}, budget {limit:.2f}')
+        return failures
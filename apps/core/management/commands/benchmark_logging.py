@@ -0,0 +1,126 @@
+"""
+Command to measure how much per-message logging stalls the event loop.
+"""
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.log import AsyncStreamHandler, JsonFormatter
+
+
+class SlowStream:
+    """
+    A file that takes `latency` seconds per write, like stdout piped to a
+    log collector that drains it slowly.
+    """
+
+    def __init__(self, file, latency):
+        self.file = file
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+class Command(BaseCommand):
+    """Log from a simulated consumer and record how late the event loop wakes up."""
+
+    help = (
+        'Logs one record per simulated WebSocket message at the given rate with print(), '
+        'a synchronous StreamHandler and AsyncStreamHandler, and reports event loop stalls'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=int, default=1000, help='Messages per second')
+        parser.add_argument('--seconds', type=float, default=3.0, help='How long each mode runs')
+        parser.add_argument(
+            '--write-latency',
+            type=float,
+            default=0.5,
+            help='Milliseconds each write to the log stream takes',
+        )
+
+    def handle(self, *args, **options):
+        """Run each mode against its own slow stream and print the loop lag."""
+        latency = options['write_latency'] / 1000
+        self.stdout.write(
+            f"{options['rate']} messages/s for {options['seconds']}s, "
+            f"{options['write_latency']}ms per log write"
+        )
+        self.stdout.write(
+            f"{'mode':>14} {'sent/s':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'written':>8}"
+        )
+        for mode in ('print', 'sync handler', 'async handler'):
+            with tempfile.TemporaryFile('w+') as file:
+                stream = SlowStream(file, latency)
+                stats = asyncio.run(self.run_mode(mode, stream, options))
+                file.seek(0)
+                written = sum(1 for _ in file)
+            self.stdout.write(
+                f"{mode:>14} {stats['rate']:>8.0f} {stats['p50']:>11.2f} "
+                f"{stats['p99']:>11.2f} {stats['max']:>11.2f} {written:>8}"
+            )
+        self.stdout.write(self.style.SUCCESS('Logging benchmark complete'))
+
+    def make_logger(self, mode, stream):
+        """A logger writing to `stream` the way `mode` does, and its handler."""
+        logger = logging.getLogger(f'benchmark_logging.{os.getpid()}.{mode}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = AsyncStreamHandler(stream) if mode == 'async handler' else logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        return logger, handler
+
+    async def run_mode(self, mode, stream, options):
+        """Send messages at the target rate while sampling event loop lag."""
+        logger, handler = self.make_logger(mode, stream)
+        interval = 1 / options['rate']
+        total = int(options['rate'] * options['seconds'])
+        lags = []
+        done = asyncio.Event()
+
+        async def monitor():
+            # Wake every millisecond; any extra delay is time the loop was blocked
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append((time.perf_counter() - started - 0.001) * 1000)
+
+        async def consumer():
+            started = time.perf_counter()
+            for i in range(total):
+                text_data = f'{{"type": "chat_message", "message": "message {i}"}}'
+                if mode == 'print':
+                    print(f"Received WebSocket message: {text_data[:100]}...", file=stream, flush=True)
+                else:
+                    logger.info("Received WebSocket message: %s", text_data[:100], extra={'room': 'bench'})
+                # Pace to the target rate, yielding to the loop in between
+                delay = started + (i + 1) * interval - time.perf_counter()
+                await asyncio.sleep(max(delay, 0))
+            done.set()
+            return total / (time.perf_counter() - started)
+
+        monitor_task = asyncio.create_task(monitor())
+        rate = await consumer()
+        await monitor_task
+
+        handler.close()
+        logger.removeHandler(handler)
+        lags.sort()
+        return {
+            'rate': rate,
+            'p50': statistics.median(lags),
+            'p99': lags[int(len(lags) * 0.99)],
+            'max': lags[-1],
+        }
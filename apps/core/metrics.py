@@ -0,0 +1,244 @@
+"""
+In-process metrics for the WebSocket consumers, in Prometheus text format.
+
+Consumers that include InstrumentedConsumerMixin record:
+- connects and disconnects, and the open socket gauge, per consumer class;
+- frames received from and sent to clients, by message type;
+- how long each handler took, for client frames, socket connects and
+  disconnects, and channel layer events;
+- how long DB calls made with `database_sync_to_async` from this module
+  were awaited, which includes waiting for the thread that runs them.
+
+`render()` returns every metric, plus the rate limiting counters from
+apps.core.ratelimit, for the /metrics/ endpoint. Each process reports its
+own numbers; scrape every worker.
+"""
+import re
+import threading
+import time
+
+from channels.db import DatabaseSyncToAsync
+from django.conf import settings
+
+# Handler and DB wait buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Label values are capped so clients cannot create unbounded series
+MAX_SERIES = getattr(settings, 'METRICS_MAX_SERIES', 2000)
+
+_MESSAGE_TYPE = re.compile(r'"(?:type|action)"\s*:\s*"([^"]{1,64})"')
+_VALID_TYPE = re.compile(r'^[A-Za-z0-9_.:\-]{1,48}$')
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def key(self, labels):
+        """The series key for `labels`, folded into 'other' past MAX_SERIES."""
+        key = tuple(str(value) for value in labels)
+        if key not in self._series and len(self._series) >= MAX_SERIES:
+            key = ('other',) * len(self.labelnames)
+        return key
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            key = self.key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            series = list(self._series.items())
+        return self.header() + [
+            f'{self.name}{format_labels(self.labelnames, key)} {value}' for key, value in series
+        ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, rendered cumulatively."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            key = self.key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (not cumulative), then sum and count
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = self.header()
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {count}')
+            lines.append(f'{self.name}_sum{format_labels(self.labelnames, key)} {total}')
+            lines.append(f'{self.name}_count{format_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+registry = []
+
+websocket_connects = Counter(
+    'peerlearn_websocket_connects_total', 'WebSocket connection attempts.', ['consumer'])
+websocket_disconnects = Counter(
+    'peerlearn_websocket_disconnects_total', 'WebSocket disconnections.', ['consumer'])
+websocket_open = Gauge(
+    'peerlearn_websocket_open_sockets', 'Accepted WebSocket connections currently open.', ['consumer'])
+websocket_messages = Counter(
+    'peerlearn_websocket_messages_total', 'WebSocket frames by direction and message type.',
+    ['consumer', 'direction', 'type'])
+websocket_handler_seconds = Histogram(
+    'peerlearn_websocket_handler_seconds', 'Time spent handling a client frame or channel layer event.',
+    ['consumer', 'source', 'type'])
+websocket_db_wait_seconds = Histogram(
+    'peerlearn_websocket_db_wait_seconds', 'Time consumers waited on database_sync_to_async calls.',
+    ['function'])
+
+
+def message_type(text):
+    """The `type` (or `action`) of a JSON frame, without parsing all of it."""
+    if not text:
+        return 'binary'
+    match = _MESSAGE_TYPE.search(text)
+    if match is None:
+        return 'unknown'
+    value = match.group(1)
+    return value if _VALID_TYPE.match(value) else 'other'
+
+
+class InstrumentedConsumerMixin:
+    """
+    Mixin for Channels WebSocket consumers recording the metrics above.
+    Put it first in the bases so it sees every frame the consumer sends.
+    """
+
+    metrics_accepted = False
+
+    @property
+    def metrics_name(self):
+        return type(self).__name__
+
+    async def dispatch(self, message):
+        event = message.get('type', '')
+        if event == 'websocket.connect':
+            websocket_connects.inc(self.metrics_name)
+        elif event == 'websocket.disconnect':
+            websocket_disconnects.inc(self.metrics_name)
+            if self.metrics_accepted:
+                self.metrics_accepted = False
+                websocket_open.dec(self.metrics_name)
+
+        if event == 'websocket.receive':
+            source, label = 'client', message_type(message.get('text'))
+            websocket_messages.inc(self.metrics_name, 'received', label)
+        elif event.startswith('websocket.'):
+            source, label = 'socket', event
+        else:
+            source, label = 'layer', event
+
+        started = time.perf_counter()
+        try:
+            await super().dispatch(message)
+        finally:
+            websocket_handler_seconds.observe(time.perf_counter() - started, self.metrics_name, source, label)
+
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        if not self.metrics_accepted:
+            self.metrics_accepted = True
+            websocket_open.inc(self.metrics_name)
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        if text_data is not None or bytes_data is not None:
+            websocket_messages.inc(self.metrics_name, 'sent', message_type(text_data))
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+
+
+class TimedDatabaseSyncToAsync(DatabaseSyncToAsync):
+    """
+    channels' database_sync_to_async that records how long each call was
+    awaited in peerlearn_websocket_db_wait_seconds.
+    """
+
+    async def __call__(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().__call__(*args, **kwargs)
+        finally:
+            websocket_db_wait_seconds.observe(time.perf_counter() - started, self.func.__qualname__)
+
+
+# Drop-in replacement for channels.db.database_sync_to_async
+database_sync_to_async = TimedDatabaseSyncToAsync
+
+
+def render():
+    """All metrics in Prometheus text exposition format."""
+    from .ratelimit import socket_metrics
+
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+
+    lines.append('# HELP peerlearn_websocket_ratelimit_events_total Throttled, coalesced and dropped WebSocket frames and slow consumer closes.')
+    lines.append('# TYPE peerlearn_websocket_ratelimit_events_total counter')
+    for (scope, event, frame_type), count in list(socket_metrics.items()):
+        labels = format_labels(('scope', 'event', 'type'), (scope, event, frame_type))
+        lines.append(f'peerlearn_websocket_ratelimit_events_total{labels} {count}')
+    return '\n'.join(lines) + '\n'
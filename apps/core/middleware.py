@@ -1,8 +1,15 @@
 """
 Middleware for PeerLearn application.
 """
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
 from django.urls import resolve, Resolver404
 
+from .profiling import RequestProfile, current_profile, install_template_timer, profile_buffer
+
 
 class DashboardDetectionMiddleware:
     """
@@ -31,4 +38,55 @@ class DashboardDetectionMiddleware:
             
         # Process request
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Middleware that profiles a request's SQL, template and view time when
+    asked to (see apps.core.profiling). Place it after
+    AuthenticationMiddleware so the header can be limited to staff.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.header = 'HTTP_' + getattr(settings, 'PROFILING_HEADER', 'X-Profile').upper().replace('-', '_')
+        install_template_timer()
+
+    def should_profile(self, request):
+        if request.META.get(self.header):
+            user = getattr(request, 'user', None)
+            return settings.DEBUG or bool(user and user.is_staff)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = RequestProfile(request.method, request.path)
+        request.profile = profile
+        token = current_profile.set(profile)
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+
+        finished = time.perf_counter()
+        profile.total_ms = (finished - profile.started) * 1000
+        if profile.view_started is not None:
+            profile.view_ms = (finished - profile.view_started) * 1000
+        profile.status = response.status_code
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.route:
+            # Group /sessions/12/ and /sessions/13/ under one endpoint
+            profile.endpoint = '/' + match.route
+        response['Server-Timing'] = profile.server_timing()
+        profile_buffer.record(profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+        return None
@@ -0,0 +1,199 @@
+"""
+Per-request SQL and timing profiles.
+
+ProfilingMiddleware profiles a request when it carries the
+PROFILING_HEADER header (staff users, or anyone with DEBUG) or is picked
+by PROFILING_SAMPLE_RATE. A profile records the query count, total SQL
+time, how often each SQL fingerprint (the statement with its literals
+replaced by ?) ran, template render time and view time. The timings go
+out in a Server-Timing header and the profile goes into `profile_buffer`,
+a ring buffer of the last PROFILING_BUFFER_SIZE profiles that the admin
+panel summarises as the slowest endpoints and worst N+1 offenders.
+
+Requests that are not profiled pay for one random() call and one header
+lookup.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# The profile of the request being handled in this context, if any
+current_profile = ContextVar('current_profile', default=None)
+
+_LITERALS = re.compile(r"%s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Return `sql` with placeholders, literals and IN lists replaced by ?,
+    for grouping.
+    """
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('(?)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestProfile:
+    """
+    Timings for one request. Used as a connection execute wrapper, it counts
+    and times every query and the SQL it ran.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = path
+        self.status = None
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.total_ms = 0.0
+        self.view_ms = 0.0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.queries = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        """
+        Return {fingerprint: count} for the statements run at least
+        `threshold` times, which usually means a query in a loop.
+        """
+        fingerprints = Counter()
+        for sql, count in self.statements.items():
+            fingerprints[fingerprint(sql)] += count
+        return {sql: count for sql, count in fingerprints.items() if count >= threshold}
+
+    def server_timing(self):
+        """The Server-Timing header value for this profile."""
+        return ', '.join([
+            f'sql;dur={self.sql_ms:.1f};desc="{self.queries} queries"',
+            f'template;dur={self.template_ms:.1f}',
+            f'view;dur={self.view_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+
+def install_template_timer():
+    """
+    Time template rendering for profiled requests by wrapping
+    Template._render, as Django's test runner does to instrument templates.
+    Only the outermost render is timed, so includes are not counted twice.
+    """
+    from django.template.base import Template
+
+    if getattr(Template._render, 'profiled', False):
+        return
+    render = Template._render
+
+    def profiled_render(self, context):
+        profile = current_profile.get()
+        if profile is None:
+            return render(self, context)
+        started = time.perf_counter()
+        profile.template_depth += 1
+        try:
+            return render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_ms += (time.perf_counter() - started) * 1000
+
+    profiled_render.profiled = True
+    Template._render = profiled_render
+
+
+class ProfileBuffer:
+    """
+    Keeps the last `size` request profiles and summarises them.
+    """
+
+    def __init__(self, size=500, duplicate_threshold=3):
+        self.duplicate_threshold = duplicate_threshold
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, profile):
+        """Add a finished profile, keeping only what the summaries need."""
+        entry = {
+            'method': profile.method,
+            'endpoint': profile.endpoint,
+            'path': profile.path,
+            'status': profile.status,
+            'queries': profile.queries,
+            'sql_ms': profile.sql_ms,
+            'template_ms': profile.template_ms,
+            'view_ms': profile.view_ms,
+            'total_ms': profile.total_ms,
+            'duplicates': profile.duplicates(self.duplicate_threshold),
+        }
+        with self._lock:
+            self._profiles.append(entry)
+
+    def profiles(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+    def slowest_endpoints(self, limit=20):
+        """Endpoints by their slowest request, with their averages."""
+        by_endpoint = defaultdict(list)
+        for entry in self.profiles():
+            by_endpoint[(entry['method'], entry['endpoint'])].append(entry)
+
+        rows = []
+        for (method, endpoint), entries in by_endpoint.items():
+            count = len(entries)
+            rows.append({
+                'method': method,
+                'endpoint': endpoint,
+                'requests': count,
+                'max_ms': max(entry['total_ms'] for entry in entries),
+                'avg_ms': sum(entry['total_ms'] for entry in entries) / count,
+                'avg_sql_ms': sum(entry['sql_ms'] for entry in entries) / count,
+                'avg_template_ms': sum(entry['template_ms'] for entry in entries) / count,
+                'avg_queries': sum(entry['queries'] for entry in entries) / count,
+            })
+        rows.sort(key=lambda row: row['max_ms'], reverse=True)
+        return rows[:limit]
+
+    def n_plus_one_offenders(self, limit=20):
+        """Repeated SQL fingerprints by the most repeats seen in one request."""
+        worst = {}
+        for entry in self.profiles():
+            for sql, count in entry['duplicates'].items():
+                key = (entry['endpoint'], sql)
+                row = worst.setdefault(key, {
+                    'endpoint': entry['endpoint'],
+                    'fingerprint': sql,
+                    'max_repeats': 0,
+                    'requests': 0,
+                })
+                row['max_repeats'] = max(row['max_repeats'], count)
+                row['requests'] += 1
+        rows = sorted(worst.values(), key=lambda row: row['max_repeats'], reverse=True)
+        return rows[:limit]
+
+
+profile_buffer = ProfileBuffer(
+    size=getattr(settings, 'PROFILING_BUFFER_SIZE', 500),
+    duplicate_threshold=getattr(settings, 'PROFILING_DUPLICATE_THRESHOLD', 3),
+)
@@ -0,0 +1,202 @@
+"""
+Per-connection rate limiting and backpressure for WebSocket consumers.
+
+Every connection gets one token bucket per message type listed in
+WEBSOCKET_RATE_LIMITS[scope]; all other types share the scope's 'default'
+bucket, so clients cannot create buckets by inventing types. Messages
+arriving with an empty bucket are dropped and the client is told once per
+type when it may retry.
+
+Outbound frames back up in the channel layer, not in the consumer: daphne
+completes every send at once, while events for a busy connection wait in
+its channel (up to the layer's capacity, past which group sends drop
+them). Events sent with `stamp()` carry their send time, so a connection
+can tell how far behind its channel it is:
+- low-priority types in WEBSOCKET_STALE_FRAMES that waited longer than
+  their limit are coalesced to the latest frame per user and sent once the
+  connection catches up;
+- a connection lagging by more than WEBSOCKET_SLOW_CONSUMER_LAG seconds is
+  closed so the client reconnects and reloads its state.
+
+Throttled, coalesced and dropped frames and slow consumer closes are
+counted in `socket_metrics`.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+
+from channels.exceptions import ChannelFull
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# (scope, event, message type) -> count
+socket_metrics = Counter()
+
+
+def record(scope, event, message_type=''):
+    """Count a rate limiting event."""
+    socket_metrics[(scope, event, message_type or '')] += 1
+
+
+def stamp(event):
+    """Return a channel layer event carrying its send time."""
+    return {**event, 'sent_at': time.time()}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second up to `burst` tokens.
+    """
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def consume(self, tokens=1):
+        """Take `tokens` from the bucket; returns False if there are not enough."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+    def retry_after(self, tokens=1):
+        """Seconds until `tokens` will be available."""
+        return max(0.0, (tokens - self.tokens) / self.rate) if self.rate else None
+
+
+class RateLimitedConsumerMixin:
+    """
+    Mixin for Channels WebSocket consumers adding per-type inbound token
+    buckets and outbound backpressure.
+
+    Consumers set `rate_limit_scope` to pick their WEBSOCKET_RATE_LIMITS
+    entry and call `await self.allow_message(message_type)` before handling
+    a client message. Events sent with `group_send` and `channel_send` are
+    stamped so receivers can coalesce or close when they fall behind.
+    """
+
+    rate_limit_scope = 'default'
+
+    # WebSocket close code for connections too far behind their channel
+    SLOW_CONSUMER_CLOSE_CODE = 4008
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_buckets = {}
+        self.throttle_notified = set()
+        self.coalesced_frames = {}
+        self.coalesce_flush = None
+        self.closed_slow = False
+
+    def rate_key(self, message_type):
+        """The bucket name for a message type: itself if configured, else 'default'."""
+        limits = getattr(settings, 'WEBSOCKET_RATE_LIMITS', {}).get(self.rate_limit_scope, {})
+        return message_type if message_type in limits else 'default'
+
+    def get_rate_bucket(self, message_type):
+        """Return this connection's bucket for a message type."""
+        key = self.rate_key(message_type)
+        bucket = self.rate_buckets.get(key)
+        if bucket is None:
+            limits = getattr(settings, 'WEBSOCKET_RATE_LIMITS', {}).get(self.rate_limit_scope, {})
+            rate, burst = limits.get(key) or (10, 20)
+            bucket = self.rate_buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def allow_message(self, message_type):
+        """
+        Take a token for an inbound message. Returns False, after telling
+        the client once per throttled bucket, if the message must be dropped.
+        """
+        key = self.rate_key(message_type)
+        bucket = self.get_rate_bucket(message_type)
+        if bucket.consume():
+            self.throttle_notified.discard(key)
+            return True
+
+        record(self.rate_limit_scope, 'throttled', key)
+        if key not in self.throttle_notified:
+            self.throttle_notified.add(key)
+            logger.warning("Throttling %s messages on %s socket %s", key, self.rate_limit_scope, self.channel_name)
+            await self.send(text_data=json.dumps({
+                'type': 'rate_limited',
+                'message_type': message_type,
+                'retry_after': bucket.retry_after(),
+            }))
+        return False
+
+    async def group_send(self, group, event):
+        """Send a stamped event to a channel layer group."""
+        await self.channel_layer.group_send(group, stamp(event))
+
+    async def channel_send(self, channel, event):
+        """
+        Send a stamped event to one channel. Returns False, counting the
+        drop, if the receiving connection's channel is full.
+        """
+        try:
+            await self.channel_layer.send(channel, stamp(event))
+        except ChannelFull:
+            record(self.rate_limit_scope, 'dropped', event.get('type'))
+            logger.warning("Dropped %s event for full channel %s", event.get('type'), channel)
+            return False
+        return True
+
+    async def dispatch(self, message):
+        """Coalesce stale low-priority events and close connections too far behind."""
+        sent_at = message.get('sent_at')
+        if sent_at is None:
+            if message.get('type') == 'websocket.disconnect' and self.coalesce_flush is not None:
+                self.coalesce_flush.cancel()
+                self.coalesce_flush = None
+            return await super().dispatch(message)
+        if self.closed_slow:
+            return
+
+        lag = time.time() - sent_at
+        if lag > getattr(settings, 'WEBSOCKET_SLOW_CONSUMER_LAG', 30):
+            self.closed_slow = True
+            record(self.rate_limit_scope, 'closed_slow', message['type'])
+            logger.warning("Closing %s socket %s, %.1fs behind its channel", self.rate_limit_scope, self.channel_name, lag)
+            await self.close(code=self.SLOW_CONSUMER_CLOSE_CODE)
+            return
+
+        stale_after = getattr(settings, 'WEBSOCKET_STALE_FRAMES', {}).get(message['type'])
+        if stale_after is not None and lag > stale_after:
+            # Behind: keep only the newest frame per sender until caught up
+            record(self.rate_limit_scope, 'coalesced', message['type'])
+            self.coalesced_frames[(message['type'], message.get('user_id'))] = message
+            if self.coalesce_flush is None:
+                self.coalesce_flush = asyncio.ensure_future(self.flush_coalesced_later(stale_after))
+            return
+
+        await super().dispatch(message)
+        if self.coalesced_frames:
+            await self.flush_coalesced()
+
+    async def flush_coalesced_later(self, delay):
+        """Send the coalesced frames if no fresh event has done so by `delay`."""
+        await asyncio.sleep(delay)
+        self.coalesce_flush = None
+        await self.flush_coalesced()
+
+    async def flush_coalesced(self):
+        """Send the newest coalesced frame of each sender."""
+        frames, self.coalesced_frames = self.coalesced_frames, {}
+        if self.coalesce_flush is not None:
+            self.coalesce_flush.cancel()
+            self.coalesce_flush = None
+        if self.closed_slow:
+            return
+        for message in frames.values():
+            await super().dispatch(message)
@@ -0,0 +1,177 @@
+"""
+Full-text search over sessions and users.
+
+Sessions and users are indexed with django-haystack in a Whoosh index at
+SEARCH_INDEX_PATH (see search_indexes.py in learning_sessions and users).
+OnCommitSignalProcessor updates a document once the transaction saving or
+deleting its object commits, and skips saves whose update_fields touch no
+indexed field. bulk_create() and update() send no signals, so run
+`manage.py update_index --age=<hours>` after bulk loads, and
+`manage.py rebuild_index` to build the index from scratch. Deploys run
+`update_index --remove` before starting the server.
+
+site_search.search() is the one entry point for views: it narrows a
+queryset to the objects matching a query, best match first. Until the
+index holds documents for a model (a fresh deploy whose update_index has
+not finished, say), it matches the words against the index's
+`fallback_fields` in the database instead, unranked.
+"""
+import logging
+import re
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.signals import post_delete, post_save
+from haystack import connections
+from haystack.exceptions import NotHandled
+from haystack.query import SQ, SearchQuerySet
+from haystack.signals import BaseSignalProcessor
+from haystack.utils import get_identifier
+
+logger = logging.getLogger(__name__)
+
+# Words beyond this are ignored so a pasted paragraph stays cheap to run
+MAX_QUERY_WORDS = 8
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Mentor name fields that also appear in their sessions' documents
+MENTOR_NAME_FIELDS = frozenset({'username', 'first_name', 'last_name'})
+
+
+class OnCommitSignalProcessor(BaseSignalProcessor):
+    """
+    Keeps session and user documents in step with their rows, writing to
+    the index only after the change commits.
+    """
+
+    def models(self):
+        from apps.learning_sessions.models import Session
+        from apps.users.models import CustomUser
+
+        return (Session, CustomUser)
+
+    def setup(self):
+        for model in self.models():
+            post_save.connect(self.handle_save, sender=model)
+            post_delete.connect(self.handle_delete, sender=model)
+
+    def teardown(self):
+        for model in self.models():
+            post_save.disconnect(self.handle_save, sender=model)
+            post_delete.disconnect(self.handle_delete, sender=model)
+
+    def indexes(self, model):
+        """(alias, index) pairs of the connections indexing `model`."""
+        for using in self.connection_router.for_write():
+            try:
+                yield using, self.connections[using].get_unified_index().get_index(model)
+            except NotHandled:
+                continue
+
+    def handle_save(self, sender, instance, update_fields=None, **kwargs):
+        changed = set(update_fields) if update_fields is not None else None
+        for using, index in self.indexes(sender):
+            if changed is None or changed & index.indexed_fields:
+                transaction.on_commit(partial(index.update_object, instance, using=using))
+
+        from apps.users.models import CustomUser
+
+        if sender is CustomUser and instance.role == CustomUser.MENTOR and (changed is None or changed & MENTOR_NAME_FIELDS):
+            transaction.on_commit(partial(self.update_mentor_sessions, instance.pk))
+
+    def handle_delete(self, sender, instance, **kwargs):
+        # The instance loses its pk once the delete finishes
+        identifier = get_identifier(instance)
+        for using, index in self.indexes(sender):
+            transaction.on_commit(partial(index.remove_object, identifier, using=using))
+
+    def update_mentor_sessions(self, mentor_id):
+        """Re-index a mentor's sessions, whose documents carry the mentor's name."""
+        from apps.learning_sessions.models import Session
+
+        for using, index in self.indexes(Session):
+            sessions = index.index_queryset(using=using).filter(mentor_id=mentor_id)
+            if sessions.exists():
+                self.connections[using].get_backend().update(index, sessions)
+
+
+class SiteSearch:
+    """
+    Ranked search over the indexed models.
+    """
+
+    def __init__(self, max_results=500):
+        self.max_results = max_results
+        # Models the index is known to hold documents for
+        self._ready = set()
+
+    @staticmethod
+    def words(query):
+        return WORD_PATTERN.findall((query or '').lower())[:MAX_QUERY_WORDS]
+
+    def ranked_ids(self, model, query, **filters):
+        """
+        Primary keys of the `model` objects matching every word of `query`,
+        best match first, or None if the query has no words. A word matches
+        a whole word of the document or a word prefix of its `auto` field.
+        `filters` are applied to the index, e.g. role='mentor'.
+        """
+        words = self.words(query)
+        if not words:
+            return None
+
+        results = SearchQuerySet().models(model)
+        for word in words:
+            results = results.filter(SQ(content=word) | SQ(auto=word))
+        if filters:
+            results = results.filter(**filters)
+        to_python = model._meta.pk.to_python
+        return [to_python(result.pk) for result in results[:self.max_results]]
+
+    def index_ready(self, model):
+        """Whether the index holds documents for `model`; checked until it does."""
+        if model not in self._ready:
+            try:
+                if not SearchQuerySet().models(model).count():
+                    return False
+            except Exception as e:
+                logger.warning("Search index unavailable for %s: %s", model._meta.label, e)
+                return False
+            self._ready.add(model)
+        return True
+
+    def database_search(self, queryset, words, **filters):
+        """
+        `queryset` narrowed in the database to the objects with every word in
+        one of the model index's `fallback_fields`.
+        """
+        fields = connections['default'].get_unified_index().get_index(queryset.model).fallback_fields
+        for word in words:
+            matches = Q()
+            for field in fields:
+                matches |= Q(**{f'{field}__icontains': word})
+            queryset = queryset.filter(matches)
+        return queryset.filter(**filters)
+
+    def search(self, queryset, query, **filters):
+        """
+        `queryset` narrowed to the objects matching `query` and ordered by
+        rank, or unchanged if the query has no words. Only the
+        SEARCH_MAX_RESULTS best matches are kept.
+        """
+        if not self.index_ready(queryset.model):
+            words = self.words(query)
+            return self.database_search(queryset, words, **filters) if words else queryset
+        ids = self.ranked_ids(queryset.model, query, **filters)
+        if ids is None:
+            return queryset
+        if not ids:
+            return queryset.none()
+        rank = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)], output_field=IntegerField())
+        return queryset.filter(pk__in=ids).order_by(rank)
+
+
+site_search = SiteSearch(max_results=getattr(settings, 'SEARCH_MAX_RESULTS', 500))
@@ -2,12 +2,14 @@
 Core views for the PeerLearn platform.
 """
 
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from django.views.generic import TemplateView
 from django.utils import timezone
-from django.db.models import Count, Avg
 
-from apps.users.models import CustomUser, UserRating
-from apps.learning_sessions.models import Session
+from apps.learning_sessions.models import Session, Topic
+from apps.users.leaderboard import leaderboard
 
 class HomeView(TemplateView):
     """
@@ -19,13 +21,8 @@ class HomeView(TemplateView):
         """Add real data from database to context."""
         context = super().get_context_data(**kwargs)
         
-        # Get featured mentors (top rated)
-        mentors = CustomUser.objects.filter(
-            role=CustomUser.MENTOR
-        ).annotate(
-            rating_avg=Avg('ratings_received__rating'),
-            sessions_count=Count('session')
-        ).filter(sessions_count__gt=0).order_by('-rating_avg')[:6]
+        # Get featured mentors (top of the mentor leaderboard)
+        mentors = leaderboard.top_mentors(6)
         
         # Get upcoming sessions
         now = timezone.now()
@@ -39,18 +36,8 @@ class HomeView(TemplateView):
             status=Session.LIVE
         ).select_related('mentor').order_by('schedule')[:3]
         
-        # Get categories from session topics
-        all_topics = Session.objects.exclude(topics=[]).values_list('topics', flat=True)
-        
-        # Extract unique categories (flattening the list of lists)
-        categories = set()
-        for topics_list in all_topics:
-            if isinstance(topics_list, list):
-                for topic in topics_list:
-                    categories.add(topic)
-        
-        # Sort categories alphabetically and take first 8
-        categories = sorted(list(categories))[:8]
+        # Get the first 8 categories alphabetically from the session topic index
+        categories = list(Topic.objects.in_use().values_list('name', flat=True)[:8])
         
         context.update({
             'featured_mentors': mentors,
@@ -59,4 +46,23 @@ class HomeView(TemplateView):
             'categories': categories
         })
         
-        return context
\ No newline at end of file
+        return context
+
+
+def metrics(request):
+    """
+    WebSocket metrics in Prometheus text format. Scrapers authenticate with
+    `Authorization: Bearer <METRICS_TOKEN>`; without a token configured the
+    page is open to staff users, or to anyone when DEBUG is on.
+    """
+    from .metrics import render
+    
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = settings.DEBUG or request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
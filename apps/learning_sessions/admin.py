@@ -5,7 +5,7 @@ Admin configuration for the sessions app.
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Session, SessionRequest, Booking
+from .models import Session, SessionRequest, Booking, ChatMessage, Topic
 
 class BookingInline(admin.TabularInline):
     """Inline admin for bookings."""
@@ -56,6 +56,21 @@ class BookingAdmin(admin.ModelAdmin):
         (_('Timestamps'), {'fields': ('created_at', 'updated_at')}),
     )
 
+class ChatMessageAdmin(admin.ModelAdmin):
+    """Admin configuration for the ChatMessage model."""
+    list_display = ('session', 'sequence', 'username', 'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('session__title', 'username', 'content')
+    raw_id_fields = ('session', 'sender')
+
+class TopicAdmin(admin.ModelAdmin):
+    """Admin configuration for the Topic index."""
+    list_display = ('name', 'session_count')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'session_count')
+
 admin.site.register(Session, SessionAdmin)
 admin.site.register(SessionRequest, SessionRequestAdmin)
 admin.site.register(Booking, BookingAdmin)
+admin.site.register(ChatMessage, ChatMessageAdmin)
+admin.site.register(Topic, TopicAdmin)
@@ -0,0 +1,117 @@
+"""
+Room admission cache for SessionConsumer.connect.
+
+Stores, per room code, the session's mentor ID and the IDs of learners
+with a confirmed booking, so reconnect storms are admitted without
+touching the database. Entries expire after SESSION_ADMISSION_CACHE_TTL
+seconds, and expired ones are pruned whenever a room is loaded. They are
+dropped as soon as a Session or Booking of that room is saved or deleted
+in this process (see signals.py). Denials are never served from cache: a user missing from a
+cached entry triggers one fresh lookup before being turned away.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class RoomAdmissionCache:
+    """
+    In-process TTL cache of room admission data keyed by room code.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        # Oldest expiry first: every entry lives for the same TTL
+        self._entries = OrderedDict()
+        self._room_codes_by_session = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(room_code):
+        """Room codes arrive from URLs as strings; compare them case-insensitively."""
+        return str(room_code).lower()
+
+    def get(self, room_code):
+        """
+        Return the cached entry for a room, or None if missing or expired.
+        """
+        entry = self._entries.get(self.normalize(room_code))
+        if entry is None or entry['expires'] < time.monotonic():
+            return None
+        return entry
+
+    def load(self, room_code):
+        """
+        Read admission data for a room from the database and cache it.
+        Returns None if the session does not exist. Must run in a sync context.
+        """
+        from .models import Session, Booking
+
+        try:
+            session = Session.objects.values('id', 'mentor_id').get(room_code=room_code)
+        except Session.DoesNotExist:
+            return None
+
+        learner_ids = set(
+            Booking.objects.filter(
+                session_id=session['id'],
+                status=Booking.CONFIRMED
+            ).values_list('learner_id', flat=True)
+        )
+
+        entry = {
+            'session_id': session['id'],
+            'mentor_id': session['mentor_id'],
+            'learner_ids': frozenset(learner_ids),
+            'expires': time.monotonic() + self.ttl,
+        }
+
+        key = self.normalize(room_code)
+        with self._lock:
+            self.prune()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._room_codes_by_session[session['id']] = key
+        return entry
+
+    def prune(self):
+        """Drop expired entries. Call with the lock held."""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry['expires'] >= now:
+                break
+            del self._entries[key]
+            if self._room_codes_by_session.get(entry['session_id']) == key:
+                del self._room_codes_by_session[entry['session_id']]
+
+    def invalidate_session(self, session_id):
+        """
+        Drop the cached entry for a session after its data changed.
+        """
+        with self._lock:
+            key = self._room_codes_by_session.pop(session_id, None)
+            if key is not None:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._room_codes_by_session.clear()
+
+    @staticmethod
+    def allows(entry, user):
+        """
+        Check whether a user may join the room described by `entry`.
+        Mentors can always join their own sessions; learners need a
+        confirmed booking.
+        """
+        if entry['mentor_id'] == user.id:
+            return True
+        return user.is_learner and user.id in entry['learner_ids']
+
+
+admission_cache = RoomAdmissionCache(ttl=getattr(settings, 'SESSION_ADMISSION_CACHE_TTL', 60))
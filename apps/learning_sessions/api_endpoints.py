@@ -16,8 +16,10 @@ from django.db import transaction
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from .autocomplete import KINDS, autocomplete
 from .models import Session, Booking, SessionRequest
 from apps.notifications.models import Notification
+from apps.notifications.outbox import outbox
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -314,18 +316,22 @@ def go_live_api(request, session_id):
                     'error': f'Cannot start a session that is {session.get_status_display()}'
                 }, status=400)
         
-        # Get confirmed bookings (if any, we'll notify them, but allow mentors to join even without bookings)
-        confirmed_bookings = Booking.objects.filter(session=session, status='confirmed')
+        # Get confirmed learners (if any, we'll notify them, but allow mentors to join even without bookings)
+        learner_ids = list(
+            Booking.objects.filter(session=session, status='confirmed').values_list('learner_id', flat=True)
+        )
         # Log booking info
-        logger.info(f"Session {session_id} has {confirmed_bookings.count()} confirmed bookings")
+        logger.info("Session %s has %s confirmed bookings", session_id, len(learner_ids))
         
         # Check session time (mentors can join anytime before session to prepare)
         time_until_session = session.schedule - timezone.now()
         
         # Only log the time info for debugging purposes
-        logger.info(f"Time until session {session_id}: {time_until_session.total_seconds()} seconds. Force: {force}")
+        logger.info("Time until session %s: %s seconds. Force: %s", session_id, time_until_session.total_seconds(), force)
         
-        # Start a transaction to ensure all operations are atomic
+        # Start a transaction to ensure all operations are atomic. WebSocket
+        # updates go to the outbox and are published after commit, so the
+        # request does not wait on the channel layer for every learner.
         with transaction.atomic():
             # Update session status
             session.status = 'live'
@@ -340,76 +346,45 @@ def go_live_api(request, session_id):
                 link=f"/sessions/{session.room_code}/join/"
             )
             
-            # Create notifications for all learners with confirmed bookings
-            if notify_learners:
-                for booking in confirmed_bookings:
-                    # Create notification object
-                    Notification.objects.create(
-                        user=booking.learner,
-                        title="Session is Live",
-                        message=f"The session '{session.title}' is now live! Join to start learning.",
-                        notification_type='session_live',
-                        reference_id=session.id,
-                        link=f"/sessions/{session.room_code}/join/?direct=true"
-                    )
-                    
-                    # Log notification creation
-                    logger.info(f"Created session live notification for learner {booking.learner.id}")
-            
-            # Send real-time updates via WebSocket
-            channel_layer = get_channel_layer()
-            
             # Format session data for WebSocket
             session_data = {
                 'id': session.id,
                 'title': session.title,
                 'status': 'live',
-                'live_started_at': timezone.now().isoformat(),
+                'live_started_at': session.live_started_at.isoformat(),
                 'room_code': str(session.room_code)
             }
+            session_update = {
+                'type': 'session_update',
+                'session': session_data,
+                'action': 'live'
+            }
             
-            # Send to mentor's channel group
-            async_to_sync(channel_layer.group_send)(
-                f"dashboard_{request.user.id}",
-                {
-                    'type': 'session_update',
-                    'session': session_data,
-                    'action': 'live'
-                }
-            )
+            # Send to the mentor's and each learner's dashboard group
+            dashboard_groups = [f"dashboard_{request.user.id}"]
+            if notify_learners:
+                dashboard_groups.extend(f"dashboard_{learner_id}" for learner_id in learner_ids)
+            outbox.enqueue([(dashboard_groups, session_update)])
             
-            # Send to each learner's channel group
+            # Create notifications for all learners with confirmed bookings and
+            # alert their notification groups once the session is committed
             if notify_learners:
-                for booking in confirmed_bookings:
-                    try:
-                        # Send session update
-                        async_to_sync(channel_layer.group_send)(
-                            f"dashboard_{booking.learner.id}",
-                            {
-                                'type': 'session_update',
-                                'session': session_data,
-                                'action': 'live'
-                            }
-                        )
-                        
-                        # Send notification update
-                        async_to_sync(channel_layer.group_send)(
-                            f"notif_{booking.learner.id}",
-                            {
-                                'type': 'notification_message',
-                                'message': {
-                                    'type': 'alert',
-                                    'title': 'Session Live Now!',
-                                    'content': f"The session '{session.title}' with {session.mentor.get_full_name()} has started! Join now to participate.",
-                                    'link': f"/sessions/{session.room_code}/join/?direct=true",
-                                    'is_important': True
-                                }
-                            }
-                        )
-                        
-                        logger.info(f"Sent WebSocket notifications to learner {booking.learner.id}")
-                    except Exception as e:
-                        logger.error(f"Error sending WebSocket notification to learner {booking.learner.id}: {str(e)}")
+                outbox.notify(learner_ids, {
+                    'title': "Session is Live",
+                    'message': f"The session '{session.title}' is now live! Join to start learning.",
+                    'notification_type': 'session_live',
+                    'reference_id': session.id,
+                    'link': f"/sessions/{session.room_code}/join/?direct=true"
+                }, message={
+                    'type': 'notification_message',
+                    'message': {
+                        'type': 'alert',
+                        'title': 'Session Live Now!',
+                        'content': f"The session '{session.title}' with {request.user.get_full_name()} has started! Join now to participate.",
+                        'link': f"/sessions/{session.room_code}/join/?direct=true",
+                        'is_important': True
+                    }
+                })
         
         # Return success response with direct=true parameter for immediate access
         return JsonResponse({
@@ -482,7 +457,7 @@ def cancel_session_api(request, session_id):
                 
                 # Create notification for learner
                 Notification.objects.create(
-                    user=booking.learner,
+                    user_id=booking.learner_id,
                     message=f"The session '{session.title}' has been cancelled by the mentor. Reason: {cancellation_reason}",
                     link=reverse('users:learner_dashboard')
                 )
@@ -494,9 +469,6 @@ def cancel_session_api(request, session_id):
                 link=reverse('users:mentor_sessions')
             )
             
-            # Send real-time updates via WebSocket
-            channel_layer = get_channel_layer()
-            
             # Format session data for WebSocket
             session_data = {
                 'id': session.id,
@@ -504,27 +476,18 @@ def cancel_session_api(request, session_id):
                 'status': 'cancelled',
                 'cancelled_at': timezone.now().isoformat()
             }
+            session_update = {
+                'type': 'session_update',
+                'session': session_data,
+                'action': 'cancelled'
+            }
             
-            # Send to mentor's channel group
-            async_to_sync(channel_layer.group_send)(
-                f"dashboard_{request.user.id}",
-                {
-                    'type': 'session_update',
-                    'session': session_data,
-                    'action': 'cancelled'
-                }
-            )
-            
-            # Send to each learner's channel group
-            for booking in bookings:
-                async_to_sync(channel_layer.group_send)(
-                    f"dashboard_{booking.learner.id}",
-                    {
-                        'type': 'session_update',
-                        'session': session_data,
-                        'action': 'cancelled'
-                    }
-                )
+            # Queue real-time updates for the mentor's and each learner's
+            # channel group; they are published after commit
+            outbox.enqueue([(
+                [f"dashboard_{request.user.id}"] + [f"dashboard_{booking.learner_id}" for booking in bookings],
+                session_update
+            )])
         
         # Return success response
         return JsonResponse({
@@ -537,4 +500,26 @@ def cancel_session_api(request, session_id):
         return JsonResponse({
             'success': False,
             'error': str(e)
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+@login_required
+@require_GET
+def autocomplete_api(request):
+    """
+    Typeahead suggestions for topic, domain and mentor name inputs.
+    GET ?q=<typed prefix>&kinds=topic,domain,mentor&limit=8, answered from
+    the in-process autocomplete index without touching the database.
+    """
+    query = request.GET.get('q', '')[:100]
+    kinds = {kind for kind in request.GET.get('kinds', '').split(',') if kind in KINDS} or None
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+
+    suggestions = autocomplete.lookup(query, kinds, limit)
+    return JsonResponse({
+        'success': True,
+        'results': [suggestion.as_dict() for suggestion in suggestions],
+    })
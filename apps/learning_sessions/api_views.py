@@ -13,6 +13,7 @@ from asgiref.sync import async_to_sync
 from django.utils import timezone
 
 from .models import Session, Booking
+from .presence import presence
 
 # Get logger
 logger = logging.getLogger(__name__)
@@ -78,10 +79,10 @@ def end_session(request, room_code):
                         }
                     )
             except Exception as e:
-                logger.error(f"Error sending WebSocket message: {str(e)}")
+                logger.error("Error sending WebSocket message: %s", e)
             
             # Log the action
-            logger.info(f"Session {room_code} ended by {request.user.username} (ID: {request.user.id})")
+            logger.info("Session %s ended by %s (ID: %s)", room_code, request.user.username, request.user.id)
             
             return JsonResponse({
                 'status': 'success',
@@ -94,7 +95,7 @@ def end_session(request, room_code):
             })
             
     except Exception as e:
-        logger.error(f"Error ending session: {str(e)}")
+        logger.error("Error ending session: %s", e)
         return JsonResponse({
             'status': 'error',
             'message': f'Error ending session: {str(e)}'
@@ -118,13 +119,14 @@ def session_status_api(request):
                     
                     for booking in bookings:
                         session = booking.session
-                        attendees = session.bookings.filter(status='confirmed').count()
+                        attendees = session.confirmed_bookings_count
                         
                         session_data.append({
                             'id': session.id,
                             'title': session.title,
                             'status': session.status,
                             'room_code': session.room_code if session.status == 'live' else None,
+                            'online_participants': presence.count(session.room_code) if session.status == 'live' else 0,
                             'booking_id': booking.id,
                             'schedule': session.schedule.isoformat() if session.schedule else None,
                             'duration': session.duration,
@@ -144,9 +146,9 @@ def session_status_api(request):
                     ).select_related('mentor').order_by('schedule')[:5]
                     
                     for session in upcoming_sessions:
-                        attendees = session.bookings.filter(status='confirmed').count()
+                        attendees = session.confirmed_bookings_count
                         
-                        if attendees < session.max_participants:
+                        if session.can_book:
                             session_data.append({
                                 'id': session.id,
                                 'title': session.title,
@@ -166,16 +168,17 @@ def session_status_api(request):
                     sessions = Session.objects.filter(
                         mentor=request.user,
                         status__in=['scheduled', 'live']
-                    ).prefetch_related('bookings')
+                    )
                     
                     for session in sessions:
-                        attendees = session.bookings.filter(status='confirmed').count()
+                        attendees = session.confirmed_bookings_count
                         
                         session_data.append({
                             'id': session.id,
                             'title': session.title,
                             'status': session.status,
                             'room_code': session.room_code if session.status == 'live' else None,
+                            'online_participants': presence.count(session.room_code) if session.status == 'live' else 0,
                             'schedule': session.schedule.isoformat() if session.schedule else None,
                             'duration': session.duration,
                             'price': float(session.price),
@@ -190,7 +193,7 @@ def session_status_api(request):
                     ).select_related('mentor').order_by('schedule')[:10]
                     
                     for session in sessions:
-                        attendees = session.bookings.filter(status='confirmed').count()
+                        attendees = session.confirmed_bookings_count
                         
                         session_data.append({
                             'id': session.id,
@@ -212,7 +215,7 @@ def session_status_api(request):
                 ).select_related('mentor').order_by('schedule')[:5]
                 
                 for session in sessions:
-                    attendees = session.bookings.filter(status='confirmed').count()
+                    attendees = session.confirmed_bookings_count
                     
                     session_data.append({
                         'id': session.id,
@@ -229,9 +232,7 @@ def session_status_api(request):
             
             return JsonResponse({'sessions': session_data})
         except Exception as e:
-            import traceback
-            print(f"Error in session_status_api: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error in session_status_api: %s", e)
             return JsonResponse({'error': str(e)}, status=500)
         
     return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -332,9 +333,9 @@ def update_session_status(request, room_code):
                     'updated_by_name': request.user.get_full_name() or request.user.username
                 }
             )
-            logger.info(f"WebSocket notification sent for session {room_code} status update to {status}")
+            logger.info("WebSocket notification sent for session %s status update to %s", room_code, status)
         except Exception as e:
-            logger.error(f"Error sending WebSocket notification: {e}")
+            logger.error("Error sending WebSocket notification: %s", e)
         
         return JsonResponse({
             'success': True,
@@ -346,5 +347,5 @@ def update_session_status(request, room_code):
     except Session.DoesNotExist:
         return JsonResponse({'error': 'Session not found'}, status=404)
     except Exception as e:
-        logger.error(f"Error updating session status: {e}")
+        logger.error("Error updating session status: %s", e)
         return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+App configuration for the learning_sessions app.
+"""
+
+from django.apps import AppConfig
+
+
+class LearningSessionsConfig(AppConfig):
+    """Configuration for the learning_sessions app."""
+    
+    name = 'apps.learning_sessions'
+    label = 'learning_sessions'
+    
+    def ready(self):
+        """Connect model signal handlers."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,208 @@
+"""
+Typeahead suggestions for topics, domains and mentor names.
+
+Suggestions are answered from a sorted array held in process memory: every
+word start of every label is a lowercased key ("data science", "science"),
+so a lookup bisects to the run of keys starting with the typed prefix and
+takes the best ranked entries from it without touching the database.
+Entries are ranked by use: sessions listing a topic, session requests for
+a domain and ratings of a mentor.
+
+The array is rebuilt lazily. Saves that change a label (see signals.py)
+mark it stale, as does AUTOCOMPLETE_TTL passing, and the next lookup
+starts a rebuild in a background thread while it and any others are still
+answered from the current array. Only the first lookup in a process waits
+for a build.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+TOPIC = 'topic'
+DOMAIN = 'domain'
+MENTOR = 'mentor'
+KINDS = (TOPIC, DOMAIN, MENTOR)
+
+WORD_START_PATTERN = re.compile(r'\b\w')
+SPACE_PATTERN = re.compile(r'\s+')
+
+# Highest code point, so prefix + MAX_CHAR sorts after every key starting with prefix
+MAX_CHAR = '\U0010ffff'
+
+# Prefixes up to this long match long runs of keys, so their ranked
+# matches are worked out when the index is built
+SHORT_PREFIX = 2
+
+
+def normalize(text):
+    """Lowercase `text` and collapse its whitespace."""
+    return SPACE_PATTERN.sub(' ', str(text)).strip().lower()
+
+
+class Suggestion:
+    """One suggestable label: a topic name, domain or mentor."""
+
+    __slots__ = ('kind', 'value', 'label', 'weight')
+
+    def __init__(self, kind, value, label, weight=0):
+        self.kind = kind
+        self.value = value
+        self.label = label
+        self.weight = weight
+
+    def as_dict(self):
+        return {'kind': self.kind, 'value': self.value, 'label': self.label}
+
+
+class SuggestionIndex:
+    """
+    Immutable sorted key array over a list of suggestions.
+    """
+
+    def __init__(self, suggestions):
+        # Position in this list is rank: a lower index is a better match
+        self.suggestions = sorted(suggestions, key=lambda suggestion: (-suggestion.weight, suggestion.label.lower()))
+        self.labels = {(suggestion.kind, suggestion.value): suggestion.label for suggestion in self.suggestions}
+
+        pairs = []
+        for position, suggestion in enumerate(self.suggestions):
+            label = normalize(suggestion.label)
+            for match in WORD_START_PATTERN.finditer(label):
+                pairs.append((label[match.start():], position))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = array('L', (position for _, position in pairs))
+
+        short = {}
+        for key, position in pairs:
+            for length in range(1, min(len(key), SHORT_PREFIX) + 1):
+                short.setdefault(key[:length], set()).add(position)
+        self.short_prefixes = {prefix: array('L', sorted(positions)) for prefix, positions in short.items()}
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def lookup(self, prefix, kinds=None, limit=8):
+        """The `limit` best ranked suggestions of `kinds` with a word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX:
+            positions = self.short_prefixes.get(prefix, ())
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix + MAX_CHAR, start)
+            # A label matching at several words appears once
+            positions = sorted(set(self.positions[start:end]))
+
+        results = []
+        for position in positions:
+            suggestion = self.suggestions[position]
+            if kinds is None or suggestion.kind in kinds:
+                results.append(suggestion)
+                if len(results) == limit:
+                    break
+        return results
+
+
+class Autocomplete:
+    """
+    Lazily rebuilt, in-process SuggestionIndex over the database.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._built_at = 0
+        self._stale = False
+        self._rebuilding = False
+
+    @staticmethod
+    def load():
+        """Every current suggestion, with three queries."""
+        from apps.users.models import CustomUser
+        from .models import Domain, Topic
+
+        suggestions = [
+            Suggestion(TOPIC, name, name, count)
+            for name, count in Topic.objects.in_use().values_list('name', 'session_count')
+        ]
+        suggestions.extend(
+            Suggestion(DOMAIN, domain_id, name, count)
+            for domain_id, name, count in Domain.objects.annotate(
+                requests=Count('session_requests')
+            ).values_list('id', 'name', 'requests')
+        )
+        mentors = CustomUser.objects.filter(role=CustomUser.MENTOR, is_active=True)
+        suggestions.extend(
+            Suggestion(MENTOR, mentor_id, f'{first_name} {last_name}'.strip() or username, count)
+            for mentor_id, username, first_name, last_name, count in mentors.values_list(
+                'id', 'username', 'first_name', 'last_name', '_rating_count'
+            )
+        )
+        return suggestions
+
+    def rebuild(self):
+        """Reload every suggestion and swap in a new index."""
+        with self._lock:
+            # Changes from here on mark the new index stale again
+            self._stale = False
+        index = SuggestionIndex(self.load())
+        with self._lock:
+            self._index = index
+            self._built_at = time.monotonic()
+        return index
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error("Error rebuilding autocomplete index: %s", e)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+            connections.close_all()
+
+    def index(self):
+        """The current index, building it first if there is none yet."""
+        with self._lock:
+            index = self._index
+            expired = self._stale or time.monotonic() - self._built_at > self.ttl
+            if index is not None and expired and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(target=self._rebuild_in_background, name='autocomplete-rebuild', daemon=True).start()
+        if index is None:
+            index = self.rebuild()
+        return index
+
+    def lookup(self, prefix, kinds=None, limit=8):
+        """The `limit` best ranked suggestions of `kinds` (all if None) matching `prefix`."""
+        return self.index().lookup(prefix, kinds, limit)
+
+    def note(self, kind, value, label):
+        """
+        Record that (`kind`, `value`) is now shown as `label`, or no longer
+        suggested if `label` is None. Marks the index stale if it disagrees.
+        """
+        with self._lock:
+            if self._index is not None and self._index.labels.get((kind, value)) != label:
+                self._stale = True
+
+    def clear(self):
+        """Drop the index; the next lookup builds a new one."""
+        with self._lock:
+            self._index = None
+            self._stale = False
+
+
+autocomplete = Autocomplete(ttl=getattr(settings, 'AUTOCOMPLETE_TTL', 300))
@@ -0,0 +1,330 @@
+"""
+Chat history for session rooms.
+
+Each room keeps its last SESSION_CHAT_BUFFER_SIZE messages in a ring buffer
+with monotonic sequence numbers, so reconnecting clients can ask for
+everything after the last sequence they saw and late joiners can page
+through the conversation. Messages are not written one by one: unsaved
+messages are written to the ChatMessage table in one bulk insert when the
+session ends, when a participant disconnects, or in the background once
+SESSION_CHAT_FLUSH_BATCH_SIZE of them have piled up.
+
+Sequence numbers come from a counter shared by every worker serving the
+room: a Redis INCR on SESSION_CHAT_REDIS_URL (it defaults to the first
+channel layer shard), or process memory when there is no Redis, in which
+case the in-memory channel layer keeps a room on one process anyway. Each
+process buffers the messages it receives and those broadcast to its room
+consumers by other workers (see observe()), but only writes its own.
+"""
+import asyncio
+import logging
+from collections import deque
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class RoomChat:
+    """
+    Chat state of one room: recent messages and those not yet saved.
+    """
+
+    def __init__(self, key, session_id, capacity, last_sequence=0, messages=()):
+        self.key = key
+        self.session_id = session_id
+        self.messages = deque(messages, maxlen=capacity)
+        self.pending = []
+        self.last_sequence = last_sequence
+        # Flushes writing now, and whether the room is evicted once they finish
+        self.writing = 0
+        self.closing = False
+
+    @property
+    def oldest_sequence(self):
+        """Sequence of the oldest buffered message."""
+        return self.messages[0]['sequence'] if self.messages else self.last_sequence + 1
+
+
+class ChatSequences:
+    """
+    Hands out a room's next sequence number from process memory.
+    """
+
+    async def next(self, room):
+        return room.last_sequence + 1
+
+
+class RedisChatSequences(ChatSequences):
+    """
+    Hands out sequence numbers from one counter per room on a Redis-protocol
+    server, shared by every worker. A counter that is missing or behind the
+    room's loaded history (after a Redis restart, say) is moved up to it first.
+    """
+
+    KEY_TTL = 24 * 60 * 60
+
+    NEXT_SCRIPT = """
+        local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+        if current < tonumber(ARGV[1]) then
+            redis.call('SET', KEYS[1], ARGV[1])
+        end
+        local sequence = redis.call('INCR', KEYS[1])
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        return sequence
+    """
+
+    def __init__(self, url, prefix='chat'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._next = self.client.register_script(self.NEXT_SCRIPT)
+
+    def allocate(self, room_code, last_sequence):
+        key = f'{self.prefix}:{room_code}:sequence'
+        return int(self._next(keys=[key], args=[last_sequence, self.KEY_TTL]))
+
+    async def next(self, room):
+        return await sync_to_async(self.allocate, thread_sensitive=False)(room.key, room.last_sequence)
+
+
+def get_chat_sequences():
+    """
+    Build the sequence source selected by SESSION_CHAT_REDIS_URL.
+    """
+    url = getattr(settings, 'SESSION_CHAT_REDIS_URL', '')
+    if url:
+        try:
+            return RedisChatSequences(url)
+        except ImportError:
+            logger.warning("redis is not installed; falling back to in-process chat sequences")
+    return ChatSequences()
+
+
+class ChatHistory:
+    """
+    Per-room chat ring buffers with paged replay and a batched writer.
+    """
+
+    def __init__(self, capacity=500, page_size=100, flush_batch_size=200, sequences=None):
+        self.capacity = capacity
+        self.page_size = page_size
+        # Flushing before the buffer wraps means every message that has left
+        # the buffer is already in the database, so replay never has gaps
+        self.flush_batch_size = min(flush_batch_size, capacity)
+        self.sequences = sequences or ChatSequences()
+        self._rooms = {}
+        self._flush_tasks = set()
+
+    @staticmethod
+    def room_key(room_code):
+        """Room codes arrive as UUIDs or URL strings; normalize them."""
+        return str(room_code).lower()
+
+    async def room(self, room_code):
+        """
+        Return the chat state of a room, loading its recent history from the
+        database the first time the room is used in this process.
+        """
+        key = self.room_key(room_code)
+        room = self._rooms.get(key)
+        if room is None:
+            session_id, messages = await self.load(room_code)
+            # Another connection may have loaded the room while we waited
+            room = self._rooms.get(key)
+            if room is None:
+                last_sequence = messages[-1]['sequence'] if messages else 0
+                room = self._rooms[key] = RoomChat(key, session_id, self.capacity, last_sequence, messages)
+        return room
+
+    @sync_to_async
+    def load(self, room_code):
+        """
+        Read a room's session ID and its most recent saved messages.
+        """
+        from .models import Session, ChatMessage
+
+        session_id = Session.objects.filter(room_code=room_code).values_list('id', flat=True).first()
+        if session_id is None:
+            return None, []
+
+        rows = ChatMessage.objects.filter(session_id=session_id).order_by('-sequence')[:self.capacity]
+        return session_id, [self.serialize(row) for row in reversed(rows)]
+
+    @staticmethod
+    def serialize(row):
+        """Convert a ChatMessage row to the message dict sent to clients."""
+        return {
+            'sequence': row.sequence,
+            'user_id': row.sender_id,
+            'username': row.username,
+            'content': row.content,
+            'timestamp': row.sent_at.isoformat(),
+        }
+
+    async def append(self, room_code, user_id, username, content):
+        """
+        Record a chat message and return it with its sequence number.
+        """
+        room = await self.room(room_code)
+        message = {
+            'sequence': await self.sequences.next(room),
+            'user_id': user_id,
+            'username': username,
+            'content': content,
+            'timestamp': timezone.now().isoformat(),
+        }
+        self.remember(room, message)
+        room.pending.append(message)
+
+        if len(room.pending) >= self.flush_batch_size:
+            self.schedule_flush(room_code)
+        return message
+
+    def observe(self, room_code, message):
+        """
+        Buffer a message broadcast to the room, which may have been sent
+        through another worker. Rooms this process has not loaded are skipped.
+        """
+        room = self._rooms.get(self.room_key(room_code))
+        if room is not None:
+            self.remember(room, {key: message[key] for key in ('sequence', 'user_id', 'username', 'content', 'timestamp')})
+
+    def remember(self, room, message):
+        """Add a message to a room's buffer in sequence order, once."""
+        sequence = message['sequence']
+        if sequence > room.last_sequence:
+            room.messages.append(message)
+            room.last_sequence = sequence
+            return
+
+        # Out of order or already buffered; the newest messages are checked first
+        for buffered in reversed(room.messages):
+            if buffered['sequence'] == sequence:
+                return
+            if buffered['sequence'] < sequence:
+                break
+        if room.messages and sequence > room.messages[0]['sequence']:
+            messages = sorted([*room.messages, message], key=lambda buffered: buffered['sequence'])
+            room.messages = deque(messages, maxlen=self.capacity)
+
+    async def replay(self, room_code, after_sequence=0, limit=None):
+        """
+        Return up to one page of messages with a sequence greater than
+        `after_sequence`, and whether more messages follow that page.
+        Pages older than the ring buffer are read from the database.
+        """
+        limit = min(limit or self.page_size, self.page_size)
+        room = await self.room(room_code)
+
+        if after_sequence + 1 >= room.oldest_sequence or room.session_id is None:
+            messages = [m for m in room.messages if m['sequence'] > after_sequence][:limit]
+        else:
+            messages = await self.load_page(room.session_id, after_sequence, limit)
+
+        has_more = bool(messages) and messages[-1]['sequence'] < room.last_sequence
+        return messages, has_more
+
+    @sync_to_async
+    def load_page(self, session_id, after_sequence, limit):
+        """
+        Read one page of saved messages following `after_sequence`.
+        """
+        from .models import ChatMessage
+
+        rows = ChatMessage.objects.filter(
+            session_id=session_id,
+            sequence__gt=after_sequence
+        ).order_by('sequence')[:limit]
+        return [self.serialize(row) for row in rows]
+
+    def schedule_flush(self, room_code, evict=False):
+        """
+        Flush a room in the background, off the caller's critical path.
+        """
+        task = asyncio.ensure_future(self.flush(room_code, evict=evict))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+        return task
+
+    async def flush(self, room_code, evict=False):
+        """
+        Write a room's unsaved messages in one bulk insert. With `evict`, the
+        room's buffer is dropped once everything in it is saved (used once the
+        session has ended); until then its sequence state stays in memory, so
+        messages appended meanwhile are numbered after the unsaved ones.
+        Returns the number of messages written.
+        """
+        key = self.room_key(room_code)
+        room = self._rooms.get(key)
+        if room is None:
+            return 0
+        room.closing = room.closing or evict
+
+        written = 0
+        while room.pending:
+            batch, room.pending = room.pending, []
+            if room.session_id is None:
+                logger.warning("Dropping %s chat messages for unknown room %s", len(batch), room_code)
+                break
+
+            room.writing += 1
+            try:
+                await self.write(room.session_id, batch)
+            except Exception as e:
+                logger.error("Error saving chat messages for room %s: %s", room_code, e)
+                # Keep the messages, and the room, for the next flush
+                room.pending[:0] = batch
+                return written
+            finally:
+                room.writing -= 1
+
+            logger.info("Saved %s chat messages for room %s", len(batch), room_code)
+            written += len(batch)
+            if not room.closing:
+                break
+
+        if room.closing and not room.pending and not room.writing and self._rooms.get(key) is room:
+            del self._rooms[key]
+        return written
+
+    def close(self, room_code):
+        """
+        Save and drop a room's buffer once its session has ended. Safe to
+        call from sync code; rooms this process never loaded are skipped.
+        """
+        if self.room_key(room_code) not in self._rooms:
+            return 0
+        return async_to_sync(self.flush)(room_code, evict=True)
+
+    @sync_to_async
+    def write(self, session_id, batch):
+        """
+        Bulk insert a batch of messages into the chat log. Messages already
+        saved by an earlier, retried flush are skipped.
+        """
+        from .models import ChatMessage
+
+        ChatMessage.objects.bulk_create([
+            ChatMessage(
+                session_id=session_id,
+                sender_id=message['user_id'],
+                username=message['username'] or '',
+                sequence=message['sequence'],
+                content=message['content'] or '',
+                sent_at=parse_datetime(message['timestamp']),
+            )
+            for message in batch
+        ], ignore_conflicts=True)
+
+
+chat_history = ChatHistory(
+    capacity=getattr(settings, 'SESSION_CHAT_BUFFER_SIZE', 500),
+    page_size=getattr(settings, 'SESSION_CHAT_PAGE_SIZE', 100),
+    flush_batch_size=getattr(settings, 'SESSION_CHAT_FLUSH_BATCH_SIZE', 200),
+    sequences=get_chat_sequences(),
+)
@@ -1,24 +1,36 @@
 """
 WebSocket consumers for learning sessions.
 """
+import hashlib
 import json
 import logging
 import asyncio
-from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer, AsyncJsonWebsocketConsumer
-from channels.exceptions import StopConsumer
+from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 
-from .models import Session, Booking
-from apps.users.models import CustomUser
+from apps.core.metrics import InstrumentedConsumerMixin, database_sync_to_async
+from apps.core.ratelimit import RateLimitedConsumerMixin
+from .models import Session
+from .admission import admission_cache
+from .chat import chat_history
+from .dashboard_state import DashboardState, build_session_list
+from .heartbeat import heartbeat
+from .presence import presence
 from apps.notifications.models import Notification
 
 logger = logging.getLogger(__name__)
+
+
+def room_group_name(room_code):
+    """Channel layer group of a session room, hashed to valid characters."""
+    hashed_code = hashlib.md5(str(room_code).encode()).hexdigest()[:8]
+    return f'room_{hashed_code}'
 User = get_user_model()
 
-class SessionsConsumer(AsyncJsonWebsocketConsumer):
+class SessionsConsumer(InstrumentedConsumerMixin, AsyncJsonWebsocketConsumer):
     """
     Consumer for general sessions list subscriptions.
     This handles real-time updates for the sessions list page.
@@ -30,14 +42,14 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
         """
         # Log connection attempt with client info
         client_info = f"{self.scope['client'][0]}:{self.scope['client'][1]}"
-        logger.info(f"WebSocket connection attempt to sessions list from {client_info}")
+        logger.info("WebSocket connection attempt to sessions list from %s", client_info)
         
         # Add to the sessions group
         self.group_name = "sessions_list"
         
         # Accept the connection
         await self.accept()
-        logger.info(f"WebSocket connection accepted for sessions list")
+        logger.info("WebSocket connection accepted for sessions list")
         
         # Set up channel layer if available
         if hasattr(self, 'channel_layer'):
@@ -57,7 +69,7 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
         """
         Called when the WebSocket closes.
         """
-        logger.info(f"WebSocket disconnection from sessions list with code {code}")
+        logger.info("WebSocket disconnection from sessions list with code %s", code)
         
         # Leave the sessions group if channel layer is available
         if hasattr(self, 'channel_layer'):
@@ -72,7 +84,7 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
         """
         # Log the received message type
         message_type = content.get('type', 'unknown')
-        logger.info(f"Received {message_type} message for sessions list")
+        logger.debug("Received %s message for sessions list", message_type)
         
         if message_type == 'get_sessions':
             # Handle request for sessions list
@@ -126,14 +138,14 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
             
         # Validate channel format (e.g., "sessions:123")
         if not channel.startswith(('sessions:', 'session:')):
-            logger.warning(f"Invalid channel format: {channel}")
+            logger.warning("Invalid channel format: %s", channel)
             await self.send_json({
                 'type': 'error',
                 'message': 'Invalid channel format'
             })
             return
             
-        logger.info(f"Subscribing to channel: {channel}")
+        logger.debug("Subscribing to channel: %s", channel)
         
         # Add to the specific group
         await self.channel_layer.group_add(
@@ -162,7 +174,7 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
             })
             return
             
-        logger.info(f"Unsubscribing from channel: {channel}")
+        logger.debug("Unsubscribing from channel: %s", channel)
         
         # Remove from the specific group
         await self.channel_layer.group_discard(
@@ -180,14 +192,13 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
             'message': f'Unsubscribed from {channel}'
         })
         
-    @sync_to_async
+    @database_sync_to_async
     def get_filtered_sessions(self, filters=None):
         """
         Get sessions with the given filters.
         """
         from django.forms.models import model_to_dict
-        from django.db.models import Count, Q
-        from datetime import datetime, timedelta
+        from datetime import datetime
         
         if filters is None:
             filters = {}
@@ -224,36 +235,33 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
         if mentor_id:
             queryset = queryset.filter(mentor_id=mentor_id)
             
-        # Count bookings
-        queryset = queryset.annotate(
-            booking_count=Count('bookings', filter=Q(bookings__status='confirmed'))
-        )
-        
         # Limit results
         limit = int(filters.get('limit', 20))
-        queryset = queryset.order_by('-schedule')[:limit]
+        queryset = queryset.select_related('mentor').order_by('-schedule')[:limit]
         
         # Convert to dicts for JSON serialization
         result = []
         for session in queryset:
             session_dict = model_to_dict(
                 session, 
-                fields=['id', 'title', 'description', 'status', 'room_code']
+                fields=['id', 'title', 'description', 'status']
             )
             
             # Add additional computed fields
             session_dict.update({
+                'room_code': str(session.room_code),
                 'mentor_name': session.mentor.get_full_name() or session.mentor.username,
                 'mentor_id': session.mentor.id,
                 'schedule': session.schedule.isoformat() if session.schedule else None,
                 'duration': session.duration,
                 'price': float(session.price) if session.price else 0,
-                'confirmed_bookings_count': session.booking_count,
+                'confirmed_bookings_count': session.confirmed_bookings_count,
                 'max_participants': session.max_participants,
-                'can_book': session.status == 'scheduled' and session.booking_count < session.max_participants,
+                'can_book': session.can_book,
                 'can_go_live': session.can_go_live,
                 'can_edit': session.status in ['draft', 'scheduled'],
-                'image_url': session.image.url if session.image else None,
+                # Sessions have no image; the key stays for the client
+                'image_url': None,
             })
             
             result.append(session_dict)
@@ -265,55 +273,85 @@ class SessionsConsumer(AsyncJsonWebsocketConsumer):
         Called when a session is updated.
         """
         # Forward the update to the client
+        event.pop('sent_at', None)
         await self.send_json(event)
 
-class SessionConsumer(AsyncWebsocketConsumer):
+class SessionConsumer(InstrumentedConsumerMixin, RateLimitedConsumerMixin, AsyncWebsocketConsumer):
     """
     Consumer for session WebRTC signaling and real-time chat.
     Handles WebRTC offer/answer exchange and ICE candidates.
+    
+    Each connection keeps a registry of the other peers in its room
+    (user_id -> channel_name), built from user_join/peer_announce events.
+    Signaling addressed to a known peer is relayed with a single
+    channel_layer.send instead of a group broadcast.
+    
+    When SESSION_ICE_BATCH_WINDOW_MS is set, ICE candidates are buffered
+    per target for that window and relayed as one `ice_candidates` batch.
+    Clients that did not advertise the `ice_candidates` capability in their
+    join message receive the batch unpacked into single candidates.
+    
+    Chat messages carry a per-room sequence number. A join message's
+    `last_chat_sequence` (or a `chat_history` request's `after_sequence`)
+    is answered with the messages the client missed, one page at a time.
+    
+    Client messages are rate limited per type (WEBSOCKET_RATE_LIMITS['room']).
     """
     
+    SIGNALING_TYPES = ('offer', 'answer', 'ice_candidate', 'ice_candidates')
+    
+    rate_limit_scope = 'room'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peer_channels = {}
+        self.supports_ice_batches = False
+        self.ice_batch_window = getattr(settings, 'SESSION_ICE_BATCH_WINDOW_MS', 0) / 1000
+        self.pending_ice_candidates = {}
+        self.ice_flush_tasks = {}
+    
     async def connect(self):
         """
         Called when the websocket is handshaking.
         """
         try:
             self.room_code = self.scope['url_route']['kwargs']['room_code']
-            # Create a simple alphanumeric group name
-            import hashlib
-            # Create a hash of the room code to ensure we get valid characters
-            hashed_code = hashlib.md5(self.room_code.encode()).hexdigest()[:8]
-            self.room_group_name = f'room_{hashed_code}'
+            self.room_group_name = room_group_name(self.room_code)
             
             # Log connection attempt
-            logger.info(f"WebSocket connection attempt to room {self.room_code} with group {self.room_group_name}")
+            logger.info("WebSocket connection attempt to room %s with group %s", self.room_code, self.room_group_name)
             
-            # Get the session and check permissions
-            session = await self.get_session()
-            if not session:
+            # Get the room's admission data, from cache on reconnects
+            admission = admission_cache.get(self.room_code)
+            from_cache = admission is not None
+            if not from_cache:
+                admission = await self.load_admission()
+            if not admission:
                 # Session doesn't exist
-                logger.warning(f"Session {self.room_code} not found")
+                logger.warning("Session %s not found", self.room_code)
                 await self.close()
                 return
         except Exception as e:
-            logger.error(f"Error in WebSocket connect: {str(e)}")
-            await self.close()
-            return
+            logger.error("Error in WebSocket connect: %s", e)
             await self.close()
             return
         
         user = self.scope['user']
         if not user.is_authenticated:
             # User not authenticated
-            logger.warning(f"Unauthenticated user attempted to join room {self.room_code}")
+            logger.warning("Unauthenticated user attempted to join room %s", self.room_code)
             await self.close()
             return
         
-        # Check if user has permission to join
-        can_join = await self.can_join_session(session, user)
+        # Check if user has permission to join. A cached entry may predate
+        # the user's booking, so re-check the database before refusing.
+        can_join = admission_cache.allows(admission, user)
+        if not can_join and from_cache:
+            admission = await self.load_admission()
+            can_join = bool(admission) and admission_cache.allows(admission, user)
         if not can_join:
             # User doesn't have permission
-            logger.warning(f"User {user.id} ({user.username}) attempted to join room {self.room_code} without permission")
+            logger.warning("User %s (%s) attempted to join room %s without permission", user.id, user.username, self.room_code)
             await self.close()
             return
         
@@ -323,50 +361,80 @@ class SessionConsumer(AsyncWebsocketConsumer):
                 self.room_group_name,
                 self.channel_name
             )
-            logger.info(f"Successfully added to group {self.room_group_name}")
+            logger.debug("Successfully added to group %s", self.room_group_name)
         except Exception as e:
-            logger.error(f"Error joining room group: {str(e)}")
+            logger.error("Error joining room group: %s", e)
             await self.close()
             return
         
-        logger.info(f"User {user.id} ({user.username}) connected to room {self.room_code}")
+        logger.info("User %s (%s) connected to room %s", user.id, user.username, self.room_code)
         
         # Accept the connection
         await self.accept()
         
-        # Store user data
+        await self.join_room(user)
+        
+        # Keep the connection alive from the shared heartbeat scheduler
+        heartbeat.register(self)
+    
+    async def join_room(self, user):
+        """
+        Store user data and announce the new participant to the room.
+        """
         self.user_id = user.id
         self.username = user.get_full_name() or user.username
         
-        # Send user_join message to group as a welcome message
-        await self.channel_layer.group_send(
+        # Register in the room's presence and send the full roster, so a
+        # late joiner knows everyone without waiting for renegotiation
+        await presence.ajoin(self.room_code, self.user_id, self.channel_name, self.username)
+        await self.send(text_data=json.dumps({
+            'type': 'room_roster',
+            'participants': await presence.asnapshot(self.room_code),
+            'timestamp': timezone.now().isoformat(),
+        }))
+        
+        # Send user_join message to group as a welcome message. The channel
+        # name lets every peer add us to its registry for direct relays.
+        await self.group_send(
             self.room_group_name,
             {
                 'type': 'user_join',
                 'user_id': self.user_id,
                 'username': self.username,
+                'channel_name': self.channel_name,
                 'timestamp': timezone.now().isoformat(),
             }
         )
-        
-        # Send ping to keep connection alive
-        await self.start_ping()
     
     async def disconnect(self, code):
         """
         Called when the WebSocket closes for any reason.
         """
         user = self.scope['user']
-        logger.info(f"User {user.id} ({user.username}) disconnected from room {self.room_code}")
+        logger.info("User %s (%s) disconnected from room %s", user.id, user.username, self.room_code)
+        
+        heartbeat.unregister(self)
+        
+        if hasattr(self, 'user_id'):
+            await presence.aleave(self.room_code, self.user_id, self.channel_name)
+            # Save the room's unsaved chat without holding up the disconnect
+            chat_history.schedule_flush(self.room_code)
+        
+        # Drop candidate batches that are still waiting for their window
+        for task in self.ice_flush_tasks.values():
+            task.cancel()
+        self.ice_flush_tasks.clear()
+        self.pending_ice_candidates.clear()
         
         # Send user_leave message to group
         if hasattr(self, 'room_group_name') and hasattr(self, 'channel_layer'):
-            await self.channel_layer.group_send(
+            await self.group_send(
                 self.room_group_name,
                 {
                     'type': 'user_leave',
                     'user_id': user.id,
                     'username': user.get_full_name() or user.username,
+                    'channel_name': self.channel_name,
                     'timestamp': timezone.now().isoformat(),
                 }
             )
@@ -382,7 +450,7 @@ class SessionConsumer(AsyncWebsocketConsumer):
         Called when the consumer receives data from WebSocket.
         """
         if not text_data:
-            logger.warning(f"Received empty message from user {self.user_id} in room {self.room_code}")
+            logger.warning("Received empty message from user %s in room %s", self.user_id, self.room_code)
             return
             
         text_data_json = json.loads(text_data)
@@ -390,51 +458,30 @@ class SessionConsumer(AsyncWebsocketConsumer):
         
         if message_type == 'pong':
             # Received pong response to our ping
+            heartbeat.pong(self)
+            return
+        
+        if not await self.allow_message(message_type):
             return
         
         # Log the message type
-        logger.debug(f"Received message type: {message_type} from user {self.user_id}")
+        logger.debug("Received message type: %s from user %s", message_type, self.user_id)
         
         # Handle different message types
-        if message_type == 'offer':
-            # WebRTC offer message
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'signaling_message',
-                    'message': text_data_json,
-                    'user_id': self.user_id,
-                    'username': self.username,
-                }
-            )
+        if message_type == 'ice_candidate' and self.ice_batch_window:
+            # Coalesce candidate bursts into a single batch per target
+            self.buffer_ice_candidate(text_data_json)
         
-        elif message_type == 'answer':
-            # WebRTC answer message
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'signaling_message',
-                    'message': text_data_json,
-                    'user_id': self.user_id,
-                    'username': self.username,
-                }
-            )
-        
-        elif message_type == 'ice_candidate':
-            # ICE candidate message
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'signaling_message',
-                    'message': text_data_json,
-                    'user_id': self.user_id,
-                    'username': self.username,
-                }
-            )
+        elif message_type in self.SIGNALING_TYPES:
+            # WebRTC offer, answer or ICE candidate message. Flush buffered
+            # candidates first so the peer sees them in the order sent.
+            await self.flush_ice_candidates(self.get_target_user_id(text_data_json))
+            await self.relay_signaling(text_data_json)
         
         elif message_type == 'join':
             # Join message (new participant entering)
-            await self.channel_layer.group_send(
+            self.supports_ice_batches = 'ice_candidates' in (text_data_json.get('capabilities') or [])
+            await self.group_send(
                 self.room_group_name,
                 {
                     'type': 'user_join',
@@ -443,23 +490,35 @@ class SessionConsumer(AsyncWebsocketConsumer):
                     'timestamp': timezone.now().isoformat(),
                 }
             )
+            # Replay the chat messages this client has not seen yet
+            await self.send_chat_history(text_data_json.get('last_chat_sequence') or 0)
+        
+        elif message_type == 'chat_history':
+            # Next page of chat history requested by the client
+            await self.send_chat_history(text_data_json.get('after_sequence') or 0)
         
         elif message_type == 'chat_message':
-            # Chat message
-            await self.channel_layer.group_send(
+            # Chat message, recorded in the room's history before broadcast
+            message = await chat_history.append(
+                self.room_code,
+                self.user_id,
+                self.username,
+                text_data_json.get('content'),
+            )
+            await self.group_send(
                 self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'user_id': text_data_json.get('user_id'),
-                    'username': text_data_json.get('username'),
-                    'content': text_data_json.get('content'),
-                    'timestamp': timezone.now().isoformat(),
-                }
+                {'type': 'chat_message', **message}
             )
         
         elif message_type == 'media_status':
             # Media status update from a participant
-            await self.channel_layer.group_send(
+            await presence.aset_media(
+                self.room_code,
+                self.user_id,
+                text_data_json.get('audioEnabled'),
+                text_data_json.get('videoEnabled'),
+            )
+            await self.group_send(
                 self.room_group_name,
                 {
                     'type': 'media_status',
@@ -472,19 +531,115 @@ class SessionConsumer(AsyncWebsocketConsumer):
             )
         
         elif message_type == 'session_ended':
-            # Session ended by mentor
-            await self.channel_layer.group_send(
+            # Session ended by mentor; only the mentor may end it, and only
+            # then is the room told (and its chat written and evicted)
+            if not await self.end_session():
+                logger.warning("User %s tried to end session %s", self.user_id, self.room_code)
+                return
+            await self.group_send(
                 self.room_group_name,
                 {
                     'type': 'session_ended',
-                    'user_id': text_data_json.get('user_id'),
-                    'username': text_data_json.get('username'),
+                    'user_id': self.user_id,
+                    'username': self.username,
                     'timestamp': timezone.now().isoformat(),
                 }
             )
-            
-            # Update session status in database
-            await self.end_session()
+    
+    async def send_chat_history(self, after_sequence):
+        """
+        Send the client one page of chat messages after `after_sequence`.
+        """
+        try:
+            after_sequence = int(after_sequence)
+        except (TypeError, ValueError):
+            after_sequence = 0
+        
+        messages, has_more = await chat_history.replay(self.room_code, after_sequence)
+        await self.send(text_data=json.dumps({
+            'type': 'chat_history',
+            'messages': messages,
+            'has_more': has_more,
+            'timestamp': timezone.now().isoformat(),
+        }))
+    
+    async def relay_signaling(self, message):
+        """
+        Deliver a signaling message to its target peer, falling back to the
+        whole room group when the target is unknown or not specified.
+        """
+        event = {
+            'type': 'signaling_message',
+            'message': message,
+            'user_id': self.user_id,
+            'username': self.username,
+        }
+        
+        target_channel = self.peer_channels.get(self.get_target_user_id(message))
+        
+        if target_channel:
+            await self.channel_send(target_channel, event)
+        else:
+            await self.group_send(self.room_group_name, event)
+    
+    @staticmethod
+    def get_target_user_id(message):
+        """
+        Return the recipient of a signaling message as an int so registry
+        lookups match whether the client sent a number or a string.
+        room.js sends the recipient as `target`; accept both spellings.
+        """
+        try:
+            return int(message.get('target_user_id', message.get('target')))
+        except (TypeError, ValueError):
+            return None
+    
+    def buffer_ice_candidate(self, message):
+        """
+        Queue an ICE candidate and schedule a flush for its target.
+        """
+        target_user_id = self.get_target_user_id(message)
+        self.pending_ice_candidates.setdefault(target_user_id, []).append(message)
+        
+        if target_user_id not in self.ice_flush_tasks:
+            self.ice_flush_tasks[target_user_id] = asyncio.ensure_future(
+                self.flush_ice_candidates_later(target_user_id)
+            )
+    
+    async def flush_ice_candidates_later(self, target_user_id):
+        """
+        Flush the candidates buffered for a target once the window closes.
+        """
+        await asyncio.sleep(self.ice_batch_window)
+        try:
+            await self.flush_ice_candidates(target_user_id)
+        except Exception as e:
+            logger.error("Error flushing ICE candidates in room %s: %s", self.room_code, e)
+    
+    async def flush_ice_candidates(self, target_user_id):
+        """
+        Relay the candidates buffered for a target, as a single
+        `ice_candidates` batch when there is more than one.
+        """
+        task = self.ice_flush_tasks.pop(target_user_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        
+        candidates = self.pending_ice_candidates.pop(target_user_id, None)
+        if not candidates:
+            return
+        
+        if len(candidates) == 1:
+            await self.relay_signaling(candidates[0])
+            return
+        
+        first = candidates[0]
+        await self.relay_signaling({
+            'type': 'ice_candidates',
+            'target': first.get('target_user_id', first.get('target')),
+            'user_id': first.get('user_id'),
+            'candidates': [candidate.get('candidate') for candidate in candidates],
+        })
     
     async def signaling_message(self, event):
         """
@@ -492,9 +647,26 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         message = event['message']
         
+        if message.get('type') == 'ice_candidates' and not self.supports_ice_batches:
+            # Unpack batches for clients that only understand single candidates
+            for candidate in message['candidates']:
+                await self.send(text_data=json.dumps({
+                    'type': 'ice_candidate',
+                    'target': message.get('target'),
+                    'user_id': message.get('user_id'),
+                    'candidate': candidate,
+                }))
+            return
+        
         # Send message to WebSocket
         await self.send(text_data=json.dumps(message))
     
+    async def peer_announce(self, event):
+        """
+        Register an existing room participant that answered our user_join.
+        """
+        self.peer_channels[event['user_id']] = event['channel_name']
+    
     async def media_status(self, event):
         """
         Forward media status updates to clients.
@@ -513,6 +685,16 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         Send user_join notification to clients.
         """
+        # Register the new peer and tell it how to reach us directly
+        peer_channel = event.get('channel_name')
+        if peer_channel and peer_channel != self.channel_name and hasattr(self, 'user_id'):
+            self.peer_channels[event['user_id']] = peer_channel
+            await self.channel_send(peer_channel, {
+                'type': 'peer_announce',
+                'user_id': self.user_id,
+                'channel_name': self.channel_name,
+            })
+        
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'user_join',
@@ -525,6 +707,10 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         Send user_leave notification to clients.
         """
+        # Forget the peer unless it has already reconnected on a new channel
+        if self.peer_channels.get(event['user_id']) == event.get('channel_name'):
+            del self.peer_channels[event['user_id']]
+        
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'user_leave',
@@ -537,9 +723,14 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         Send chat message to clients.
         """
+        # Keep this process's replay buffer complete, whichever worker
+        # the message was sent through
+        chat_history.observe(self.room_code, event)
+        
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'chat_message',
+            'sequence': event['sequence'],
             'user_id': event['user_id'],
             'username': event['username'],
             'content': event['content'],
@@ -550,6 +741,10 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         Notify clients that session was ended.
         """
+        # Write the transcript; every consumer in the room gets this event,
+        # later calls find nothing left to save
+        chat_history.schedule_flush(self.room_code, evict=True)
+        
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'session_ended',
@@ -558,6 +753,13 @@ class SessionConsumer(AsyncWebsocketConsumer):
             'timestamp': event['timestamp'],
         }))
         
+    async def chat_closed(self, event):
+        """
+        Save and drop the room's chat buffer after the session was ended
+        outside the room (see signals.close_room_chat).
+        """
+        chat_history.schedule_flush(self.room_code, evict=True)
+    
     async def session_status_update(self, event):
         """
         Handle session status updates from the API.
@@ -573,53 +775,14 @@ class SessionConsumer(AsyncWebsocketConsumer):
             'timestamp': timezone.now().isoformat(),
         }))
     
-    async def start_ping(self):
+    @database_sync_to_async
+    def load_admission(self):
         """
-        Start periodic ping to keep connection alive.
+        Load the room's admission data from the database into the cache.
         """
-        while True:
-            try:
-                await self.send(text_data=json.dumps({
-                    'type': 'ping',
-                    'timestamp': timezone.now().isoformat(),
-                }))
-                
-                # Wait for 30 seconds before sending another ping
-                await asyncio.sleep(30)
-            except Exception as e:
-                logger.error(f"Error sending ping: {str(e)}")
-                break
+        return admission_cache.load(self.room_code)
     
-    @sync_to_async
-    def get_session(self):
-        """
-        Get session by room code from the database.
-        """
-        try:
-            return Session.objects.get(room_code=self.room_code)
-        except Session.DoesNotExist:
-            return None
-    
-    @sync_to_async
-    def can_join_session(self, session, user):
-        """
-        Check if user has permission to join the session.
-        """
-        # Mentor can always join their own sessions
-        if session.mentor == user:
-            return True
-        
-        # Learners need a confirmed booking
-        if user.is_learner:
-            return Booking.objects.filter(
-                session=session,
-                learner=user,
-                status=Booking.CONFIRMED
-            ).exists()
-        
-        return False
-    
-    @sync_to_async
+    @database_sync_to_async
     def end_session(self):
         """
         Mark session as completed in the database.
@@ -629,37 +792,50 @@ class SessionConsumer(AsyncWebsocketConsumer):
             
             # Only allow mentor to end session
             user = self.scope['user']
-            if session.mentor != user:
-                return
+            if session.mentor_id != user.id:
+                return False
             
             # Update session status
             session.status = Session.COMPLETED
             session.save()
             
             # Log session completion
-            logger.info(f"Session {self.room_code} marked as completed by {user.id} ({user.username})")
+            logger.info("Session %s marked as completed by %s (%s)", self.room_code, user.id, user.username)
             
             return True
         except Session.DoesNotExist:
-            logger.warning(f"Attempted to end non-existent session {self.room_code}")
+            logger.warning("Attempted to end non-existent session %s", self.room_code)
             return False
         except Exception as e:
-            logger.error(f"Error ending session {self.room_code}: {str(e)}")
+            logger.error("Error ending session %s: %s", self.room_code, e)
             return False
 
 
-class DashboardConsumer(AsyncJsonWebsocketConsumer):
+class DashboardConsumer(InstrumentedConsumerMixin, RateLimitedConsumerMixin, AsyncJsonWebsocketConsumer):
     """
     Consumer for dashboard real-time updates.
     This handles updates for sessions, requests, and other dashboard content.
+    
+    Client messages are rate limited per type (WEBSOCKET_RATE_LIMITS['dashboard']),
+    so a client looping get_data cannot tie up the database thread pool.
+    
+    Each connection keeps a materialized, versioned copy of its dashboard
+    (see dashboard_state.py). It is built in full on the first get_data, when
+    the client reports a different version, or once DASHBOARD_STATE_MAX_AGE
+    has passed; session_update, booking_update and session_request_update
+    events rebuild only the affected sections and carry a JSON Patch from
+    `base_version` to `version`.
     """
     
+    rate_limit_scope = 'dashboard'
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user = None
         self.user_id = None
         self.group_name = None
         self.subscribed_channels = set()
+        self.dashboard_state = None
     
     async def connect(self):
         """
@@ -669,14 +845,14 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         self.user_id = self.scope['url_route']['kwargs']['user_id']
         client_info = f"{self.scope['client'][0]}:{self.scope['client'][1]}"
         
-        logger.info(f"WebSocket connection attempt to dashboard for user {self.user_id} from {client_info}")
+        logger.info("WebSocket connection attempt to dashboard for user %s from %s", self.user_id, client_info)
         
         # Create a group name for this user's dashboard
         self.group_name = f"dashboard_{self.user_id}"
         
         # Accept the connection
         await self.accept()
-        logger.info(f"WebSocket connection accepted for dashboard of user {self.user_id}")
+        logger.info("WebSocket connection accepted for dashboard of user %s", self.user_id)
         
         # Join the user-specific dashboard group
         if hasattr(self, 'channel_layer'):
@@ -686,7 +862,7 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             )
             
             # Log successful group join
-            logger.info(f"Added to channel group: {self.group_name}")
+            logger.debug("Added to channel group: %s", self.group_name)
         
         # Send welcome message with confirmation of connection
         await self.send_json({
@@ -699,7 +875,7 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         """
         Called when the WebSocket closes for any reason.
         """
-        logger.info(f"WebSocket disconnected for dashboard of user {self.user_id} with code {close_code}")
+        logger.info("WebSocket disconnected for dashboard of user %s with code %s", self.user_id, close_code)
         
         # Leave the group
         if hasattr(self, 'channel_layer'):
@@ -709,19 +885,22 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             )
             
             # Log group leave
-            logger.info(f"Removed from channel group: {self.group_name}")
+            logger.debug("Removed from channel group: %s", self.group_name)
     
     async def receive_json(self, content):
         """
         Called when we get a text frame from the client.
         """
         message_type = content.get('type', '')
-        logger.info(f"Received dashboard message from user {self.user_id}: {message_type}")
+        logger.debug("Received dashboard message from user %s: %s", self.user_id, message_type)
+        
+        if not await self.allow_message(message_type):
+            return
         
         # Handle different message types
         if message_type == 'get_data':
-            # Fetch and send dashboard data
-            await self.send_dashboard_data()
+            # Send dashboard data, rebuilt only if the client's version differs
+            await self.send_dashboard_data(content.get('version'))
         elif message_type == 'ping':
             # Respond to ping with pong
             await self.send_json({
@@ -771,198 +950,52 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             # Mark all notifications as read
             await self.mark_all_notifications_read()
         else:
-            logger.warning(f"Unknown message type received: {message_type}")
+            logger.warning("Unknown message type received: %s", message_type)
     
-    async def send_dashboard_data(self):
+    async def send_dashboard_data(self, client_version=None):
         """
-        Fetch and send dashboard data to the client.
+        Send the full dashboard to the client. The materialized state is
+        rebuilt on first use, when it is too old, or when the client's
+        version does not match it.
         """
-        user_role = 'mentor' if self.scope['user'].is_mentor else 'learner'
-        
-        # Different data based on user role
-        if user_role == 'mentor':
-            data = await self.get_mentor_dashboard_data()
-        else:
-            data = await self.get_learner_dashboard_data()
+        if self.dashboard_state is None:
+            user = self.scope['user']
+            self.dashboard_state = DashboardState(user, 'mentor' if user.is_mentor else 'learner')
         
-        await self.send_json({
-            'type': 'dashboard_data',
-            'user_role': user_role,
-            'data': data,
-            'timestamp': timezone.now().isoformat()
-        })
+        state = self.dashboard_state
+        if state.is_stale or (client_version is not None and client_version != state.version):
+            await self.rebuild_dashboard_state()
         
-    @sync_to_async
-    def get_mentor_dashboard_data(self):
+        await self.send_json({'type': 'dashboard_data', **state.snapshot()})
+    
+    @database_sync_to_async
+    def rebuild_dashboard_state(self):
         """
-        Get dashboard data for mentors.
+        Recompute every section of the dashboard state.
         """
-        from django.db.models import Count
-        from django.forms.models import model_to_dict
-        from .models import Session, SessionRequest
-        from apps.payments.models import Payment
-        
-        mentor = self.scope['user']
-        
-        # Get recent sessions
-        recent_sessions = Session.objects.filter(
-            mentor=mentor
-        ).order_by('-created_at')[:5]
-        
-        # Get upcoming sessions
-        upcoming_sessions = Session.objects.filter(
-            mentor=mentor, 
-            status='scheduled'
-        ).order_by('schedule')[:5]
-        
-        # Get session requests
-        session_requests = SessionRequest.objects.filter(
-            mentor=mentor,
-            status='pending'
-        ).order_by('-created_at')[:5]
-        
-        # Count metrics
-        total_sessions = Session.objects.filter(mentor=mentor).count()
-        active_sessions = Session.objects.filter(mentor=mentor, status__in=['scheduled', 'live']).count()
-        completed_sessions = Session.objects.filter(mentor=mentor, status='completed').count()
-        
-        # Count payments
-        total_earnings = Payment.objects.filter(
-            booking__session__mentor=mentor,
-            status='completed'
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
-        
-        # Format data
-        formatted_recent_sessions = []
-        for session in recent_sessions:
-            session_dict = model_to_dict(session, fields=['id', 'title', 'status', 'room_code'])
-            session_dict.update({
-                'schedule': session.schedule.isoformat() if session.schedule else None,
-                'schedule_formatted': session.schedule.strftime('%b %d, %Y %I:%M %p') if session.schedule else None,
-                'price': float(session.price) if session.price else 0,
-                'confirmed_bookings_count': session.bookings.filter(status='confirmed').count(),
-                'can_go_live': session.can_go_live,
-                'learner_names': [b.learner.get_full_name() for b in session.bookings.filter(status='confirmed')],
-            })
-            formatted_recent_sessions.append(session_dict)
-        
-        formatted_upcoming_sessions = []
-        for session in upcoming_sessions:
-            session_dict = model_to_dict(session, fields=['id', 'title', 'status', 'room_code'])
-            session_dict.update({
-                'schedule': session.schedule.isoformat() if session.schedule else None,
-                'schedule_formatted': session.schedule.strftime('%b %d, %Y %I:%M %p') if session.schedule else None,
-                'price': float(session.price) if session.price else 0,
-                'confirmed_bookings_count': session.bookings.filter(status='confirmed').count(),
-                'can_go_live': session.can_go_live,
-                'countdown': session.get_time_until_start(),
-                'learner_names': [b.learner.get_full_name() for b in session.bookings.filter(status='confirmed')],
-            })
-            formatted_upcoming_sessions.append(session_dict)
-        
-        formatted_requests = []
-        for request in session_requests:
-            request_dict = model_to_dict(request, fields=['id', 'title', 'description', 'status'])
-            request_dict.update({
-                'learner_name': request.learner.get_full_name(),
-                'learner_id': request.learner.id,
-                'created_at': request.created_at.isoformat(),
-                'created_at_formatted': request.created_at.strftime('%b %d, %Y'),
-            })
-            formatted_requests.append(request_dict)
-        
-        return {
-            'metrics': {
-                'total_sessions': total_sessions,
-                'active_sessions': active_sessions,
-                'completed_sessions': completed_sessions,
-                'pending_requests': session_requests.count(),
-                'total_earnings': float(total_earnings),
-            },
-            'recent_sessions': formatted_recent_sessions,
-            'upcoming_sessions': formatted_upcoming_sessions,
-            'session_requests': formatted_requests,
-        }
-        
-    @sync_to_async
-    def get_learner_dashboard_data(self):
+        return self.dashboard_state.rebuild()
+    
+    @database_sync_to_async
+    def apply_dashboard_event(self, event_type, sections=None):
         """
-        Get dashboard data for learners.
+        Rebuild the dashboard sections affected by an event.
         """
-        from django.db.models import Count
-        from django.forms.models import model_to_dict
-        from .models import Session, Booking
-        
-        learner = self.scope['user']
-        
-        # Get recent bookings
-        recent_bookings = Booking.objects.filter(
-            learner=learner
-        ).order_by('-created_at')[:5]
-        
-        # Get upcoming bookings
-        upcoming_bookings = Booking.objects.filter(
-            learner=learner, 
-            status='confirmed',
-            session__status='scheduled'
-        ).order_by('session__schedule')[:5]
-        
-        # Count metrics
-        total_bookings = Booking.objects.filter(learner=learner).count()
-        upcoming_count = Booking.objects.filter(
-            learner=learner, 
-            status='confirmed',
-            session__status='scheduled'
-        ).count()
-        completed_count = Booking.objects.filter(
-            learner=learner, 
-            session__status='completed'
-        ).count()
-        
-        # Format bookings
-        formatted_recent_bookings = []
-        for booking in recent_bookings:
-            session = booking.session
-            booking_dict = model_to_dict(booking, fields=['id', 'status'])
-            booking_dict.update({
-                'session_id': session.id,
-                'session_title': session.title,
-                'session_status': session.status,
-                'mentor_name': session.mentor.get_full_name(),
-                'mentor_id': session.mentor.id,
-                'schedule': session.schedule.isoformat() if session.schedule else None,
-                'schedule_formatted': session.schedule.strftime('%b %d, %Y %I:%M %p') if session.schedule else None,
-                'price': float(session.price) if session.price else 0,
-                'room_code': session.room_code,
-            })
-            formatted_recent_bookings.append(booking_dict)
-        
-        formatted_upcoming_bookings = []
-        for booking in upcoming_bookings:
-            session = booking.session
-            booking_dict = model_to_dict(booking, fields=['id', 'status'])
-            booking_dict.update({
-                'session_id': session.id,
-                'session_title': session.title,
-                'session_status': session.status,
-                'mentor_name': session.mentor.get_full_name(),
-                'mentor_id': session.mentor.id,
-                'schedule': session.schedule.isoformat() if session.schedule else None,
-                'schedule_formatted': session.schedule.strftime('%b %d, %Y %I:%M %p') if session.schedule else None,
-                'price': float(session.price) if session.price else 0,
-                'countdown': session.get_time_until_start(),
-                'room_code': session.room_code,
-            })
-            formatted_upcoming_bookings.append(booking_dict)
+        return self.dashboard_state.apply_event(event_type, sections)
+    
+    async def dashboard_delta(self, event):
+        """
+        Return the patch fields for an update event: the JSON Patch taking
+        the client from `base_version` to `version`. Empty if the dashboard
+        was never sent to this client.
+        """
+        if self.dashboard_state is None or self.dashboard_state.data is None:
+            return {}
         
+        base_version, patch = await self.apply_dashboard_event(event['type'], event.get('sections'))
         return {
-            'metrics': {
-                'total_bookings': total_bookings,
-                'upcoming_count': upcoming_count,
-                'completed_count': completed_count,
-            },
-            'recent_bookings': formatted_recent_bookings,
-            'upcoming_bookings': formatted_upcoming_bookings,
+            'base_version': base_version,
+            'version': self.dashboard_state.version,
+            'patch': patch,
         }
     
     async def fetch_sessions(self, filters=None):
@@ -983,142 +1016,13 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             'timestamp': timezone.now().isoformat()
         })
         
-    @sync_to_async
+    @database_sync_to_async
     def get_filtered_sessions(self, filters=None):
         """
-        Get sessions with the given filters.
+        Get sessions with the given filters (see build_session_list).
         """
-        from django.forms.models import model_to_dict
-        from django.db.models import Count, Q
-        from datetime import datetime, timedelta
-        from .models import Session, Booking
-        
-        if filters is None:
-            filters = {}
-            
-        user = self.scope['user']
-        
-        # Different filtering logic for mentors and learners
-        if user.is_mentor:
-            # For mentors, show only their sessions
-            queryset = Session.objects.filter(mentor=user)
-            
-            # Apply status filter if provided
-            status = filters.get('status')
-            if status:
-                queryset = queryset.filter(status=status)
-                
-            # Apply date filters if provided
-            date_filter = filters.get('date')
-            if date_filter == 'today':
-                today = datetime.now().date()
-                queryset = queryset.filter(
-                    schedule__date=today
-                )
-            elif date_filter == 'upcoming':
-                now = datetime.now()
-                queryset = queryset.filter(
-                    schedule__gt=now,
-                    status='scheduled'
-                )
-            elif date_filter == 'past':
-                now = datetime.now()
-                queryset = queryset.filter(
-                    Q(schedule__lt=now) | Q(status='completed')
-                )
-        else:
-            # For learners, show their bookings
-            booking_queryset = Booking.objects.filter(learner=user)
-            
-            # Apply status filter if provided
-            status = filters.get('status')
-            if status:
-                booking_queryset = booking_queryset.filter(status=status)
-                
-            # Get session IDs from bookings
-            session_ids = booking_queryset.values_list('session_id', flat=True)
-            
-            # Get the sessions
-            queryset = Session.objects.filter(id__in=session_ids)
-            
-            # Apply date filters if provided
-            date_filter = filters.get('date')
-            if date_filter == 'today':
-                today = datetime.now().date()
-                queryset = queryset.filter(
-                    schedule__date=today
-                )
-            elif date_filter == 'upcoming':
-                now = datetime.now()
-                queryset = queryset.filter(
-                    schedule__gt=now,
-                    status='scheduled'
-                )
-            elif date_filter == 'past':
-                now = datetime.now()
-                queryset = queryset.filter(
-                    Q(schedule__lt=now) | Q(status='completed')
-                )
-                
-        # Count bookings
-        queryset = queryset.annotate(
-            booking_count=Count('bookings', filter=Q(bookings__status='confirmed'))
-        )
-        
-        # Limit and order results
-        limit = int(filters.get('limit', 20))
-        ordering = filters.get('ordering', '-schedule')
-        queryset = queryset.order_by(ordering)[:limit]
-        
-        # Convert to dicts for JSON serialization
-        result = []
-        for session in queryset:
-            session_dict = model_to_dict(
-                session, 
-                fields=['id', 'title', 'description', 'status', 'room_code']
-            )
-            
-            # Add additional computed fields
-            session_dict.update({
-                'mentor_name': session.mentor.get_full_name() or session.mentor.username,
-                'mentor_id': session.mentor.id,
-                'schedule': session.schedule.isoformat() if session.schedule else None,
-                'schedule_formatted': session.schedule.strftime('%b %d, %Y %I:%M %p') if session.schedule else None,
-                'duration': session.duration,
-                'price': float(session.price) if session.price else 0,
-                'confirmed_bookings_count': session.booking_count,
-                'max_participants': session.max_participants,
-                'can_book': session.status == 'scheduled' and session.booking_count < session.max_participants,
-                'can_go_live': session.can_go_live,
-                'can_edit': session.status in ['draft', 'scheduled'],
-                'countdown': session.get_time_until_start(),
-                'image_url': session.image.url if session.image else None,
-            })
-            
-            # Add booking information if available (for learners)
-            if not user.is_mentor:
-                try:
-                    booking = Booking.objects.get(session=session, learner=user)
-                    session_dict['booking'] = {
-                        'id': booking.id,
-                        'status': booking.status,
-                        'created_at': booking.created_at.isoformat(),
-                        'price': float(session.price) if session.price else 0,
-                    }
-                except Booking.DoesNotExist:
-                    session_dict['booking'] = None
-                    
-            # Add learner names for mentors
-            if user.is_mentor:
-                session_dict['learner_names'] = [
-                    b.learner.get_full_name() for b in 
-                    session.bookings.filter(status='confirmed')
-                ]
-                
-            result.append(session_dict)
-            
-        return result
-            
+        return build_session_list(self.scope['user'], filters or {})
+    
     # Channel layer message handlers
     async def subscribe_to_channel(self, channel):
         """
@@ -1130,14 +1034,14 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         # Validate channel format
         valid_prefixes = ('sessions:', 'session:', 'booking:')
         if not any(channel.startswith(prefix) for prefix in valid_prefixes):
-            logger.warning(f"Invalid channel format: {channel}")
+            logger.warning("Invalid channel format: %s", channel)
             await self.send_json({
                 'type': 'error',
                 'message': 'Invalid channel format'
             })
             return
             
-        logger.info(f"Subscribing to channel: {channel}")
+        logger.debug("Subscribing to channel: %s", channel)
         
         # Add to the specific group
         await self.channel_layer.group_add(
@@ -1166,7 +1070,7 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             })
             return
             
-        logger.info(f"Unsubscribing from channel: {channel}")
+        logger.debug("Unsubscribing from channel: %s", channel)
         
         # Remove from the specific group
         await self.channel_layer.group_discard(
@@ -1188,8 +1092,6 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         """
         Mark notification as read.
         """
-        from apps.notifications.models import Notification
-        
         success = await self.mark_notification_read_in_db(notification_id)
         
         if success:
@@ -1199,13 +1101,11 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
                 'notification_id': notification_id
             })
             
-    @sync_to_async
+    @database_sync_to_async
     def mark_notification_read_in_db(self, notification_id):
         """
         Mark notification as read in the database.
         """
-        from apps.notifications.models import Notification
-        
         try:
             notification = Notification.objects.get(id=notification_id, recipient=self.scope['user'])
             if not notification.read:
@@ -1214,7 +1114,7 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
                 notification.save()
             return True
         except Notification.DoesNotExist:
-            logger.warning(f"Notification {notification_id} not found for user {self.user_id}")
+            logger.warning("Notification %s not found for user %s", notification_id, self.user_id)
             return False
             
     async def mark_all_notifications_read(self):
@@ -1229,13 +1129,11 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
             'count': count
         })
         
-    @sync_to_async
+    @database_sync_to_async
     def mark_all_notifications_read_in_db(self):
         """
         Mark all notifications as read in the database.
         """
-        from apps.notifications.models import Notification
-        
         count = Notification.objects.filter(
             recipient=self.scope['user'],
             read=False
@@ -1250,10 +1148,17 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         """
         Handle session update messages from the channel layer.
         """
-        logger.info(f"Received session_update event for user {self.user_id}: {event}")
+        logger.debug("Received session_update event for user %s: %s", self.user_id, event)
+        
+        # Model change events only matter if they changed this dashboard
+        delta = await self.dashboard_delta(event)
+        if event.get('delta_only') and not delta.get('patch'):
+            return
         
         # Forward the update to the client
         await self.send_json({
+            **delta,
+            'delta_only': event.get('delta_only', False),
             'type': 'session_update',
             'session_id': event.get('session_id'),
             'status': event.get('status'),
@@ -1263,16 +1168,23 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         })
         
         # Log the successful delivery
-        logger.info(f"Sent session update to client for user {self.user_id}")
+        logger.debug("Sent session update to client for user %s", self.user_id)
         
     async def booking_update(self, event):
         """
         Handle booking update messages from the channel layer.
         """
-        logger.info(f"Received booking_update event for user {self.user_id}: {event}")
+        logger.debug("Received booking_update event for user %s: %s", self.user_id, event)
+        
+        # Model change events only matter if they changed this dashboard
+        delta = await self.dashboard_delta(event)
+        if event.get('delta_only') and not delta.get('patch'):
+            return
         
         # Forward the update to the client
         await self.send_json({
+            **delta,
+            'delta_only': event.get('delta_only', False),
             'type': 'booking_update',
             'booking_id': event.get('booking_id'),
             'session_id': event.get('session_id'),
@@ -1283,16 +1195,23 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         })
         
         # Log the successful delivery
-        logger.info(f"Sent booking update to client for user {self.user_id}")
+        logger.debug("Sent booking update to client for user %s", self.user_id)
         
     async def session_request_update(self, event):
         """
         Handle session request update messages.
         """
-        logger.info(f"Received session_request_update event for user {self.user_id}: {event}")
+        logger.debug("Received session_request_update event for user %s: %s", self.user_id, event)
+        
+        # Model change events only matter if they changed this dashboard
+        delta = await self.dashboard_delta(event)
+        if event.get('delta_only') and not delta.get('patch'):
+            return
         
         # Forward the update to the client
         await self.send_json({
+            **delta,
+            'delta_only': event.get('delta_only', False),
             'type': 'session_request_update',
             'request_id': event.get('request_id'),
             'status': event.get('status'),
@@ -1302,13 +1221,13 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         })
         
         # Log the successful delivery
-        logger.info(f"Sent session request update to client for user {self.user_id}")
+        logger.debug("Sent session request update to client for user %s", self.user_id)
         
     async def notification_update(self, event):
         """
         Handle notification update messages.
         """
-        logger.info(f"Received notification_update event for user {self.user_id}: {event}")
+        logger.debug("Received notification_update event for user %s: %s", self.user_id, event)
         
         # Forward the update to the client
         await self.send_json({
@@ -1318,4 +1237,4 @@ class DashboardConsumer(AsyncJsonWebsocketConsumer):
         })
         
         # Log the successful delivery
-        logger.info(f"Sent notification update to client for user {self.user_id}")
\ No newline at end of file
+        logger.debug("Sent notification update to client for user %s", self.user_id)
@@ -3,6 +3,7 @@ WebSocket consumer for mentor and learner dashboards.
 """
 
 import json
+import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
@@ -11,6 +12,8 @@ from .models import Session, Booking, SessionRequest
 from apps.notifications.models import Notification
 from apps.users.models import CustomUser
 
+logger = logging.getLogger(__name__)
+
 class DashboardConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time updates in the dashboard.
@@ -21,27 +24,27 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         Called when the websocket is handshaking.
         """
         try:
-            print(f"WebSocket connection attempt from {self.scope.get('client')}")
+            logger.info("WebSocket connection attempt from %s", self.scope.get('client'))
             
             # Get authenticated user
             user = self.scope.get('user')
             
             if not user or not user.is_authenticated:
                 # Reject the connection if user is not authenticated
-                print("WebSocket connection rejected: User not authenticated")
+                logger.warning("WebSocket connection rejected: User not authenticated")
                 await self.close(code=4001)
                 return
             
             # Get user ID from URL path
             user_id = self.scope['url_route']['kwargs'].get('user_id')
             if not user_id:
-                print("WebSocket connection rejected: No user_id in URL path")
+                logger.warning("WebSocket connection rejected: No user_id in URL path")
                 await self.close(code=4004)
                 return
                 
             # Ensure the user is connecting to their own dashboard
             if str(user.id) != str(user_id):
-                print(f"WebSocket connection rejected: User ID mismatch. URL: {user_id}, Authenticated: {user.id}")
+                logger.warning("WebSocket connection rejected: User ID mismatch. URL: %s, Authenticated: %s", user_id, user.id)
                 await self.close(code=4003)
                 return
                 
@@ -51,7 +54,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             
             # Accept the WebSocket connection first
             await self.accept()
-            print(f"WebSocket connection accepted for user {user.id}")
+            logger.info("WebSocket connection accepted for user %s", user.id)
             
             # Send a welcome message immediately to ensure connection is working
             try:
@@ -60,19 +63,19 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     'message': f'Connected to dashboard for user {user.id}',
                     'timestamp': timezone.now().isoformat()
                 }))
-                print(f"Sent welcome message to user {user.id}")
+                logger.debug("Sent welcome message to user %s", user.id)
             except Exception as e:
-                print(f"Error sending welcome message: {str(e)}")
+                logger.error("Error sending welcome message: %s", e)
             
             # Join the dashboard group - make sure channel layer is available
             try:
                 from channels.layers import get_channel_layer
                 if not hasattr(self, 'channel_layer') or self.channel_layer is None:
                     self.channel_layer = get_channel_layer()
-                    print(f"Retrieved channel layer: {self.channel_layer.__class__.__name__}")
+                    logger.debug("Retrieved channel layer: %s", self.channel_layer.__class__.__name__)
                 
                 if not self.channel_layer:
-                    print("ERROR: Failed to get channel layer")
+                    logger.error("ERROR: Failed to get channel layer")
                     await self.send(text_data=json.dumps({
                         'error': 'Channel layer not available',
                         'type': 'connection_error'
@@ -80,7 +83,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     await self.close(code=4002)
                     return
             except Exception as e:
-                print(f"ERROR getting channel layer: {str(e)}")
+                logger.error("ERROR getting channel layer: %s", e)
                 await self.send(text_data=json.dumps({
                     'error': f'Failed to get channel layer: {str(e)}',
                     'type': 'connection_error'
@@ -94,7 +97,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     self.dashboard_group_name,
                     self.channel_name
                 )
-                print(f"Added to group: {self.dashboard_group_name}")
+                logger.debug("Added to group: %s", self.dashboard_group_name)
                 
                 # Send another confirmation after joining group
                 await self.send(text_data=json.dumps({
@@ -103,7 +106,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     'timestamp': timezone.now().isoformat()
                 }))
             except Exception as e:
-                print(f"Error joining group: {str(e)}")
+                logger.error("Error joining group: %s", e)
                 await self.send(text_data=json.dumps({
                     'error': f'Failed to join group: {str(e)}',
                     'type': 'connection_error'
@@ -114,16 +117,16 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             # Send initial dashboard data
             try:
                 await self.send_dashboard_data()
-                print(f"Sent initial dashboard data to user {user.id}")
+                logger.debug("Sent initial dashboard data to user %s", user.id)
             except Exception as e:
-                print(f"Error sending dashboard data: {str(e)}")
+                logger.error("Error sending dashboard data: %s", e)
                 await self.send(text_data=json.dumps({
                     'error': f'Error loading dashboard data: {str(e)}',
                     'type': 'data_error'
                 }))
             
         except Exception as e:
-            print(f"Error in WebSocket connect: {str(e)}")
+            logger.error("Error in WebSocket connect: %s", e)
             # Try to send an error message before closing
             try:
                 await self.send(text_data=json.dumps({
@@ -143,9 +146,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             user_id = "unknown"
             if hasattr(self, 'user') and self.user:
                 user_id = self.user.id
-                print(f"WebSocket disconnection: User {user_id} with code {code}")
+                logger.info("WebSocket disconnection: User %s with code %s", user_id, code)
             else:
-                print(f"WebSocket disconnection: Unknown user with code {code}")
+                logger.warning("WebSocket disconnection: Unknown user with code %s", code)
                 
             # Get a better description of the close code
             code_descriptions = {
@@ -160,7 +163,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 4004: "No user ID in URL"
             }
             close_reason = code_descriptions.get(code, "Unknown reason")
-            print(f"Close reason: {close_reason}")
+            logger.debug("Close reason: %s", close_reason)
             
             # Leave dashboard group
             if hasattr(self, 'dashboard_group_name') and hasattr(self, 'channel_layer'):
@@ -168,9 +171,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     self.dashboard_group_name,
                     self.channel_name
                 )
-                print(f"User {user_id} removed from dashboard group: {self.dashboard_group_name}")
+                logger.debug("User %s removed from dashboard group: %s", user_id, self.dashboard_group_name)
         except Exception as e:
-            print(f"Error in dashboard consumer disconnect: {str(e)}")
+            logger.error("Error in dashboard consumer disconnect: %s", e)
     
     async def receive(self, text_data=None, bytes_data=None):
         """
@@ -178,14 +181,14 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         """
         try:
             if not text_data:
-                print("Received empty WebSocket message")
+                logger.debug("Received empty WebSocket message")
                 return
                 
-            print(f"Received WebSocket message: {text_data[:100]}...")
+            logger.debug("Received WebSocket message: %s...", text_data[:100])
             data = json.loads(text_data)
             action = data.get('action')
             
-            print(f"Processing WebSocket action: {action}")
+            logger.debug("Processing WebSocket action: %s", action)
             
             # Handle message type if action is not specified
             message_type = data.get('type')
@@ -197,10 +200,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 # Request dashboard data
                 try:
                     await self.send_dashboard_data()
-                    print(f"Sent dashboard data to user {self.user.id}")
+                    logger.debug("Sent dashboard data to user %s", self.user.id)
                 except Exception as e:
-                    error_msg = f"Error sending dashboard data: {str(e)}"
-                    print(error_msg)
+                    logger.error("Error sending dashboard data: %s", e)
                     await self.send(text_data=json.dumps({
                         'type': 'error',
                         'message': 'Error loading dashboard data',
@@ -220,15 +222,14 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                             'timestamp': timezone.now().isoformat()
                         }))
                     except Exception as notify_error:
-                        error_msg = f"Error marking notification read: {str(notify_error)}"
-                        print(error_msg)
+                        logger.error("Error marking notification read: %s", notify_error)
                         await self.send(text_data=json.dumps({
                             'type': 'error',
                             'message': 'Failed to mark notification as read',
                             'details': str(notify_error)
                         }))
                 else:
-                    print("Missing notification_id in mark_notification_read action")
+                    logger.warning("Missing notification_id in mark_notification_read action")
                     await self.send(text_data=json.dumps({
                         'type': 'error',
                         'message': 'Missing notification ID'
@@ -237,7 +238,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             elif action == 'mark_all_notifications_read':
                 # Mark all notifications as read
                 try:
-                    print(f"Marking all notifications read for user {self.user.id}")
+                    logger.debug("Marking all notifications read for user %s", self.user.id)
                     # Use await with database_sync_to_async functions
                     result = await database_sync_to_async(self.mark_all_notifications_read)()
                     
@@ -249,8 +250,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                         'timestamp': timezone.now().isoformat()
                     }))
                 except Exception as notify_error:
-                    error_msg = f"Error marking all notifications read: {str(notify_error)}"
-                    print(error_msg)
+                    logger.error("Error marking all notifications read: %s", notify_error)
                     await self.send(text_data=json.dumps({
                         'type': 'error',
                         'message': 'Failed to mark all notifications as read',
@@ -262,22 +262,21 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 await self.send_dashboard_data()
                 
             else:
-                print(f"Unknown WebSocket action received: {action}")
+                logger.warning("Unknown WebSocket action received: %s", action)
                 await self.send(text_data=json.dumps({
                     'type': 'error',
                     'message': f'Unknown action: {action if action else "No action specified"}'
                 }))
                 
         except json.JSONDecodeError as json_err:
-            print(f"Invalid JSON received in WebSocket message: {str(json_err)}")
+            logger.error("Invalid JSON received in WebSocket message: %s", json_err)
             await self.send(text_data=json.dumps({
                 'type': 'error',
                 'message': 'Invalid message format',
                 'details': 'Message is not valid JSON'
             }))
         except Exception as e:
-            error_msg = f"Error in dashboard consumer receive: {str(e)}"
-            print(error_msg)
+            logger.error("Error in dashboard consumer receive: %s", e)
             try:
                 await self.send(text_data=json.dumps({
                     'type': 'error',
@@ -285,14 +284,14 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     'details': str(e)
                 }))
             except Exception as send_err:
-                print(f"Error sending error response: {str(send_err)}")
+                logger.error("Error sending error response: %s", send_err)
     
     async def session_update(self, event):
         """
         Called when there's an update to a session.
         """
         try:
-            print(f"Received session_update event: action={event.get('action')}, session_id={event.get('session', {}).get('id')}")
+            logger.debug("Received session_update event: action=%s, session_id=%s", event.get('action'), event.get('session', {}).get('id'))
             
             # Forward the update to the client
             await self.send(text_data=json.dumps({
@@ -302,9 +301,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 'timestamp': timezone.now().isoformat()
             }))
             
-            print(f"Sent session_update to client: action={event.get('action')}")
+            logger.debug("Sent session_update to client: action=%s", event.get('action'))
         except Exception as e:
-            print(f"Error in session_update handler: {str(e)}")
+            logger.error("Error in session_update handler: %s", e)
     
     async def booking_update(self, event):
         """
@@ -525,13 +524,13 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             notification = Notification.objects.get(id=notification_id, user=self.user)
             notification.read = True
             notification.save()
-            print(f"Marked notification {notification_id} as read for user {self.user.id}")
+            logger.debug("Marked notification %s as read for user %s", notification_id, self.user.id)
             return True
         except Notification.DoesNotExist:
-            print(f"Notification {notification_id} not found for user {self.user.id}")
+            logger.warning("Notification %s not found for user %s", notification_id, self.user.id)
             return False
         except Exception as e:
-            print(f"Error marking notification {notification_id} as read: {str(e)}")
+            logger.error("Error marking notification %s as read: %s", notification_id, e)
             return False
     
     def mark_all_notifications_read(self):
@@ -541,13 +540,13 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         try:
             # Update all unread notifications for this user
             count = Notification.objects.filter(user=self.user, read=False).update(read=True)
-            print(f"Marked {count} notifications as read for user {self.user.id}")
+            logger.debug("Marked %s notifications as read for user %s", count, self.user.id)
             return {
                 'success': True,
                 'count': count
             }
         except Exception as e:
-            print(f"Error marking all notifications as read: {str(e)}")
+            logger.error("Error marking all notifications as read: %s", e)
             return {
                 'success': False,
                 'count': 0,
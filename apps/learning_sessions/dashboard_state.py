@@ -0,0 +1,415 @@
+"""
+Materialized dashboard state for DashboardConsumer.
+
+The dashboard is split into sections, each built by one small query set:
+for mentors the session counters, earnings, recent and upcoming sessions
+and pending requests; for learners the booking counters and recent and
+upcoming bookings. A connection builds every section once (on connect, or
+when the client reports a version mismatch) and keeps the result with a
+version number. Model changes arrive as session_update, booking_update and
+session_request_update events; only the sections an event can affect are
+rebuilt, and the client is sent a JSON Patch (RFC 6902) from the previous
+version to the new one.
+"""
+import time
+
+from django.conf import settings
+from django.db.models import Count, Prefetch, Q, Sum
+from django.utils import timezone
+
+MENTOR = 'mentor'
+LEARNER = 'learner'
+
+# Sections rebuilt for each dashboard event, by the dashboard owner's role
+EVENT_SECTIONS = {
+    MENTOR: {
+        'session_update': ('session_metrics', 'recent_sessions', 'upcoming_sessions'),
+        'booking_update': ('recent_sessions', 'upcoming_sessions', 'earnings'),
+        'session_request_update': ('session_requests',),
+    },
+    LEARNER: {
+        'session_update': ('booking_metrics', 'recent_bookings', 'upcoming_bookings'),
+        'booking_update': ('booking_metrics', 'recent_bookings', 'upcoming_bookings'),
+        'session_request_update': (),
+    },
+}
+
+
+def format_schedule(session):
+    """Return the ISO and display forms of a session's schedule."""
+    if not session.schedule:
+        return None, None
+    return session.schedule.isoformat(), session.schedule.strftime('%b %d, %Y %I:%M %p')
+
+
+def build_session_metrics(mentor):
+    """Session counters for a mentor, in one aggregate query."""
+    from .models import Session
+
+    return {'metrics': Session.objects.filter(mentor=mentor).aggregate(
+        total_sessions=Count('id'),
+        active_sessions=Count('id', filter=Q(status__in=[Session.SCHEDULED, Session.LIVE])),
+        completed_sessions=Count('id', filter=Q(status=Session.COMPLETED)),
+    )}
+
+
+def build_earnings(mentor):
+    """Total completed payments for a mentor's sessions."""
+    from apps.payments.models import Payment
+
+    total = Payment.objects.filter(
+        booking__session__mentor=mentor,
+        status='completed'
+    ).aggregate(total=Sum('amount'))['total'] or 0
+    return {'metrics': {'total_earnings': float(total)}}
+
+
+def mentor_sessions(queryset, with_countdown=False):
+    """Format a mentor's sessions with their confirmed learners prefetched."""
+    from .models import Booking
+
+    confirmed = Prefetch(
+        'bookings',
+        queryset=Booking.objects.filter(status=Booking.CONFIRMED).select_related('learner'),
+        to_attr='confirmed_bookings'
+    )
+    sessions = []
+    for session in queryset.prefetch_related(confirmed):
+        schedule, schedule_formatted = format_schedule(session)
+        session_dict = {
+            'id': session.id,
+            'title': session.title,
+            'status': session.status,
+            'room_code': str(session.room_code),
+            'schedule': schedule,
+            'schedule_formatted': schedule_formatted,
+            'price': float(session.price) if session.price else 0,
+            'confirmed_bookings_count': len(session.confirmed_bookings),
+            'can_go_live': session.can_go_live,
+            'learner_names': [b.learner.get_full_name() for b in session.confirmed_bookings],
+        }
+        if with_countdown:
+            session_dict['countdown'] = session.get_time_until_start()
+        sessions.append(session_dict)
+    return sessions
+
+
+def build_recent_sessions(mentor):
+    """The mentor's five most recently created sessions."""
+    from .models import Session
+
+    return {'recent_sessions': mentor_sessions(
+        Session.objects.filter(mentor=mentor).order_by('-created_at')[:5]
+    )}
+
+
+def build_upcoming_sessions(mentor):
+    """The mentor's next five scheduled sessions."""
+    from .models import Session
+
+    return {'upcoming_sessions': mentor_sessions(
+        Session.objects.filter(mentor=mentor, status=Session.SCHEDULED).order_by('schedule')[:5],
+        with_countdown=True
+    )}
+
+
+def build_session_requests(mentor):
+    """The mentor's pending requests and how many there are."""
+    from .models import SessionRequest
+
+    pending = SessionRequest.objects.filter(mentor=mentor, status='pending')
+    requests = []
+    for request in pending.select_related('learner').order_by('-created_at')[:5]:
+        requests.append({
+            'id': request.id,
+            'title': request.title,
+            'description': request.description,
+            'status': request.status,
+            'learner_name': request.learner.get_full_name(),
+            'learner_id': request.learner.id,
+            'created_at': request.created_at.isoformat(),
+            'created_at_formatted': request.created_at.strftime('%b %d, %Y'),
+        })
+    return {
+        'metrics': {'pending_requests': pending.count()},
+        'session_requests': requests,
+    }
+
+
+def build_booking_metrics(learner):
+    """Booking counters for a learner, in one aggregate query."""
+    from .models import Booking, Session
+
+    return {'metrics': Booking.objects.filter(learner=learner).aggregate(
+        total_bookings=Count('id'),
+        upcoming_count=Count('id', filter=Q(status=Booking.CONFIRMED, session__status=Session.SCHEDULED)),
+        completed_count=Count('id', filter=Q(session__status=Session.COMPLETED)),
+    )}
+
+
+def learner_bookings(queryset, with_countdown=False):
+    """Format a learner's bookings with their sessions and mentors joined."""
+    bookings = []
+    for booking in queryset.select_related('session__mentor'):
+        session = booking.session
+        schedule, schedule_formatted = format_schedule(session)
+        booking_dict = {
+            'id': booking.id,
+            'status': booking.status,
+            'session_id': session.id,
+            'session_title': session.title,
+            'session_status': session.status,
+            'mentor_name': session.mentor.get_full_name(),
+            'mentor_id': session.mentor.id,
+            'schedule': schedule,
+            'schedule_formatted': schedule_formatted,
+            'price': float(session.price) if session.price else 0,
+            'room_code': str(session.room_code),
+        }
+        if with_countdown:
+            booking_dict['countdown'] = session.get_time_until_start()
+        bookings.append(booking_dict)
+    return bookings
+
+
+def build_recent_bookings(learner):
+    """The learner's five most recent bookings."""
+    from .models import Booking
+
+    return {'recent_bookings': learner_bookings(
+        Booking.objects.filter(learner=learner).order_by('-created_at')[:5]
+    )}
+
+
+def build_upcoming_bookings(learner):
+    """The learner's next five confirmed bookings of scheduled sessions."""
+    from .models import Booking, Session
+
+    return {'upcoming_bookings': learner_bookings(
+        Booking.objects.filter(
+            learner=learner,
+            status=Booking.CONFIRMED,
+            session__status=Session.SCHEDULED
+        ).order_by('session__schedule')[:5],
+        with_countdown=True
+    )}
+
+
+def filter_session_dates(queryset, date_filter):
+    """Narrow sessions to the dashboard's today, upcoming or past tab."""
+    now = timezone.now()
+    if date_filter == 'today':
+        return queryset.filter(schedule__date=timezone.localdate())
+    if date_filter == 'upcoming':
+        return queryset.filter(schedule__gt=now, status='scheduled')
+    if date_filter == 'past':
+        return queryset.filter(Q(schedule__lt=now) | Q(status='completed'))
+    return queryset
+
+
+def build_session_list(user, filters):
+    """
+    The sessions list for fetch_sessions: a mentor's own sessions with their
+    confirmed learners, or the sessions a learner booked with that booking.
+    Takes three queries at most, whatever the page size.
+    """
+    from .models import Booking, Session
+
+    if user.is_mentor:
+        queryset = Session.objects.filter(mentor=user)
+        if filters.get('status'):
+            queryset = queryset.filter(status=filters['status'])
+    else:
+        booked = Booking.objects.filter(learner=user)
+        if filters.get('status'):
+            booked = booked.filter(status=filters['status'])
+        queryset = Session.objects.filter(id__in=booked.values('session_id'))
+    queryset = filter_session_dates(queryset, filters.get('date'))
+
+    limit = int(filters.get('limit', 20))
+    queryset = queryset.select_related('mentor').order_by(filters.get('ordering', '-schedule'))[:limit]
+    if user.is_mentor:
+        queryset = queryset.prefetch_related(Prefetch(
+            'bookings',
+            queryset=Booking.objects.filter(status=Booking.CONFIRMED).select_related('learner'),
+            to_attr='confirmed_bookings'
+        ))
+    sessions = list(queryset)
+
+    bookings = {}
+    if sessions and not user.is_mentor:
+        bookings = {
+            booking.session_id: booking
+            for booking in Booking.objects.filter(learner=user, session__in=[session.id for session in sessions])
+        }
+
+    result = []
+    for session in sessions:
+        schedule, schedule_formatted = format_schedule(session)
+        session_dict = {
+            'id': session.id,
+            'title': session.title,
+            'description': session.description,
+            'status': session.status,
+            'room_code': str(session.room_code),
+            'mentor_name': session.mentor.get_full_name() or session.mentor.username,
+            'mentor_id': session.mentor.id,
+            'schedule': schedule,
+            'schedule_formatted': schedule_formatted,
+            'duration': session.duration,
+            'price': float(session.price) if session.price else 0,
+            'confirmed_bookings_count': session.confirmed_bookings_count,
+            'max_participants': session.max_participants,
+            'can_book': session.can_book,
+            'can_go_live': session.can_go_live,
+            'can_edit': session.status in ['draft', 'scheduled'],
+            'countdown': session.get_time_until_start(),
+            # Sessions have no image; the key stays for the client
+            'image_url': None,
+        }
+        if user.is_mentor:
+            session_dict['learner_names'] = [b.learner.get_full_name() for b in session.confirmed_bookings]
+        else:
+            booking = bookings.get(session.id)
+            session_dict['booking'] = booking and {
+                'id': booking.id,
+                'status': booking.status,
+                'created_at': booking.created_at.isoformat(),
+                'price': float(session.price) if session.price else 0,
+            }
+        result.append(session_dict)
+    return result
+
+
+SECTION_BUILDERS = {
+    MENTOR: {
+        'session_metrics': build_session_metrics,
+        'earnings': build_earnings,
+        'session_requests': build_session_requests,
+        'recent_sessions': build_recent_sessions,
+        'upcoming_sessions': build_upcoming_sessions,
+    },
+    LEARNER: {
+        'booking_metrics': build_booking_metrics,
+        'recent_bookings': build_recent_bookings,
+        'upcoming_bookings': build_upcoming_bookings,
+    },
+}
+
+
+def build_sections(user, role, sections=None):
+    """
+    Build the named dashboard sections (all of them by default) for a user.
+    Metrics from several sections are merged into one `metrics` dict.
+    Must run in a sync context.
+    """
+    builders = SECTION_BUILDERS[role]
+    data = {}
+    for name in sections if sections is not None else builders:
+        for key, value in builders[name](user).items():
+            if key == 'metrics':
+                data.setdefault('metrics', {}).update(value)
+            else:
+                data[key] = value
+    return data
+
+
+def escape_pointer(key):
+    """Escape a key for use in a JSON Pointer (RFC 6901)."""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def diff(old, new, path=''):
+    """
+    Return JSON Patch operations turning `old` into `new`. Dicts and
+    equal-length lists are compared element by element; anything else
+    that differs is replaced whole.
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            if key not in new:
+                operations.append({'op': 'remove', 'path': f'{path}/{escape_pointer(key)}'})
+        for key, value in new.items():
+            child = f'{path}/{escape_pointer(key)}'
+            if key not in old:
+                operations.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                operations.extend(diff(old[key], value, child))
+        return operations
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        operations = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            operations.extend(diff(old_item, new_item, f'{path}/{index}'))
+        return operations
+
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class DashboardState:
+    """
+    One connection's materialized dashboard and its version.
+    """
+
+    def __init__(self, user, role):
+        self.user = user
+        self.role = role
+        self.version = 0
+        self.data = None
+        self.built_at = 0
+
+    @property
+    def is_stale(self):
+        """True if the state was never built or is older than DASHBOARD_STATE_MAX_AGE."""
+        max_age = getattr(settings, 'DASHBOARD_STATE_MAX_AGE', 300)
+        return self.data is None or time.monotonic() - self.built_at > max_age
+
+    def rebuild(self):
+        """Recompute every section. Must run in a sync context."""
+        self.data = build_sections(self.user, self.role)
+        self.version += 1
+        self.built_at = time.monotonic()
+        return self.data
+
+    def apply_event(self, event_type, sections=None):
+        """
+        Rebuild the sections affected by a dashboard event and return
+        (base_version, patch). The version only moves if something changed.
+        Must run in a sync context.
+        """
+        base_version = self.version
+        if self.data is None:
+            return base_version, []
+
+        affected = EVENT_SECTIONS[self.role].get(event_type, ())
+        if sections is not None:
+            affected = [name for name in affected if name in sections]
+        if not affected:
+            return base_version, []
+
+        updated = build_sections(self.user, self.role, affected)
+        new_data = dict(self.data)
+        for key, value in updated.items():
+            if key == 'metrics':
+                new_data['metrics'] = {**self.data.get('metrics', {}), **value}
+            else:
+                new_data[key] = value
+
+        patch = diff(self.data, new_data)
+        if patch:
+            self.data = new_data
+            self.version += 1
+        return base_version, patch
+
+    def snapshot(self):
+        """Return the full dashboard frame payload."""
+        return {
+            'user_role': self.role,
+            'data': self.data,
+            'version': self.version,
+            'timestamp': timezone.now().isoformat(),
+        }
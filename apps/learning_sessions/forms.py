@@ -22,7 +22,7 @@ class SessionForm(forms.ModelForm):
                 format='%Y-%m-%dT%H:%M'
             ),
             'topics': forms.TextInput(
-                attrs={'placeholder': 'Enter topics separated by commas'}
+                attrs={'placeholder': 'Enter topics separated by commas', 'data-autocomplete': 'topic'}
             ),
             'description': forms.Textarea(
                 attrs={'rows': 5, 'placeholder': 'Describe what will be covered in this session...'}
@@ -48,6 +48,9 @@ class SessionRequestForm(forms.ModelForm):
             'proposed_time', 'duration', 'budget'
         ]
         widgets = {
+            'title': forms.TextInput(
+                attrs={'data-autocomplete': 'topic,domain'}
+            ),
             'proposed_time': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
                 format='%Y-%m-%dT%H:%M'
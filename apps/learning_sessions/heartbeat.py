@@ -0,0 +1,146 @@
+"""
+Process-wide keep-alive scheduler for session room WebSockets.
+
+Instead of every SessionConsumer running its own ping loop, connections
+register here and a single task per event loop pings them from a heap
+ordered by due time. A connection that misses SESSION_HEARTBEAT_MAX_MISSED
+pongs in a row is closed, which makes the server dispatch its disconnect
+handler (and therefore the room's user_leave).
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatScheduler:
+    """
+    Ping registered connections every `interval` seconds in batches.
+
+    Registered objects only need async `send(text_data=...)` and `close()`
+    methods, so consumers and synthetic benchmark connections both work.
+    """
+
+    def __init__(self, interval=30, max_missed=2, batch_size=500):
+        self.interval = interval
+        self.max_missed = max_missed
+        self.batch_size = batch_size
+        # Heap of (due_time, sequence, connection); stale entries are skipped
+        self._heap = []
+        # connection -> {'sequence': int, 'awaiting_pong': bool, 'missed': int}
+        self._connections = {}
+        self._counter = itertools.count()
+        self._task = None
+        self._loop = None
+
+    def __len__(self):
+        return len(self._connections)
+
+    def register(self, connection):
+        """
+        Start keeping a connection alive. Must be called from the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (e.g. a fresh asyncio.run) invalidates old state
+            self._heap.clear()
+            self._connections.clear()
+            self._task = None
+            self._loop = loop
+
+        sequence = next(self._counter)
+        self._connections[connection] = {'sequence': sequence, 'awaiting_pong': False, 'missed': 0}
+        heapq.heappush(self._heap, (loop.time() + self.interval, sequence, connection))
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def unregister(self, connection):
+        """
+        Stop pinging a connection; its heap entry is dropped lazily.
+        """
+        self._connections.pop(connection, None)
+
+    def pong(self, connection):
+        """
+        Record that a connection answered its last ping.
+        """
+        state = self._connections.get(connection)
+        if state:
+            state['awaiting_pong'] = False
+            state['missed'] = 0
+
+    async def _run(self):
+        """
+        Sleep until the next ping is due, then ping every due connection.
+        Exits once nothing is registered; register() restarts it.
+        """
+        loop = asyncio.get_running_loop()
+        while self._connections:
+            if not self._heap:
+                break
+
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            now = loop.time()
+            ping = json.dumps({'type': 'ping', 'timestamp': timezone.now().isoformat()})
+            batch = []
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                _, sequence, connection = heapq.heappop(self._heap)
+                state = self._connections.get(connection)
+                if state is None or state['sequence'] != sequence:
+                    continue
+
+                if state['awaiting_pong']:
+                    state['missed'] += 1
+                if state['missed'] >= self.max_missed:
+                    self.unregister(connection)
+                    batch.append(self._close(connection))
+                    continue
+
+                state['awaiting_pong'] = True
+                heapq.heappush(self._heap, (now + self.interval, sequence, connection))
+                batch.append(self._ping(connection, ping))
+
+            if batch:
+                await asyncio.gather(*batch)
+            else:
+                # Only stale entries were due; let other tasks run
+                await asyncio.sleep(0)
+
+        self._task = None
+
+    async def _ping(self, connection, ping):
+        """
+        Send a ping frame, dropping connections that can no longer be written to.
+        """
+        try:
+            await connection.send(text_data=ping)
+        except Exception as e:
+            logger.error("Error sending ping: %s", e)
+            self.unregister(connection)
+
+    async def _close(self, connection):
+        """
+        Close a connection that stopped answering pings.
+        """
+        logger.info("Closing unresponsive room connection after %s missed pongs", self.max_missed)
+        try:
+            await connection.close()
+        except Exception as e:
+            logger.error("Error closing unresponsive connection: %s", e)
+
+
+heartbeat = HeartbeatScheduler(
+    interval=getattr(settings, 'SESSION_HEARTBEAT_INTERVAL', 30),
+    max_missed=getattr(settings, 'SESSION_HEARTBEAT_MAX_MISSED', 2),
+)
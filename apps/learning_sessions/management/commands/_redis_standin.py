@@ -0,0 +1,138 @@
+"""
+In-process Redis pub/sub stand-in for the channel layer benchmark.
+
+Serves the part of the Redis protocol RedisPubSubChannelLayer uses
+(HELLO, SUBSCRIBE, UNSUBSCRIBE, PUBLISH and PING, over RESP2 or the RESP3
+redis-py negotiates by default) on loopback ports, one server
+per shard, from a background thread with its own event loop. Messages
+cross a real socket and redis-py's parser on both sides, so the benchmark
+measures the layer's serialization, sharding and connection handling
+without a Redis server. It does not run Lua, so RedisChannelLayer, whose
+group_send is a script, still needs a real server.
+"""
+import asyncio
+import threading
+
+
+def bulk(value):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def array(*items, kind=b'*'):
+    return kind + b'%d\r\n' % len(items) + b''.join(items)
+
+
+def integer(value):
+    return b':%d\r\n' % value
+
+
+class PubSubServer:
+    """One stand-in shard: channel name -> subscribed (writer, frame kind) pairs."""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f'redis://{host}:{port}/0'
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.serve, '127.0.0.1', 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    async def read_command(reader):
+        """Read one command sent as an array of bulk strings, or None at EOF."""
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    async def serve(self, reader, writer):
+        subscribed = set()
+        # Pub/sub frames are pushes under RESP3
+        push = b'*'
+        try:
+            while (command := await self.read_command(reader)) is not None:
+                name, args = command[0].upper(), command[1:]
+                if name == b'HELLO':
+                    protocol = int(args[0]) if args else 2
+                    push = b'>' if protocol == 3 else b'*'
+                    fields = (bulk(b'server'), bulk(b'redis'), bulk(b'version'), bulk(b'7.0.0'), bulk(b'proto'), integer(protocol))
+                    writer.write(b'%3\r\n' + b''.join(fields) if protocol == 3 else array(*fields))
+                elif name == b'SUBSCRIBE':
+                    for channel in args:
+                        subscribed.add(channel)
+                        self.subscribers.setdefault(channel, set()).add((writer, push))
+                        writer.write(array(bulk(b'subscribe'), bulk(channel), integer(len(subscribed)), kind=push))
+                elif name == b'UNSUBSCRIBE':
+                    for channel in args or list(subscribed) or [None]:
+                        if channel is not None:
+                            subscribed.discard(channel)
+                            self.subscribers.get(channel, set()).discard((writer, push))
+                        writer.write(array(
+                            bulk(b'unsubscribe'),
+                            bulk(channel) if channel is not None else b'$-1\r\n',
+                            integer(len(subscribed)),
+                            kind=push,
+                        ))
+                elif name == b'PUBLISH':
+                    channel, message = args
+                    receivers = self.subscribers.get(channel, ())
+                    for receiver, kind in receivers:
+                        receiver.write(array(bulk(b'message'), bulk(channel), bulk(message), kind=kind))
+                    writer.write(integer(len(receivers)))
+                elif name == b'PING':
+                    writer.write(array(bulk(b'pong'), bulk(b'')) if subscribed and push == b'*' else b'+PONG\r\n')
+                elif name in (b'CLIENT', b'SELECT', b'AUTH'):
+                    writer.write(b'+OK\r\n')
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % command[0])
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.subscribers.get(channel, set()).discard((writer, push))
+            writer.close()
+
+
+class PubSubStandIn:
+    """
+    `shards` stand-in servers running on a background thread; use as a
+    context manager and pass `urls` as the channel layer's hosts.
+    """
+
+    def __init__(self, shards=1):
+        self.servers = [PubSubServer() for _ in range(shards)]
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    @property
+    def urls(self):
+        return [server.url for server in self.servers]
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def __enter__(self):
+        self.thread.start()
+        for server in self.servers:
+            self.run(server.start())
+        return self
+
+    def __exit__(self, *exc_info):
+        for server in self.servers:
+            self.run(server.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -0,0 +1,101 @@
+"""
+In-process room harness shared by the room benchmark commands.
+
+Drives real SessionConsumer instances over the configured channel layer
+without sockets or database access: each consumer gets a synthetic user,
+a pump task dispatching channel layer messages to its handlers, and a
+`send` that records every frame written to the client.
+"""
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+from channels.layers import get_channel_layer
+
+from apps.learning_sessions.consumers import SessionConsumer
+
+
+class RoomHarness:
+    """A single room of SessionConsumer peers joined over the channel layer."""
+
+    def __init__(self, consumer_class=SessionConsumer):
+        self.consumer_class = consumer_class
+        self.channel_layer = get_channel_layer()
+        self.room_code = str(uuid.uuid4())
+        self.room_group_name = f'room_{uuid.uuid4().hex[:8]}'
+        self.consumers = []
+        self.pumps = []
+        self.frames = []
+        # Messages delivered to consumers by the channel layer, by type
+        self.layer_messages = {}
+        self.dispatched = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for pump in self.pumps:
+            pump.cancel()
+        for consumer in self.consumers:
+            await consumer.disconnect(1000)
+
+    def count_layer_message(self, message):
+        """Count channel layer deliveries by event (and signaling message) type."""
+        key = message.get('type')
+        if key == 'signaling_message':
+            key = message['message'].get('type')
+        self.layer_messages[key] = self.layer_messages.get(key, 0) + 1
+
+    async def add_peer(self, user_id, **attributes):
+        """Join a new peer to the room and wait for the join to settle."""
+        user = SimpleNamespace(
+            id=user_id,
+            username=f'peer{user_id}',
+            is_authenticated=True,
+            get_full_name=lambda: '',
+        )
+        consumer = self.consumer_class()
+        consumer.scope = {'user': user, 'url_route': {'kwargs': {'room_code': self.room_code}}}
+        consumer.channel_layer = self.channel_layer
+        consumer.channel_name = await self.channel_layer.new_channel()
+        consumer.room_code = self.room_code
+        consumer.room_group_name = self.room_group_name
+        for name, value in attributes.items():
+            setattr(consumer, name, value)
+
+        async def send(text_data=None, bytes_data=None, close=False):
+            if text_data is not None:
+                self.frames.append((user_id, json.loads(text_data), len(text_data.encode())))
+
+        consumer.send = send
+        self.consumers.append(consumer)
+        self.pumps.append(asyncio.ensure_future(self.pump(consumer)))
+
+        await self.channel_layer.group_add(self.room_group_name, consumer.channel_name)
+        await consumer.join_room(user)
+        await self.settle()
+        return consumer
+
+    async def pump(self, consumer):
+        """Dispatch channel layer messages to the consumer's handlers."""
+        while True:
+            message = await self.channel_layer.receive(consumer.channel_name)
+            self.count_layer_message(message)
+            await consumer.dispatch(message)
+            self.dispatched += 1
+
+    async def settle(self, quiet=0.005):
+        """Wait until no consumer has dispatched anything for `quiet` seconds."""
+        while True:
+            seen = self.dispatched
+            await asyncio.sleep(quiet)
+            if self.dispatched == seen:
+                return
+
+    def frames_for(self, user_id, types=None):
+        """Return (message, size) for frames delivered to one peer."""
+        return [
+            (message, size) for recipient, message, size in self.frames
+            if recipient == user_id and (types is None or message.get('type') in types)
+        ]
@@ -0,0 +1,95 @@
+"""
+Command to measure autocomplete lookup latency offline.
+"""
+import random
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.learning_sessions.autocomplete import DOMAIN, KINDS, MENTOR, TOPIC, Suggestion, SuggestionIndex
+
+SYLLABLES = (
+    'an', 'ar', 'be', 'ca', 'da', 'el', 'fi', 'go', 'ha', 'in', 'jo', 'ka', 'la', 'ma', 'ne', 'or', 'pa',
+    'qu', 'ra', 'sa', 'ta', 'ul', 'va', 'wi', 'xe', 'ya', 'zo',
+)
+
+
+class Command(BaseCommand):
+    """Look up typed prefixes in a synthetic SuggestionIndex and report latency percentiles."""
+
+    help = (
+        'Builds an autocomplete index of synthetic topics, domains and mentor names and '
+        'times lookups of random typed prefixes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=50000, help='Synthetic suggestions')
+        parser.add_argument('--lookups', type=int, default=20000, help='Prefixes looked up')
+        parser.add_argument('--limit', type=int, default=8, help='Suggestions per lookup')
+        parser.add_argument('--budget-ms', type=float, default=5.0, help='Fail if p99 latency exceeds this')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        """Build the index, then time lookups with and without a kind filter."""
+        rng = random.Random(options['seed'])
+        suggestions = [self.make_suggestion(rng, index) for index in range(options['entries'])]
+
+        started = time.perf_counter()
+        index = SuggestionIndex(suggestions)
+        build_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"{len(index)} suggestions, {len(index.keys)} keys, index built in {build_seconds * 1000:.0f}ms"
+        )
+
+        prefixes = [self.make_prefix(rng, suggestions) for _ in range(options['lookups'])]
+        self.stdout.write(
+            f"{'kinds':>19} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'max us':>8} {'results':>8}"
+        )
+        worst = 0
+        for kinds in (None, {TOPIC}, {MENTOR}):
+            timings = []
+            found = 0
+            for prefix in prefixes:
+                started = time.perf_counter()
+                results = index.lookup(prefix, kinds, options['limit'])
+                timings.append((time.perf_counter() - started) * 1e6)
+                found += len(results)
+            timings.sort()
+            p99 = timings[int(len(timings) * 0.99) - 1]
+            worst = max(worst, p99)
+            self.stdout.write(
+                f"{','.join(sorted(kinds or KINDS)):>19} {statistics.median(timings):>8.1f} "
+                f"{timings[int(len(timings) * 0.95) - 1]:>8.1f} {p99:>8.1f} {timings[-1]:>8.1f} "
+                f"{found / len(prefixes):>8.1f}"
+            )
+
+        if worst > options['budget_ms'] * 1000:
+            raise CommandError(f"p99 lookup latency {worst / 1000:.2f}ms is over {options['budget_ms']}ms")
+        self.stdout.write(self.style.SUCCESS('Autocomplete benchmark complete'))
+
+    @staticmethod
+    def word(rng, syllables):
+        return ''.join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+    def make_suggestion(self, rng, index):
+        """A topic (60%), mentor name (35%) or domain (5%) with a long-tailed weight."""
+        roll = rng.random()
+        weight = int(rng.paretovariate(1.2))
+        if roll < 0.6:
+            label = ' '.join(self.word(rng, rng.randint(2, 4)) for _ in range(rng.randint(1, 3))).title()
+            return Suggestion(TOPIC, label, label, weight)
+        if roll < 0.95:
+            label = f'{self.word(rng, 2).title()} {self.word(rng, 3).title()}'
+            return Suggestion(MENTOR, index, label, weight)
+        label = self.word(rng, 3).title()
+        return Suggestion(DOMAIN, index, label, weight)
+
+    @staticmethod
+    def make_prefix(rng, suggestions):
+        """What a user has typed so far: 1-6 letters of a word of a label, or noise."""
+        if rng.random() < 0.1:
+            return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 4)))
+        words = rng.choice(suggestions).label.split()
+        return rng.choice(words)[:rng.randint(1, 6)]
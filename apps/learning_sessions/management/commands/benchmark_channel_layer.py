@@ -0,0 +1,164 @@
+"""
+Command to measure group_send fan-out latency on a channel layer.
+
+By default the configured layer is measured. `--layer redis` or
+`--layer pubsub` builds a RedisChannelLayer or RedisPubSubChannelLayer over
+`--hosts` (CHANNEL_REDIS_URLS by default), one shard per URL, and
+`--stand-in-shards N` runs the pub/sub layer against N in-process
+stand-in servers instead (see _redis_standin.py), for environments
+without Redis.
+"""
+import asyncio
+import contextlib
+import hashlib
+import statistics
+import time
+import uuid
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ._redis_standin import PubSubStandIn
+
+
+class Command(BaseCommand):
+    """Benchmark room-sized group_send fan-out on the channel layer."""
+
+    help = 'Measures group_send fan-out latency for 2, 10 and 50 participant rooms'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[2, 10, 50],
+            help='Room sizes (participants per group) to benchmark',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Number of group_send calls per room size',
+        )
+        parser.add_argument(
+            '--rooms',
+            type=int,
+            default=4,
+            help='Number of rooms per size, so groups spread across shards',
+        )
+        parser.add_argument(
+            '--layer',
+            choices=['configured', 'redis', 'pubsub'],
+            default='configured',
+            help='Channel layer to measure: the configured one, RedisChannelLayer or RedisPubSubChannelLayer',
+        )
+        parser.add_argument(
+            '--hosts',
+            nargs='+',
+            help='Redis URLs for --layer redis or pubsub, one shard each (default: CHANNEL_REDIS_URLS)',
+        )
+        parser.add_argument(
+            '--stand-in-shards',
+            type=int,
+            default=0,
+            help='Run --layer pubsub against this many in-process stand-in servers instead of --hosts',
+        )
+
+    def handle(self, *args, **options):
+        """Run the benchmark and print a latency table."""
+        layer = options['layer']
+        stand_in = options['stand_in_shards']
+        if stand_in and layer != 'pubsub':
+            raise CommandError('--stand-in-shards needs --layer pubsub; RedisChannelLayer runs Lua scripts the stand-in does not')
+
+        with PubSubStandIn(stand_in) if stand_in else contextlib.nullcontext() as servers:
+            if layer == 'configured':
+                channel_layer = get_channel_layer()
+                backend = settings.CHANNEL_LAYERS['default']['BACKEND']
+                shards = len(getattr(settings, 'CHANNEL_REDIS_URLS', [])) or 1
+            else:
+                hosts = servers.urls if servers else options['hosts'] or getattr(settings, 'CHANNEL_REDIS_URLS', [])
+                if not hosts:
+                    raise CommandError('No Redis hosts: pass --hosts, set CHANNEL_REDIS_URLS or use --stand-in-shards')
+                channel_layer = self.build_layer(layer, hosts)
+                backend = f'{type(channel_layer).__module__}.{type(channel_layer).__name__}'
+                shards = len(hosts)
+                if servers:
+                    backend += ' on in-process stand-in'
+
+            self.stdout.write(f'Channel layer: {backend} ({shards} shard(s))')
+            results = asyncio.run(self.run(channel_layer, options, flush=layer != 'configured'))
+
+        self.stdout.write(f"{'room size':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+        for size, latencies in results:
+            latencies.sort()
+            self.stdout.write(
+                f'{size:>10} '
+                f'{statistics.median(latencies):>10.3f} '
+                f'{self.percentile(latencies, 95):>10.3f} '
+                f'{self.percentile(latencies, 99):>10.3f} '
+                f'{latencies[-1]:>10.3f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Channel layer benchmark complete'))
+
+    @staticmethod
+    def build_layer(layer, hosts):
+        """A Redis channel layer over `hosts` under a throwaway prefix."""
+        from channels_redis.core import RedisChannelLayer
+        from channels_redis.pubsub import RedisPubSubChannelLayer
+
+        layer_class = RedisChannelLayer if layer == 'redis' else RedisPubSubChannelLayer
+        return layer_class(hosts=hosts, prefix=f'benchmark-{uuid.uuid4().hex[:8]}')
+
+    async def run(self, channel_layer, options, flush=False):
+        """Measure every room size on one event loop; returns (size, latencies) pairs."""
+        try:
+            return [
+                (size, await self.measure(channel_layer, size, options['iterations'], options['rooms']))
+                for size in options['sizes']
+            ]
+        finally:
+            if flush:
+                # Drops the benchmark's keys and closes the layer's connections
+                await channel_layer.flush()
+
+    async def measure(self, channel_layer, size, iterations, rooms):
+        """
+        Send `iterations` messages to rooms of `size` participants and return
+        the time (in ms) until every participant has received each message.
+        """
+        groups = []
+        for _ in range(rooms):
+            # Use the same group naming as SessionConsumer
+            room_code = str(uuid.uuid4())
+            group = f'room_{hashlib.md5(room_code.encode()).hexdigest()[:8]}'
+            channels = [await channel_layer.new_channel() for _ in range(size)]
+            for channel in channels:
+                await channel_layer.group_add(group, channel)
+            groups.append((group, channels))
+
+        latencies = []
+        try:
+            for i in range(iterations):
+                group, channels = groups[i % rooms]
+                started = time.perf_counter()
+                await channel_layer.group_send(group, {
+                    'type': 'signaling_message',
+                    'message': {'type': 'ice_candidate', 'sequence': i},
+                })
+                await asyncio.gather(*(channel_layer.receive(channel) for channel in channels))
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            for group, channels in groups:
+                for channel in channels:
+                    await channel_layer.group_discard(group, channel)
+
+        return latencies
+
+    @staticmethod
+    def percentile(sorted_values, pct):
+        """Return the given percentile of an already sorted list."""
+        index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+        return sorted_values[index]
@@ -0,0 +1,100 @@
+"""
+Command to check that the dashboard sessions list takes a constant number
+of queries whatever its page size.
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.learning_sessions.dashboard_state import build_session_list
+from apps.learning_sessions.models import Booking, Session
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Build the fetch_sessions payload for a mentor and a learner at several page sizes."""
+
+    help = 'Builds the dashboard sessions list at several page sizes and fails if the query count grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1, 20, 100],
+            help='Page sizes (the `limit` filter) to benchmark',
+        )
+        parser.add_argument(
+            '--learners',
+            type=int,
+            default=5,
+            help='Confirmed learners per session',
+        )
+
+    def handle(self, *args, **options):
+        """Build each payload inside one rolled back transaction."""
+        sizes = options['sizes']
+        failures = []
+        self.stdout.write(f"{'role':>8} {'limit':>6} {'sessions':>9} {'queries':>8} {'ms':>8}")
+        with transaction.atomic():
+            mentor, learner = self.create_data(max(sizes), options['learners'])
+            for role, user in (('mentor', mentor), ('learner', learner)):
+                counts = set()
+                for size in sizes:
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        sessions = build_session_list(user, {'limit': size})
+                        elapsed = (time.perf_counter() - started) * 1000
+                    counts.add(len(queries.captured_queries))
+                    self.stdout.write(
+                        f"{role:>8} {size:>6} {len(sessions):>9} {len(queries.captured_queries):>8} {elapsed:>8.1f}"
+                    )
+                if len(counts) > 1:
+                    failures.append(role)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"The sessions list query count depends on page size for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('The sessions list takes a constant number of queries'))
+
+    @staticmethod
+    def create_data(sessions, learners):
+        """
+        Create a mentor with `sessions` sessions, each confirmed by the same
+        `learners` learners, and return the mentor and one of the learners.
+        """
+        prefix = uuid.uuid4().hex[:8]
+        mentor = User.objects.create(
+            username=f'bench_{prefix}_mentor',
+            email=f'bench_{prefix}_mentor@example.com',
+            role=User.MENTOR
+        )
+        User.objects.bulk_create([
+            User(username=f'bench_{prefix}_{i}', email=f'bench_{prefix}_{i}@example.com', role=User.LEARNER)
+            for i in range(learners)
+        ])
+        learner_list = list(User.objects.filter(username__startswith=f'bench_{prefix}_').exclude(pk=mentor.pk))
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(
+                mentor=mentor,
+                title=f'Dashboard benchmark {i}',
+                description='Synthetic session for the dashboard sessions benchmark.',
+                schedule=now + timedelta(days=1, hours=i),
+                max_participants=learners
+            )
+            for i in range(sessions)
+        ])
+        Booking.objects.bulk_create([
+            Booking(session=session, learner=learner, status=Booking.CONFIRMED)
+            for session in Session.objects.filter(mentor=mentor)
+            for learner in learner_list
+        ])
+        return mentor, learner_list[0]
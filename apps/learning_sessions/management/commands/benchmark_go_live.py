@@ -0,0 +1,167 @@
+"""
+Command to check that going live does not slow down with attendee count.
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.learning_sessions.api_endpoints import go_live_api
+from apps.learning_sessions.models import Booking, Session
+from apps.notifications.models import Notification, OutboxEvent
+from apps.notifications.outbox import outbox
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Time go_live_api for sessions with few and many confirmed bookings."""
+
+    help = (
+        'Calls go_live_api for committed sessions with 1 and 500 confirmed bookings, compares request '
+        'time and checks every learner was notified once the outbox published'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[1, 500],
+            help='Confirmed booking counts to benchmark; the first is the baseline',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Requests per size; the median time is reported',
+        )
+        parser.add_argument(
+            '--max-ratio',
+            type=float,
+            default=3.0,
+            help='Fail if a size takes more than this many times the baseline',
+        )
+        parser.add_argument(
+            '--publish-timeout',
+            type=float,
+            default=60.0,
+            help='Seconds to wait for the outbox to publish after each request',
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        """
+        Go live on fresh, committed sessions. Requests run in a worker thread
+        and the outbox publishes on this loop, as under the ASGI server, so
+        the timings include everything the request itself waits for.
+        """
+        outbox.bind_loop(asyncio.get_running_loop())
+        self.stdout.write(
+            f"{'bookings':>8} {'median ms':>10} {'queries':>8} {'notified':>9} {'ratio':>6}"
+        )
+        baseline = None
+        failures = []
+        for size in options['sizes']:
+            elapsed, queries, notified = await self.measure(size, options['repeat'], options['publish_timeout'])
+            baseline = baseline or elapsed
+            ratio = elapsed / baseline
+            self.stdout.write(f"{size:>8} {elapsed:>10.2f} {queries:>8} {notified:>9} {ratio:>6.2f}")
+            if notified != size:
+                failures.append(f"{size} bookings ({notified} learners notified)")
+            elif ratio > options['max_ratio']:
+                failures.append(f"{size} bookings ({ratio:.1f}x the baseline)")
+
+        if failures:
+            raise CommandError(f"go_live_api failed for {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('Go-live latency is independent of attendee count'))
+
+    async def measure(self, size, repeat, publish_timeout):
+        """
+        Return the median request time in ms, and the query count and number
+        of learners notified of the last request.
+        """
+        timings = []
+        for _ in range(repeat):
+            mentor, session, learner_ids = await sync_to_async(self.create_session)(size)
+            try:
+                elapsed, queries = await sync_to_async(self.go_live)(mentor, session)
+                timings.append(elapsed)
+                notified = await self.wait_for_notifications(learner_ids, publish_timeout)
+            finally:
+                await sync_to_async(self.delete)(mentor, learner_ids)
+
+        timings.sort()
+        return timings[len(timings) // 2], queries, notified
+
+    @staticmethod
+    def go_live(mentor, session):
+        """Call go_live_api once; returns its time in ms and query count."""
+        request = RequestFactory().post(
+            f'/sessions/api/sessions/{session.id}/go-live/',
+            data=json.dumps({'force': True}),
+            content_type='application/json'
+        )
+        request.user = mentor
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = go_live_api(request, session.id)
+            elapsed = (time.perf_counter() - started) * 1000
+
+        if response.status_code != 200:
+            raise CommandError(f"go_live_api returned {response.status_code}: {response.content!r}")
+        return elapsed, len(queries.captured_queries)
+
+    async def wait_for_notifications(self, learner_ids, timeout):
+        """Wait for the outbox to publish, then count the learners notified."""
+        deadline = time.monotonic() + timeout
+        pending = sync_to_async(OutboxEvent.objects.filter(published_at__isnull=True).exists)
+        while await pending() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return await sync_to_async(
+            Notification.objects.filter(user_id__in=learner_ids).values('user_id').distinct().count
+        )()
+
+    @staticmethod
+    def delete(mentor, learner_ids):
+        User.objects.filter(pk__in=[mentor.pk, *learner_ids]).delete()
+
+    @staticmethod
+    def create_session(size):
+        """Create a mentor, a scheduled session and `size` confirmed learners."""
+        prefix = uuid.uuid4().hex[:8]
+        mentor = User.objects.create(
+            username=f'bench_{prefix}_mentor',
+            email=f'bench_{prefix}_mentor@example.com',
+            role=User.MENTOR
+        )
+        session = Session.objects.create(
+            mentor=mentor,
+            title='Go-live benchmark',
+            description='Synthetic session for the go-live benchmark.',
+            schedule=timezone.now() + timedelta(minutes=10),
+            duration=60,
+            max_participants=size
+        )
+        User.objects.bulk_create([
+            User(username=f'bench_{prefix}_{i}', email=f'bench_{prefix}_{i}@example.com', role=User.LEARNER)
+            for i in range(size)
+        ])
+        learners = User.objects.filter(username__startswith=f'bench_{prefix}_').exclude(pk=mentor.pk)
+        Booking.objects.bulk_create([
+            Booking(session=session, learner=learner, status=Booking.CONFIRMED)
+            for learner in learners
+        ])
+        return mentor, session, [learner.pk for learner in learners]
@@ -0,0 +1,127 @@
+"""
+Command to measure keep-alive overhead for many idle room sockets.
+"""
+import asyncio
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from apps.learning_sessions.heartbeat import HeartbeatScheduler
+
+
+class SyntheticConnection:
+    """
+    Stand-in for an idle room socket: answers pings unless it is dead and
+    records when it gets closed.
+    """
+
+    def __init__(self, scheduler, alive=True):
+        self.scheduler = scheduler
+        self.alive = alive
+        self.pings = 0
+        self.closed_at = None
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        self.pings += 1
+        if self.alive and json.loads(text_data)['type'] == 'ping':
+            self.scheduler.pong(self)
+
+    async def close(self, code=None):
+        self.closed_at = time.perf_counter()
+
+
+class Command(BaseCommand):
+    """Compare the shared heartbeat scheduler with one ping loop per socket."""
+
+    help = 'Holds N synthetic idle room sockets and reports heartbeat memory, tasks and ping cycle cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10000, help='Number of synthetic sockets')
+        parser.add_argument('--interval', type=float, default=1.0, help='Ping interval in seconds')
+        parser.add_argument('--dead', type=float, default=0.01, help='Fraction of sockets that never answer')
+        parser.add_argument('--cycles', type=int, default=3, help='Ping intervals to observe')
+
+    def handle(self, *args, **options):
+        """Run the scheduler and the legacy per-connection loops and print both."""
+        shared = asyncio.run(self.run_scheduler(options))
+        legacy = asyncio.run(self.run_per_connection_loops(options))
+
+        self.stdout.write(f"{options['connections']} idle sockets, ping every {options['interval']}s")
+        self.stdout.write(f"{'mode':>16} {'tasks':>8} {'KiB':>10} {'pings':>8} {'closed dead':>12}")
+        for name, stats in (('shared scheduler', shared), ('per-socket loop', legacy)):
+            self.stdout.write(
+                f"{name:>16} {stats['tasks']:>8} {stats['memory'] / 1024:>10.0f} "
+                f"{stats['pings']:>8} {stats['closed']:>12}"
+            )
+        self.stdout.write(
+            f"Dead sockets closed after {shared['detect_latency']:.2f}s on average "
+            f"(per-socket loops never close them)"
+        )
+        self.stdout.write(self.style.SUCCESS('Heartbeat benchmark complete'))
+
+    def make_connections(self, scheduler, options):
+        """Create the synthetic sockets, marking the requested fraction dead."""
+        dead_every = int(1 / options['dead']) if options['dead'] else 0
+        return [
+            SyntheticConnection(scheduler, alive=not (dead_every and i % dead_every == 0))
+            for i in range(options['connections'])
+        ]
+
+    async def run_scheduler(self, options):
+        """Register every socket with one shared scheduler."""
+        scheduler = HeartbeatScheduler(interval=options['interval'], max_missed=2)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        connections = self.make_connections(scheduler, options)
+        started = time.perf_counter()
+        for connection in connections:
+            scheduler.register(connection)
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tasks = len(asyncio.all_tasks()) - 1
+        tracemalloc.stop()
+
+        await asyncio.sleep(options['interval'] * options['cycles'] + 0.1)
+
+        dead = [c for c in connections if not c.alive]
+        closed = [c for c in dead if c.closed_at]
+        for connection in connections:
+            scheduler.unregister(connection)
+        return {
+            'tasks': tasks,
+            'memory': memory,
+            'pings': sum(c.pings for c in connections),
+            'closed': len(closed),
+            'detect_latency': (
+                sum(c.closed_at - started for c in closed) / len(closed) if closed else 0
+            ),
+        }
+
+    async def run_per_connection_loops(self, options):
+        """Run the previous design: one infinite ping coroutine per socket."""
+        async def ping_loop(connection):
+            while True:
+                await connection.send(text_data=json.dumps({'type': 'ping'}))
+                await asyncio.sleep(options['interval'])
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        connections = self.make_connections(HeartbeatScheduler(), options)
+        tasks = [asyncio.ensure_future(ping_loop(connection)) for connection in connections]
+        await asyncio.sleep(0)
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        await asyncio.sleep(options['interval'] * options['cycles'] + 0.1)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {
+            'tasks': len(tasks),
+            'memory': memory,
+            'pings': sum(c.pings for c in connections),
+            'closed': 0,
+        }
@@ -0,0 +1,110 @@
+"""
+Command to measure ICE candidate coalescing savings on a recorded burst.
+"""
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from ._room_harness import RoomHarness
+
+# Candidate burst recorded from Chrome gathering for an audio + video call
+# behind NAT with a TURN server: (offset in ms, sdpMid, candidate line).
+RECORDED_BURST = [
+    (0, '0', 'candidate:1840965416 1 udp 2122260223 192.168.1.23 54400 typ host generation 0 ufrag Qm3x network-id 1'),
+    (1, '0', 'candidate:3218743208 1 udp 2122262783 2001:db8::23 54401 typ host generation 0 ufrag Qm3x network-id 2'),
+    (2, '1', 'candidate:1840965416 1 udp 2122260223 192.168.1.23 54402 typ host generation 0 ufrag Qm3x network-id 1'),
+    (3, '1', 'candidate:3218743208 1 udp 2122262783 2001:db8::23 54403 typ host generation 0 ufrag Qm3x network-id 2'),
+    (5, '0', 'candidate:591096536 1 tcp 1518280447 192.168.1.23 9 typ host tcptype active generation 0 ufrag Qm3x network-id 1'),
+    (5, '0', 'candidate:2000531480 1 tcp 1518283007 2001:db8::23 9 typ host tcptype active generation 0 ufrag Qm3x network-id 2'),
+    (6, '1', 'candidate:591096536 1 tcp 1518280447 192.168.1.23 9 typ host tcptype active generation 0 ufrag Qm3x network-id 1'),
+    (7, '1', 'candidate:2000531480 1 tcp 1518283007 2001:db8::23 9 typ host tcptype active generation 0 ufrag Qm3x network-id 2'),
+    (9, '0', 'candidate:1840965417 1 udp 2122194687 10.8.0.2 54404 typ host generation 0 ufrag Qm3x network-id 3'),
+    (10, '1', 'candidate:1840965417 1 udp 2122194687 10.8.0.2 54405 typ host generation 0 ufrag Qm3x network-id 3'),
+    (118, '0', 'candidate:842163049 1 udp 1686052607 203.0.113.7 61012 typ srflx raddr 192.168.1.23 rport 54400 generation 0 ufrag Qm3x network-id 1'),
+    (121, '1', 'candidate:842163049 1 udp 1686052607 203.0.113.7 61013 typ srflx raddr 192.168.1.23 rport 54402 generation 0 ufrag Qm3x network-id 1'),
+    (133, '0', 'candidate:842163050 1 udp 1685987071 203.0.113.9 48771 typ srflx raddr 10.8.0.2 rport 54404 generation 0 ufrag Qm3x network-id 3'),
+    (136, '1', 'candidate:842163050 1 udp 1685987071 203.0.113.9 48772 typ srflx raddr 10.8.0.2 rport 54405 generation 0 ufrag Qm3x network-id 3'),
+    (242, '0', 'candidate:2157334355 1 udp 41885439 198.51.100.4 50123 typ relay raddr 203.0.113.7 rport 61012 generation 0 ufrag Qm3x network-id 1'),
+    (246, '1', 'candidate:2157334355 1 udp 41885439 198.51.100.4 50125 typ relay raddr 203.0.113.7 rport 61013 generation 0 ufrag Qm3x network-id 1'),
+    (268, '0', 'candidate:2157334356 1 udp 41819903 198.51.100.4 50127 typ relay raddr 203.0.113.9 rport 48771 generation 0 ufrag Qm3x network-id 3'),
+    (271, '1', 'candidate:2157334356 1 udp 41819903 198.51.100.4 50129 typ relay raddr 203.0.113.9 rport 48772 generation 0 ufrag Qm3x network-id 3'),
+    (301, '0', 'candidate:3521472802 1 tcp 25108223 198.51.100.4 50124 typ relay raddr 203.0.113.7 rport 61020 generation 0 ufrag Qm3x network-id 1'),
+    (305, '1', 'candidate:3521472802 1 tcp 25108223 198.51.100.4 50126 typ relay raddr 203.0.113.7 rport 61021 generation 0 ufrag Qm3x network-id 1'),
+]
+
+
+class Command(BaseCommand):
+    """Replay a recorded ICE candidate burst with and without coalescing."""
+
+    help = 'Replays a recorded ICE candidate burst and reports frames and bytes saved by batching'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--windows',
+            nargs='+',
+            type=int,
+            default=[20, 35, 50],
+            help='Coalescing windows in milliseconds to compare against no batching',
+        )
+
+    def handle(self, *args, **options):
+        """Replay the burst for each window and print savings against the baseline."""
+        self.stdout.write(f'Replaying {len(RECORDED_BURST)} candidates over {RECORDED_BURST[-1][0]} ms')
+        self.stdout.write(
+            f"{'window ms':>10} {'client':>8} {'relays':>8} {'frames':>8} {'bytes':>8} "
+            f"{'frames saved':>13} {'bytes saved':>12}"
+        )
+
+        baseline = asyncio.run(self.replay(0, supports_batches=False))
+        self.print_row(0, 'legacy', baseline, baseline)
+        for window in options['windows']:
+            for supports_batches in (False, True):
+                stats = asyncio.run(self.replay(window, supports_batches))
+                self.print_row(window, 'batch' if supports_batches else 'legacy', stats, baseline)
+
+        self.stdout.write(self.style.SUCCESS('ICE batching benchmark complete'))
+
+    def print_row(self, window, client, stats, baseline):
+        """Print one result row with savings relative to the baseline."""
+        frames_saved = 1 - stats['frames'] / baseline['frames']
+        bytes_saved = 1 - stats['bytes'] / baseline['bytes']
+        self.stdout.write(
+            f"{window:>10} {client:>8} {stats['relays']:>8} {stats['frames']:>8} {stats['bytes']:>8} "
+            f"{frames_saved:>12.0%} {bytes_saved:>11.0%}"
+        )
+
+    async def replay(self, window, supports_batches):
+        """
+        Send the recorded burst from peer 1 to peer 2 with its original
+        timing and count what reaches peer 2.
+        """
+        async with RoomHarness() as room:
+            sender = await room.add_peer(1, ice_batch_window=window / 1000)
+            await room.add_peer(2, supports_ice_batches=supports_batches)
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for offset, sdp_mid, candidate in RECORDED_BURST:
+                await asyncio.sleep(max(0, started + offset / 1000 - loop.time()))
+                await sender.receive(text_data=json.dumps({
+                    'type': 'ice_candidate',
+                    'target': 2,
+                    'user_id': 1,
+                    'candidate': {
+                        'candidate': candidate,
+                        'sdpMid': sdp_mid,
+                        'sdpMLineIndex': int(sdp_mid),
+                        'usernameFragment': 'Qm3x',
+                    },
+                }))
+
+            await asyncio.sleep(window / 1000)
+            await room.settle()
+
+            frames = room.frames_for(2, types=('ice_candidate', 'ice_candidates'))
+            return {
+                'relays': room.layer_messages.get('ice_candidate', 0) + room.layer_messages.get('ice_candidates', 0),
+                'frames': len(frames),
+                'bytes': sum(size for _, size in frames),
+            }
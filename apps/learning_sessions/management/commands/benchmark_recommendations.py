@@ -0,0 +1,142 @@
+"""
+Command to measure recommendation scoring throughput offline.
+"""
+import heapq
+import itertools
+import random
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.learning_sessions.recommendations import Candidate, SessionRecommender, score, terms, topic_keys
+
+WORDS = (
+    'python django react javascript typescript rust golang kotlin swift sql postgres redis docker '
+    'kubernetes aws azure terraform linux networking security cryptography machine learning deep '
+    'statistics calculus algebra physics chemistry biology writing design figma marketing finance '
+    'accounting product management leadership interview resume negotiation startup data analysis '
+    'visualization pandas numpy testing devops architecture microservices graphql mobile android ios'
+).split()
+
+
+class Command(BaseCommand):
+    """Score synthetic sessions for synthetic learners without touching the database."""
+
+    help = (
+        'Builds a recommendation index over synthetic upcoming sessions and reports how fast '
+        'learners are scored by a full scan, through the inverted index and from the cache'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=100000, help='Synthetic upcoming sessions')
+        parser.add_argument('--learners', type=int, default=200, help='Synthetic learners to score')
+        parser.add_argument('--topics', type=int, default=400, help='Distinct session topics')
+        parser.add_argument('--vocabulary', type=int, default=5000, help='Distinct description words')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        """Build the index, then time each way of ranking every learner."""
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        topics = [f'{rng.choice(WORDS)} {index}' for index in range(options['topics'])]
+        # Some topics and words are far more popular than others
+        weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(topics))))
+        vocabulary = [f'word{index}' for index in range(options['vocabulary'])]
+        vocabulary_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+        started = time.perf_counter()
+        candidates = [
+            self.make_candidate(rng, index, now, topics, weights, vocabulary, vocabulary_weights)
+            for index in range(options['sessions'])
+        ]
+        recommender = SessionRecommender(index_ttl=3600, cache_ttl=3600, cache_size=options['learners'])
+        recommender.load(candidates)
+        build_seconds = time.perf_counter() - started
+
+        learners = [
+            SimpleNamespace(
+                pk=index,
+                interests=rng.choices(topics, cum_weights=weights, k=rng.randint(1, 5)),
+                career_goal=' '.join(rng.sample(WORDS, 2)),
+            )
+            for index in range(options['learners'])
+        ]
+
+        self.stdout.write(
+            f"{len(candidates)} sessions, {len(topics)} topics, {len(learners)} learners; "
+            f"synthetic data and index built in {build_seconds:.2f}s"
+        )
+        self.stdout.write(f"{'mode':>10} {'learners/s':>11} {'ms/learner':>11} {'scored/learner':>15} {'scored/s':>11}")
+
+        full_scan = self.report(
+            'full scan', learners, len(candidates), lambda learner: self.full_scan(candidates, learner, now)
+        )
+        postings = sum(self.postings(recommender, learner) for learner in learners) / len(learners)
+        indexed = self.report('indexed', learners, postings, lambda learner: self.indexed(recommender, learner, now))
+        # The first pass fills the per-learner cache, the second reads it
+        self.report('cold cache', learners, postings, recommender.for_learner)
+        self.report('warm cache', learners, 0, recommender.for_learner)
+
+        mismatches = sum(1 for expected, actual in zip(full_scan, indexed) if expected != actual)
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} learners ranked differently by the index'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Recommendation benchmark complete'))
+
+    @staticmethod
+    def make_candidate(rng, index, now, topics, weights, vocabulary, vocabulary_weights):
+        """A random upcoming session with a title from WORDS and a long-tail description."""
+        session_topics = rng.choices(topics, cum_weights=weights, k=rng.randint(1, 4))
+        title = ' '.join(rng.sample(WORDS, 3))
+        description = ' '.join(rng.choices(vocabulary, cum_weights=vocabulary_weights, k=30))
+        return Candidate(
+            id=index,
+            schedule=now + timedelta(minutes=rng.randint(1, 60 * 24 * 30)),
+            live=rng.random() < 0.01,
+            topics=topic_keys(session_topics),
+            terms=frozenset(terms(title) | terms(description) | terms(' '.join(session_topics).lower())),
+            rating_average=rng.uniform(1, 5),
+            rating_count=rng.randint(0, 50),
+            bookings=rng.randint(0, 30),
+        )
+
+    @staticmethod
+    def full_scan(candidates, learner, now):
+        """Score every candidate for `learner`, as a query-free baseline."""
+        interests = topic_keys(learner.interests)
+        goal_terms = frozenset(terms(learner.career_goal))
+        scored = []
+        for candidate in candidates:
+            if candidate.is_upcoming(now):
+                value = score(candidate, interests, goal_terms)
+                if value:
+                    scored.append((-value, candidate.order, candidate.id))
+        return [session_id for _, _, session_id in heapq.nsmallest(6, scored)]
+
+    @staticmethod
+    def indexed(recommender, learner, now):
+        """Score only the candidates sharing a topic or term with `learner`."""
+        return recommender.rank(topic_keys(learner.interests), frozenset(terms(learner.career_goal)), 6, now)
+
+    @staticmethod
+    def postings(recommender, learner):
+        """How many candidates the inverted index yields for `learner`."""
+        return len(set().union(
+            *(recommender._by_topic.get(topic, ()) for topic in topic_keys(learner.interests)),
+            *(recommender._by_term.get(term, ()) for term in terms(learner.career_goal)),
+        ))
+
+    def report(self, mode, learners, scored_per_learner, rank):
+        """Rank every learner with `rank`, print the rates and return the rankings."""
+        started = time.perf_counter()
+        rankings = [rank(learner) for learner in learners]
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"{mode:>10} {len(learners) / seconds:>11.0f} {seconds * 1000 / len(learners):>11.3f} "
+            f"{scored_per_learner:>15.0f} {scored_per_learner * len(learners) / seconds:>11.0f}"
+        )
+        return rankings
+
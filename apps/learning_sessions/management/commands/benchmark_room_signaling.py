@@ -0,0 +1,96 @@
+"""
+Command to load test WebRTC signaling fan-out in multi-participant rooms.
+"""
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.learning_sessions.consumers import SessionConsumer
+
+from ._room_harness import RoomHarness
+
+
+class Command(BaseCommand):
+    """Count signaling frames delivered per peer with direct relay vs broadcast."""
+
+    help = 'Counts signaling messages per joined peer for direct relay and group broadcast'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[2, 5, 10, 20],
+            help='Number of participants per room',
+        )
+        parser.add_argument(
+            '--candidates',
+            type=int,
+            default=10,
+            help='ICE candidates each peer sends per peer connection',
+        )
+
+    def handle(self, *args, **options):
+        """Run both delivery modes for every room size and print the counts."""
+        self.stdout.write(
+            f"{'peers':>6} {'mode':>10} {'deliveries':>12} {'frames/peer':>12} {'misaddressed/peer':>18}"
+        )
+        for size in options['sizes']:
+            for direct in (False, True):
+                stats = asyncio.run(self.run_room(size, options['candidates'], direct))
+                self.stdout.write(
+                    f"{size:>6} {'direct' if direct else 'broadcast':>10} "
+                    f"{stats['deliveries']:>12} "
+                    f"{stats['frames'] / size:>12.1f} "
+                    f"{stats['misaddressed'] / size:>18.1f}"
+                )
+        self.stdout.write(self.style.SUCCESS('Room signaling load test complete'))
+
+    async def run_room(self, size, candidates, direct):
+        """
+        Join `size` consumers to one room, run a full mesh negotiation and
+        return message counters.
+        """
+        async with RoomHarness() as room:
+            # Batching would change the frame counts being compared here
+            consumers = [
+                await room.add_peer(user_id, ice_batch_window=0)
+                for user_id in range(1, size + 1)
+            ]
+
+            if not direct:
+                # Without a registry every relay falls back to the room group
+                for consumer in consumers:
+                    consumer.peer_channels.clear()
+
+            # Full mesh negotiation: offer, answer and candidates both ways
+            for sender in consumers:
+                for receiver in consumers:
+                    if sender.user_id >= receiver.user_id:
+                        continue
+                    await self.signal(sender, receiver, 'offer')
+                    await self.signal(receiver, sender, 'answer')
+                    for _ in range(candidates):
+                        await self.signal(sender, receiver, 'ice_candidate')
+                        await self.signal(receiver, sender, 'ice_candidate')
+                    await room.settle()
+
+            frames = [
+                (user_id, message) for user_id, message, _ in room.frames
+                if message.get('type') in SessionConsumer.SIGNALING_TYPES
+            ]
+            return {
+                'deliveries': sum(room.layer_messages.get(t, 0) for t in SessionConsumer.SIGNALING_TYPES),
+                'frames': len(frames),
+                'misaddressed': sum(1 for user_id, message in frames if message.get('target') != user_id),
+            }
+
+    async def signal(self, sender, receiver, message_type):
+        """Have `sender` emit a signaling frame addressed to `receiver`."""
+        await sender.receive(text_data=json.dumps({
+            'type': message_type,
+            'target': receiver.user_id,
+            'user_id': sender.user_id,
+            'candidate': {'candidate': 'candidate:0 1 UDP 2122252543 192.0.2.1 50000 typ host'},
+        }))
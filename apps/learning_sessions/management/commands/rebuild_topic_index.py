@@ -0,0 +1,44 @@
+"""
+Command to repair drift in the Topic index.
+"""
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.learning_sessions.models import Session, Topic, topic_names
+
+
+class Command(BaseCommand):
+    """Recount the sessions of every topic and fix the counts that drifted."""
+
+    help = 'Recounts sessions per topic from Session.topics and corrects the Topic index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted topics without changing them',
+        )
+
+    def handle(self, *args, **options):
+        """Count topics over every session once, then fix the drifted ones."""
+        actual = Counter()
+        for topics in Session.objects.values_list('topics', flat=True).iterator():
+            actual.update(topic_names(topics))
+        stored = dict(Topic.objects.values_list('name', 'session_count'))
+
+        drifted = [
+            (name, stored.get(name, 0), actual[name])
+            for name in sorted(set(stored) | set(actual))
+            if stored.get(name, 0) != actual[name]
+        ]
+        for name, counted, count in drifted:
+            self.stdout.write(f"Topic {name!r}: counted {counted}, actually {count}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} topics have drifted counts'))
+            return
+        # Apply the differences rather than the totals so sessions saved
+        # since the count above are not lost
+        Topic.add_sessions({name: count - counted for name, counted, count in drifted})
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {len(drifted)} topics'))
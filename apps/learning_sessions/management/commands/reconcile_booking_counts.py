@@ -0,0 +1,47 @@
+"""
+Command to repair drift in Session.confirmed_bookings_count.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.learning_sessions.models import Booking, Session
+
+
+class Command(BaseCommand):
+    """Recount confirmed bookings and fix the sessions whose counter drifted."""
+
+    help = 'Recounts confirmed bookings per session and corrects confirmed_bookings_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted sessions without changing them',
+        )
+
+    def handle(self, *args, **options):
+        """Compare every counter with a fresh count in one query, then fix the drifted ones."""
+        confirmed = Booking.objects.filter(
+            session=OuterRef('pk'),
+            status=Booking.CONFIRMED
+        ).order_by().values('session').annotate(count=Count('id')).values('count')
+        drifted = [
+            (session_id, stored, actual)
+            for session_id, stored, actual in Session.objects.annotate(
+                actual=Coalesce(Subquery(confirmed), 0)
+            ).values_list('id', 'confirmed_bookings_count', 'actual').iterator()
+            if stored != actual
+        ]
+
+        for session_id, stored, actual in drifted:
+            self.stdout.write(f"Session {session_id}: counted {stored}, actually {actual}")
+            if not options['dry_run']:
+                # Apply the difference rather than the total so bookings
+                # confirmed since the count above are not lost
+                Session.add_confirmed_bookings({session_id: actual - stored})
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} sessions have drifted counts'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {len(drifted)} sessions'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0004_sessionrequest_is_free'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(help_text='Display name of the sender when the message was sent.', max_length=255)),
+                ('sequence', models.PositiveIntegerField(help_text='Position of the message in the room, starting at 1.')),
+                ('content', models.TextField(help_text='Text of the message.')),
+                ('sent_at', models.DateTimeField(help_text='Date and time when the message was sent.')),
+                ('sender', models.ForeignKey(blank=True, help_text='The user who sent the message.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='session_chat_messages', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(help_text='The session the message was sent in.', on_delete=django.db.models.deletion.CASCADE, related_name='chat_messages', to='learning_sessions.session')),
+            ],
+            options={
+                'verbose_name': 'Chat Message',
+                'verbose_name_plural': 'Chat Messages',
+                'ordering': ['session', 'sequence'],
+                'indexes': [models.Index(fields=['session', 'sequence'], name='learning_se_session_81cbd2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_confirmed_bookings(apps, schema_editor):
+    Session = apps.get_model('learning_sessions', 'Session')
+    Booking = apps.get_model('learning_sessions', 'Booking')
+    confirmed = Booking.objects.filter(
+        session=OuterRef('pk'),
+        status='confirmed'
+    ).order_by().values('session').annotate(count=Count('id')).values('count')
+    Session.objects.update(confirmed_bookings_count=Coalesce(Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0005_chatmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='confirmed_bookings_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of confirmed bookings, kept in step by Booking writes.'),
+        ),
+        migrations.RunPython(count_confirmed_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:44
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def index_session_topics(apps, schema_editor):
+    Session = apps.get_model('learning_sessions', 'Session')
+    Topic = apps.get_model('learning_sessions', 'Topic')
+    counts = Counter()
+    for topics in Session.objects.values_list('topics', flat=True).iterator():
+        if isinstance(topics, list):
+            counts.update({str(topic).strip()[:255] for topic in topics if str(topic).strip()})
+    Topic.objects.bulk_create([Topic(name=name, session_count=count) for name, count in counts.items()], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0006_session_confirmed_bookings_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Topic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Topic name as it appears in Session.topics.', max_length=255, unique=True)),
+                ('session_count', models.PositiveIntegerField(default=0, help_text='Number of sessions listing this topic.')),
+            ],
+            options={
+                'verbose_name': 'Topic',
+                'verbose_name_plural': 'Topics',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(index_session_topics, migrations.RunPython.noop),
+    ]
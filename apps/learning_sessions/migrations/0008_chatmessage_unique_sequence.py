@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:19
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def renumber_duplicate_sequences(apps, schema_editor):
+    """
+    Workers used to number messages independently, so a session's log can
+    hold the same sequence twice; renumber those sessions in send order.
+    """
+    ChatMessage = apps.get_model('learning_sessions', 'ChatMessage')
+    session_ids = set(
+        ChatMessage.objects.order_by().values('session_id', 'sequence').annotate(
+            copies=Count('id')
+        ).filter(copies__gt=1).values_list('session_id', flat=True)
+    )
+    for session_id in session_ids:
+        messages = list(ChatMessage.objects.filter(session_id=session_id).order_by('sent_at', 'sequence', 'id'))
+        for sequence, message in enumerate(messages, start=1):
+            message.sequence = sequence
+        ChatMessage.objects.bulk_update(messages, ['sequence'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning_sessions', '0007_topic'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_sequences, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='chatmessage',
+            name='learning_se_session_81cbd2_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='chatmessage',
+            unique_together={('session', 'sequence')},
+        ),
+    ]
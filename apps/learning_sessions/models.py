@@ -3,7 +3,9 @@ Models for managing sessions, session requests, and bookings.
 """
 
 import uuid
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
@@ -45,9 +47,105 @@ class Domain(models.Model):
     def __str__(self):
         return self.name
 
+def topic_names(topics):
+    """The distinct topic names in a Session.topics value."""
+    if not isinstance(topics, list):
+        return set()
+    return {str(topic).strip()[:255] for topic in topics if str(topic).strip()}
+
+class TopicQuerySet(models.QuerySet):
+    """
+    Topic queries.
+    """
+
+    def in_use(self):
+        """Topics of at least one session, by name."""
+        return self.filter(session_count__gt=0).order_by('name')
+
+class Topic(models.Model):
+    """
+    Index of the topics used by sessions, with how many sessions use each.
+    Kept in step by Session.save(), SessionQuerySet and the post_delete
+    signal, so the category lists never scan Session.topics.
+    """
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text=_('Topic name as it appears in Session.topics.')
+    )
+
+    session_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Number of sessions listing this topic.')
+    )
+
+    objects = TopicQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _('Topic')
+        verbose_name_plural = _('Topics')
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def add_sessions(cls, changes):
+        """Apply {topic name: change in sessions} to the counts."""
+        changes = {name: count for name, count in changes.items() if count}
+        new_names = [name for name, count in changes.items() if count > 0]
+        if new_names:
+            cls.objects.bulk_create([cls(name=name) for name in new_names], ignore_conflicts=True)
+        for name, count in changes.items():
+            cls.objects.filter(name=name).update(session_count=F('session_count') + count)
+
+    @staticmethod
+    def changes(old_topics, new_topics):
+        """{topic name: change} for a session whose topics went from old to new."""
+        changes = Counter()
+        for name in old_topics - new_topics:
+            changes[name] -= 1
+        for name in new_topics - old_topics:
+            changes[name] += 1
+        return changes
+
+class SessionQuerySet(models.QuerySet):
+    """
+    Session queries that keep the Topic index in step.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert sessions and count their topics."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        changes = Counter()
+        for session in objs:
+            session._loaded_topics = topic_names(session.topics)
+            changes.update(session._loaded_topics)
+        Topic.add_sessions(changes)
+        return objs
+
+    def update(self, **kwargs):
+        """Update sessions, moving the changed rows between topics when `topics` is set."""
+        if 'topics' not in kwargs:
+            return super().update(**kwargs)
+
+        new_topics = topic_names(kwargs['topics'])
+        with transaction.atomic():
+            rows = list(self.select_for_update().values_list('id', 'topics'))
+            if not rows:
+                return 0
+            updated = models.QuerySet.update(self.model.objects.filter(id__in=[row[0] for row in rows]), **kwargs)
+            changes = Counter()
+            for session_id, topics in rows:
+                changes.update(Topic.changes(topic_names(topics), new_topics))
+            Topic.add_sessions(changes)
+        return updated
+
 class Session(models.Model):
     """
     Model for a session created by a mentor.
+    Its topics are counted in the Topic index by save(), SessionQuerySet
+    and the post_delete signal.
     """
     SCHEDULED = 'scheduled'
     LIVE = 'live'
@@ -117,6 +215,12 @@ class Session(models.Model):
         help_text=_('Maximum number of participants allowed (1 for one-to-one).')
     )
     
+    confirmed_bookings_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_('Number of confirmed bookings, kept in step by Booking writes.')
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text=_('Date and time when the session was created.')
@@ -126,7 +230,9 @@ class Session(models.Model):
         auto_now=True,
         help_text=_('Date and time when the session was last updated.')
     )
-    
+
+    objects = SessionQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Session')
         verbose_name_plural = _('Sessions')
@@ -140,6 +246,11 @@ class Session(models.Model):
         """Check if the session is free."""
         return self.price == 0
     
+    @property
+    def can_book(self):
+        """Check if the session is scheduled and still has free places."""
+        return self.status == self.SCHEDULED and self.confirmed_bookings_count < self.max_participants
+    
     @property
     def is_upcoming(self):
         """Check if the session is in the future."""
@@ -226,11 +337,53 @@ class Session(models.Model):
         # Handle seconds
         return f"{delta.seconds}s"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored topics to update the Topic index on save."""
+        session = super().from_db(db, field_names, values)
+        if 'topics' in session.__dict__:
+            session._loaded_topics = topic_names(session.topics)
+        return session
+
     def save(self, *args, **kwargs):
-        """Override save to ensure room_code is set."""
+        """
+        Override save to ensure room_code is set. Updates leave
+        confirmed_bookings_count alone, so a stale instance cannot overwrite
+        the counter. Because they always pass update_fields, saving an
+        instance whose row has been deleted raises DatabaseError rather than
+        inserting it again; use force_insert to recreate it. Topics added or
+        removed are counted in the Topic index.
+        """
         if not self.room_code:
             self.room_code = uuid.uuid4()
+        update_fields = kwargs.get('update_fields')
+        tracked = self._state.adding or hasattr(self, '_loaded_topics')
+        if update_fields is not None and 'topics' not in update_fields:
+            tracked = False
+        loaded = getattr(self, '_loaded_topics', set()) if not self._state.adding else set()
+
+        if not self._state.adding and update_fields is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'confirmed_bookings_count'
+            ]
         super().save(*args, **kwargs)
+        if not tracked:
+            # Loaded with topics deferred; rebuild_topic_index picks up any change
+            return
+
+        topics = topic_names(self.topics)
+        Topic.add_sessions(Topic.changes(loaded, topics))
+        self._loaded_topics = topics
+    
+    @classmethod
+    def add_confirmed_bookings(cls, changes):
+        """Apply {session_id: change in confirmed bookings} to the counters."""
+        for session_id, count in changes.items():
+            if count:
+                cls.objects.filter(pk=session_id).update(
+                    confirmed_bookings_count=F('confirmed_bookings_count') + count
+                )
 
 class SessionRequest(models.Model):
     """
@@ -369,9 +522,50 @@ class SessionRequest(models.Model):
         """Check if the request is declined."""
         return self.status == self.DECLINED
 
+class BookingQuerySet(models.QuerySet):
+    """
+    Booking queries that keep Session.confirmed_bookings_count in step.
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert bookings and count the confirmed ones on their sessions."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        Session.add_confirmed_bookings(Counter(
+            booking.session_id for booking in objs if booking.status == Booking.CONFIRMED
+        ))
+        for booking in objs:
+            booking._loaded = (booking.session_id, booking.status)
+        return objs
+    
+    def update(self, **kwargs):
+        """
+        Update bookings, moving the changed rows in or out of their sessions'
+        confirmed counts when `status` or `session` is set.
+        """
+        if not {'status', 'session', 'session_id'} & set(kwargs):
+            return super().update(**kwargs)
+        
+        session = kwargs.get('session', kwargs.get('session_id'))
+        with transaction.atomic():
+            rows = list(self.select_for_update().values_list('id', 'session_id', 'status'))
+            if not rows:
+                return 0
+            updated = models.QuerySet.update(self.model.objects.filter(id__in=[row[0] for row in rows]), **kwargs)
+            changes = Counter()
+            for booking_id, session_id, status in rows:
+                changes[session_id] -= status == Booking.CONFIRMED
+                if session is not None:
+                    session_id = getattr(session, 'pk', session)
+                changes[session_id] += kwargs.get('status', status) == Booking.CONFIRMED
+            Session.add_confirmed_bookings(changes)
+        return updated
+
+
 class Booking(models.Model):
     """
     Model for a booking of a session by a learner.
+    Confirmed bookings are counted on Session.confirmed_bookings_count by
+    save(), BookingQuerySet and the post_delete signal.
     """
     PENDING = 'pending'
     CONFIRMED = 'confirmed'
@@ -434,9 +628,64 @@ class Booking(models.Model):
         ordering = ['-created_at']
         unique_together = ('session', 'learner')
     
+    objects = BookingQuerySet.as_manager()
+    
     def __str__(self):
         return f"Booking by {self.learner.username} for {self.session.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored session and status to count transitions on save."""
+        booking = super().from_db(db, field_names, values)
+        if 'session_id' in booking.__dict__ and 'status' in booking.__dict__:
+            booking._loaded = (booking.session_id, booking.status)
+        return booking
+    
+    def save(self, *args, **kwargs):
+        """
+        Save the booking and move it in or out of its session's confirmed count.
+        The stored session and status are switched with a conditional update,
+        so of two stale instances saving the same change only one counts it.
+        """
+        update_fields = kwargs.get('update_fields')
+        tracked = self._state.adding or hasattr(self, '_loaded')
+        if update_fields is not None and not {'status', 'session', 'session_id'} & set(update_fields):
+            tracked = False
+        
+        loaded = getattr(self, '_loaded', None) if not self._state.adding else None
+        with transaction.atomic():
+            if tracked and loaded is not None:
+                loaded = self._move_from(loaded)
+            super().save(*args, **kwargs)
+            if not tracked:
+                # Loaded with session or status deferred; reconcile_booking_counts
+                # picks up any change
+                return
+            
+            changes = Counter()
+            if loaded is not None:
+                changes[loaded[0]] -= loaded[1] == self.CONFIRMED
+            changes[self.session_id] += self.status == self.CONFIRMED
+            Session.add_confirmed_bookings(changes)
+        self._loaded = (self.session_id, self.status)
+    
+    def _move_from(self, loaded):
+        """
+        Switch the stored row from the `loaded` (session_id, status) to this
+        instance's, retrying from the stored values when another save moved
+        the row first. Returns the pair actually replaced, or None when the
+        row is gone and save() will insert it again.
+        """
+        rows = Booking._base_manager.filter(pk=self.pk)
+        while loaded is not None:
+            matched = rows.filter(session_id=loaded[0], status=loaded[1]).update(
+                session_id=self.session_id, status=self.status
+            )
+            if matched:
+                return loaded
+            loaded = rows.values_list('session_id', 'status').first()
+        return None
+    
     @property
     def can_join(self):
         """Check if the learner can join the session."""
@@ -449,3 +698,50 @@ class Booking(models.Model):
     def is_past(self):
         """Check if the session is in the past."""
         return self.session.schedule < timezone.now()
+
+class ChatMessage(models.Model):
+    """
+    Model for a chat message sent in a session room.
+    Messages are written in batches by the room chat history (see chat.py).
+    """
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+        related_name='chat_messages',
+        help_text=_('The session the message was sent in.')
+    )
+    
+    sender = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='session_chat_messages',
+        help_text=_('The user who sent the message.')
+    )
+    
+    username = models.CharField(
+        max_length=255,
+        help_text=_('Display name of the sender when the message was sent.')
+    )
+    
+    sequence = models.PositiveIntegerField(
+        help_text=_('Position of the message in the room, starting at 1.')
+    )
+    
+    content = models.TextField(
+        help_text=_('Text of the message.')
+    )
+    
+    sent_at = models.DateTimeField(
+        help_text=_('Date and time when the message was sent.')
+    )
+    
+    class Meta:
+        verbose_name = _('Chat Message')
+        verbose_name_plural = _('Chat Messages')
+        ordering = ['session', 'sequence']
+        unique_together = ('session', 'sequence')
+    
+    def __str__(self):
+        return f"#{self.sequence} by {self.username} in {self.session_id}"
@@ -0,0 +1,254 @@
+"""
+Live presence registry for session rooms.
+
+Tracks, per room code, which users are connected, through how many
+tabs/channels, their latest media status and when they joined. Counts are
+O(1) and a full roster is one snapshot() call, so a late joiner can be sent
+everyone in the room in a single message.
+
+The in-memory store only sees the connections of the current process. Set
+SESSION_PRESENCE_REDIS_URL (it defaults to the first channel layer shard)
+to share presence between workers through a Redis-protocol server.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def room_key(room_code):
+    """Room codes arrive as UUIDs or URL strings; normalize them."""
+    return str(room_code).lower()
+
+
+class PresenceStore:
+    """
+    Interface shared by the presence backends. The sync methods are used by
+    views; consumers await the `a`-prefixed variants.
+    """
+
+    def join(self, room_code, user_id, channel_name, username):
+        """Add a channel for a user; returns True if the user was not present."""
+        raise NotImplementedError
+
+    def leave(self, room_code, user_id, channel_name):
+        """Remove a channel; returns True if the user has no channels left."""
+        raise NotImplementedError
+
+    def set_media(self, room_code, user_id, audio_enabled, video_enabled):
+        """Record a participant's latest media status."""
+        raise NotImplementedError
+
+    def count(self, room_code):
+        """Return the number of distinct users in a room."""
+        raise NotImplementedError
+
+    def snapshot(self, room_code):
+        """Return the room roster as a list of participant dicts."""
+        raise NotImplementedError
+
+    async def _call(self, method, *args):
+        return await sync_to_async(method, thread_sensitive=False)(*args)
+
+    async def ajoin(self, *args):
+        return await self._call(self.join, *args)
+
+    async def aleave(self, *args):
+        return await self._call(self.leave, *args)
+
+    async def aset_media(self, *args):
+        return await self._call(self.set_media, *args)
+
+    async def asnapshot(self, *args):
+        return await self._call(self.snapshot, *args)
+
+
+class InMemoryPresenceStore(PresenceStore):
+    """
+    Presence held in process memory; async calls run inline.
+    """
+
+    def __init__(self):
+        # room -> {user_id: {'username', 'joined_at', 'channels', 'audio_enabled', 'video_enabled'}}
+        self._rooms = {}
+
+    async def _call(self, method, *args):
+        return method(*args)
+
+    def join(self, room_code, user_id, channel_name, username):
+        participants = self._rooms.setdefault(room_key(room_code), {})
+        participant = participants.get(user_id)
+        is_new = participant is None
+        if is_new:
+            participant = participants[user_id] = {
+                'username': username,
+                'joined_at': timezone.now().isoformat(),
+                'channels': set(),
+                'audio_enabled': True,
+                'video_enabled': True,
+            }
+        participant['channels'].add(channel_name)
+        return is_new
+
+    def leave(self, room_code, user_id, channel_name):
+        key = room_key(room_code)
+        participants = self._rooms.get(key, {})
+        participant = participants.get(user_id)
+        if participant is None:
+            return True
+
+        participant['channels'].discard(channel_name)
+        if participant['channels']:
+            return False
+
+        del participants[user_id]
+        if not participants:
+            self._rooms.pop(key, None)
+        return True
+
+    def set_media(self, room_code, user_id, audio_enabled, video_enabled):
+        participant = self._rooms.get(room_key(room_code), {}).get(user_id)
+        if participant is not None:
+            participant['audio_enabled'] = audio_enabled
+            participant['video_enabled'] = video_enabled
+
+    def count(self, room_code):
+        return len(self._rooms.get(room_key(room_code), {}))
+
+    def snapshot(self, room_code):
+        return [
+            {
+                'user_id': user_id,
+                'username': participant['username'],
+                'joined_at': participant['joined_at'],
+                'connections': len(participant['channels']),
+                'audio_enabled': participant['audio_enabled'],
+                'video_enabled': participant['video_enabled'],
+            }
+            for user_id, participant in self._rooms.get(room_key(room_code), {}).items()
+        ]
+
+
+class RedisPresenceStore(PresenceStore):
+    """
+    Presence shared between workers through a Redis-protocol server.
+
+    Per room it keeps a hash of user_id -> participant JSON and one set of
+    channel names per user; keys expire so rooms left behind by a crashed
+    worker do not linger.
+    """
+
+    KEY_TTL = 24 * 60 * 60
+
+    # Removes a channel and, if it was the user's last, the participant,
+    # in one step so a join from another tab cannot land in between.
+    # Returns 1 if the participant was removed.
+    LEAVE_SCRIPT = """
+        redis.call('SREM', KEYS[1], ARGV[1])
+        if redis.call('SCARD', KEYS[1]) > 0 then
+            return 0
+        end
+        redis.call('HDEL', KEYS[2], ARGV[2])
+        return 1
+    """
+
+    # Updates the media flags of a participant's JSON in place, so
+    # concurrent updates of one participant cannot overwrite each other
+    SET_MEDIA_SCRIPT = """
+        local raw = redis.call('HGET', KEYS[1], ARGV[1])
+        if not raw then
+            return 0
+        end
+        local participant = cjson.decode(raw)
+        participant['audio_enabled'] = cjson.decode(ARGV[2])
+        participant['video_enabled'] = cjson.decode(ARGV[3])
+        redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(participant))
+        return 1
+    """
+
+    def __init__(self, url, prefix='presence'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._leave = self.client.register_script(self.LEAVE_SCRIPT)
+        self._set_media = self.client.register_script(self.SET_MEDIA_SCRIPT)
+
+    def _participants_key(self, room_code):
+        return f'{self.prefix}:{room_key(room_code)}:participants'
+
+    def _channels_key(self, room_code, user_id):
+        return f'{self.prefix}:{room_key(room_code)}:channels:{user_id}'
+
+    def join(self, room_code, user_id, channel_name, username):
+        participants_key = self._participants_key(room_code)
+        channels_key = self._channels_key(room_code, user_id)
+        participant = json.dumps({
+            'username': username,
+            'joined_at': timezone.now().isoformat(),
+            'audio_enabled': True,
+            'video_enabled': True,
+        })
+
+        pipe = self.client.pipeline()
+        pipe.hsetnx(participants_key, user_id, participant)
+        pipe.sadd(channels_key, channel_name)
+        pipe.expire(participants_key, self.KEY_TTL)
+        pipe.expire(channels_key, self.KEY_TTL)
+        is_new, _, _, _ = pipe.execute()
+        return bool(is_new)
+
+    def leave(self, room_code, user_id, channel_name):
+        removed = self._leave(
+            keys=[self._channels_key(room_code, user_id), self._participants_key(room_code)],
+            args=[channel_name, user_id]
+        )
+        return bool(removed)
+
+    def set_media(self, room_code, user_id, audio_enabled, video_enabled):
+        self._set_media(
+            keys=[self._participants_key(room_code)],
+            args=[user_id, json.dumps(audio_enabled), json.dumps(video_enabled)]
+        )
+
+    def count(self, room_code):
+        return self.client.hlen(self._participants_key(room_code))
+
+    def snapshot(self, room_code):
+        participants = self.client.hgetall(self._participants_key(room_code))
+        if not participants:
+            return []
+
+        user_ids = [int(user_id) for user_id in participants]
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            pipe.scard(self._channels_key(room_code, user_id))
+        connections = pipe.execute()
+
+        roster = []
+        for user_id, connection_count in zip(user_ids, connections):
+            participant = json.loads(participants[str(user_id).encode()])
+            participant.update({'user_id': user_id, 'connections': connection_count})
+            roster.append(participant)
+        roster.sort(key=lambda participant: participant['joined_at'])
+        return roster
+
+
+def get_presence_store():
+    """
+    Build the presence store selected by SESSION_PRESENCE_REDIS_URL.
+    """
+    url = getattr(settings, 'SESSION_PRESENCE_REDIS_URL', '')
+    if url:
+        try:
+            return RedisPresenceStore(url)
+        except ImportError:
+            logger.warning("redis is not installed; falling back to in-memory room presence")
+    return InMemoryPresenceStore()
+
+
+presence = get_presence_store()
@@ -0,0 +1,319 @@
+"""
+Session recommendations for the learner dashboard.
+
+SessionRecommender keeps an in-process index of upcoming sessions (scheduled
+in the future, or live) run by active mentors: per session its topics, the
+terms of its title and description, its mentor's stored rating aggregates
+and its confirmed booking count, plus inverted indexes from topic and from
+term to session IDs. A learner's candidates are the union of the postings
+of their interests and career-goal terms, so only sessions sharing at least
+one of them are scored.
+
+Each learner's top-N session IDs are cached for RECOMMENDATION_CACHE_TTL
+seconds, keyed by their interests and career goal so profile edits take
+effect immediately. Saving or deleting a session in this process updates
+its index entry once the transaction commits and drops every cached
+top-N (see signals.py), so new and newly live sessions show up at once.
+Other processes pick changes up when their index is rebuilt, every
+RECOMMENDATION_INDEX_TTL seconds; sessions whose start time has passed are
+skipped at scoring time. Booking counts only move with that rebuild.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+INTEREST_WEIGHT = 3.0
+CAREER_GOAL_WEIGHT = 2.0
+RATING_WEIGHT = 1.0
+MOMENTUM_WEIGHT = 1.0
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_COUNT = 5
+MOMENTUM_CAP = 20
+
+TERM_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset({
+    'and', 'are', 'but', 'for', 'from', 'have', 'how', 'into', 'its', 'learn', 'more', 'not', 'our',
+    'that', 'the', 'their', 'this', 'will', 'with', 'you', 'your',
+})
+
+
+def terms(text):
+    """The lowercased words of `text` worth matching, without stop words."""
+    return {
+        term for term in TERM_PATTERN.findall((text or '').lower())
+        if len(term) > 1 and term not in STOP_WORDS
+    }
+
+
+def topic_keys(topics):
+    """The lowercased, stripped topic names in a Session.topics or interests list."""
+    if not isinstance(topics, list):
+        return frozenset()
+    return frozenset(str(topic).strip().lower() for topic in topics if str(topic).strip())
+
+
+def relevance(topic_hits, interest_count, term_hits, goal_term_count):
+    """
+    How well a session matches a learner: the share of their interests it
+    lists as topics and the share of their career-goal terms it mentions.
+    """
+    value = 0.0
+    if interest_count:
+        value += INTEREST_WEIGHT * topic_hits / interest_count
+    if goal_term_count:
+        value += CAREER_GOAL_WEIGHT * term_hits / goal_term_count
+    return value
+
+
+def standing(rating_average, rating_count, bookings):
+    """
+    The learner-independent part of a session's score. The mentor's rating
+    is pulled towards RATING_PRIOR_MEAN as if they had RATING_PRIOR_COUNT
+    more ratings, and booking momentum grows with the log of confirmed
+    bookings up to MOMENTUM_CAP; both are scaled to 0..1.
+    """
+    rating = (
+        (rating_average * rating_count + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT)
+        / (rating_count + RATING_PRIOR_COUNT)
+    )
+    momentum = math.log1p(min(bookings, MOMENTUM_CAP)) / math.log1p(MOMENTUM_CAP)
+    return RATING_WEIGHT * rating / 5 + MOMENTUM_WEIGHT * momentum
+
+
+def score(candidate, interests, goal_terms):
+    """
+    Score of `candidate` for a learner with `interests` (topic keys) and
+    `goal_terms` (career-goal terms); 0 if it matches neither.
+    """
+    value = relevance(
+        len(interests & candidate.topics), len(interests), len(goal_terms & candidate.terms), len(goal_terms)
+    )
+    return value + candidate.standing if value else 0.0
+
+
+class Candidate:
+    """An upcoming session as the recommender sees it."""
+
+    __slots__ = ('id', 'schedule', 'live', 'topics', 'terms', 'bookings', 'standing', 'order')
+
+    def __init__(self, id, schedule, live, topics, terms, rating_average, rating_count, bookings):
+        self.id = id
+        self.schedule = schedule
+        self.live = live
+        self.topics = topics
+        self.terms = terms
+        self.bookings = bookings
+        self.standing = standing(rating_average, rating_count, bookings)
+        # Among equal scores, live sessions first, then soonest
+        self.order = (not live, schedule)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a candidate from a SessionRecommender.FIELDS values() row."""
+        from .models import Session
+
+        topics = topic_keys(row['topics'])
+        return cls(
+            id=row['id'],
+            schedule=row['schedule'],
+            live=row['status'] == Session.LIVE,
+            topics=topics,
+            # Topic words count towards career-goal matches too
+            terms=frozenset(terms(row['title']) | terms(row['description']) | terms(' '.join(topics))),
+            rating_average=row['mentor___rating_average'] or 0.0,
+            rating_count=row['mentor___rating_count'] or 0,
+            bookings=row['confirmed_bookings_count'],
+        )
+
+    def is_upcoming(self, now):
+        return self.live or self.schedule >= now
+
+
+class SessionRecommender:
+    """
+    In-process index of upcoming sessions with cached per-learner top-N.
+    """
+
+    FIELDS = (
+        'id', 'title', 'description', 'topics', 'schedule', 'status', 'confirmed_bookings_count',
+        'mentor___rating_average', 'mentor___rating_count',
+    )
+
+    def __init__(self, index_ttl=300, cache_ttl=300, cache_size=10000):
+        self.index_ttl = index_ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._candidates = {}
+        self._by_topic = defaultdict(set)
+        self._by_term = defaultdict(set)
+        self._trending = None
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def upcoming_sessions(now=None):
+        """Sessions eligible for recommendation: upcoming or live, run by an active mentor."""
+        from apps.users.models import CustomUser
+        from .models import Session
+
+        now = now or timezone.now()
+        return Session.objects.filter(
+            Q(status=Session.SCHEDULED, schedule__gte=now) | Q(status=Session.LIVE),
+            mentor__role=CustomUser.MENTOR,
+            mentor__is_active=True,
+        )
+
+    def load(self, candidates):
+        """Replace the index with `candidates`."""
+        with self._lock:
+            self._candidates = {}
+            self._by_topic = defaultdict(set)
+            self._by_term = defaultdict(set)
+            for candidate in candidates:
+                self._add(candidate)
+            self._built_at = time.monotonic()
+            self._trending = None
+            self._cache.clear()
+
+    def rebuild(self):
+        """Reload the index from the database with one query."""
+        rows = self.upcoming_sessions().order_by().values(*self.FIELDS)
+        # Read the rows before taking the lock so scoring is not held up by the query
+        self.load([Candidate.from_row(row) for row in rows.iterator(chunk_size=2000)])
+
+    def _ensure_index(self):
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < self.index_ttl:
+                return
+        self.rebuild()
+
+    def _add(self, candidate):
+        self._candidates[candidate.id] = candidate
+        for topic in candidate.topics:
+            self._by_topic[topic].add(candidate.id)
+        for term in candidate.terms:
+            self._by_term[term].add(candidate.id)
+
+    def _remove(self, session_id):
+        candidate = self._candidates.pop(session_id, None)
+        if candidate is None:
+            return
+        for postings, keys in ((self._by_topic, candidate.topics), (self._by_term, candidate.terms)):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(session_id)
+                    if not ids:
+                        del postings[key]
+
+    def session_changed(self, session_id):
+        """
+        Re-read one session's index entry and drop every cached top-N.
+        Called once the transaction that saved or deleted it commits.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+        row = self.upcoming_sessions().filter(pk=session_id).values(*self.FIELDS).first()
+        with self._lock:
+            self._remove(session_id)
+            if row is not None:
+                self._add(Candidate.from_row(row))
+            self._trending = None
+            self._cache.clear()
+
+    def clear(self):
+        """Drop the index and every cached top-N."""
+        with self._lock:
+            self._built_at = None
+            self._candidates = {}
+            self._by_topic = defaultdict(set)
+            self._by_term = defaultdict(set)
+            self._trending = None
+            self._cache.clear()
+
+    def rank(self, interests, goal_terms, limit, now=None):
+        """
+        The IDs of the `limit` best scoring upcoming sessions for a learner
+        with `interests` and `goal_terms`. Topic and term matches are
+        counted from the postings of each interest and goal term, so only
+        sessions sharing at least one of them are looked at.
+        """
+        now = now or timezone.now()
+        interest_count, goal_term_count = len(interests), len(goal_terms)
+        scored = []
+        with self._lock:
+            topic_hits = Counter()
+            for topic in interests:
+                topic_hits.update(self._by_topic.get(topic, ()))
+            term_hits = Counter()
+            for term in goal_terms:
+                term_hits.update(self._by_term.get(term, ()))
+
+            for session_id in topic_hits.keys() | term_hits.keys():
+                candidate = self._candidates[session_id]
+                if candidate.live or candidate.schedule >= now:
+                    value = relevance(
+                        topic_hits.get(session_id, 0), interest_count, term_hits.get(session_id, 0), goal_term_count
+                    )
+                    scored.append((-(value + candidate.standing), candidate.order, session_id))
+        return [session_id for _, _, session_id in heapq.nsmallest(limit, scored)]
+
+    def trending(self, limit=6, now=None):
+        """
+        IDs of the upcoming sessions with the most confirmed bookings,
+        soonest first among equals.
+        """
+        now = now or timezone.now()
+        self._ensure_index()
+        with self._lock:
+            if self._trending is None:
+                self._trending = sorted(
+                    self._candidates.values(), key=lambda candidate: (-candidate.bookings, candidate.schedule)
+                )
+            ranked = self._trending
+        return [candidate.id for candidate in ranked if candidate.is_upcoming(now)][:limit]
+
+    def for_learner(self, user, limit=6):
+        """IDs of the `limit` sessions recommended to `user`, best first."""
+        interests = topic_keys(user.interests)
+        goal_terms = frozenset(terms(user.career_goal))
+        if not interests and not goal_terms:
+            return []
+
+        self._ensure_index()
+        key = (user.pk, interests, goal_terms, limit)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return list(entry[1])
+
+        session_ids = self.rank(interests, goal_terms, limit)
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, tuple(session_ids))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return session_ids
+
+
+def sessions_in_order(session_ids, queryset):
+    """The sessions of `queryset` with `session_ids`, in that order, with one query."""
+    sessions = queryset.in_bulk(session_ids)
+    return [sessions[session_id] for session_id in session_ids if session_id in sessions]
+
+
+recommender = SessionRecommender(
+    index_ttl=getattr(settings, 'RECOMMENDATION_INDEX_TTL', 300),
+    cache_ttl=getattr(settings, 'RECOMMENDATION_CACHE_TTL', 300),
+    cache_size=getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 10000),
+)
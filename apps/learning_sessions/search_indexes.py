@@ -0,0 +1,49 @@
+"""
+Search index for sessions (see apps.core.search).
+"""
+from haystack import indexes
+
+from .models import Session
+
+
+class SessionIndex(indexes.SearchIndex, indexes.Indexable):
+    """
+    Indexes a session's title, description, topics and mentor name. `auto`
+    holds word prefixes of the title, topics and mentor name so partly
+    typed words match.
+    """
+
+    text = indexes.CharField(document=True)
+    auto = indexes.EdgeNgramField()
+    status = indexes.CharField(model_attr='status')
+    schedule = indexes.DateTimeField(model_attr='schedule')
+
+    # Saving only other fields leaves the document unchanged
+    indexed_fields = frozenset({'title', 'description', 'topics', 'mentor', 'status', 'schedule'})
+
+    # Searched in the database while the index is not built yet
+    fallback_fields = ('title', 'description', 'topics', 'mentor__username', 'mentor__first_name', 'mentor__last_name')
+
+    def get_model(self):
+        return Session
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.select_related('mentor')
+
+    def get_updated_field(self):
+        return 'updated_at'
+
+    @staticmethod
+    def topics(session):
+        return [str(topic) for topic in session.topics] if isinstance(session.topics, list) else []
+
+    @staticmethod
+    def mentor_name(session):
+        mentor = session.mentor
+        return f'{mentor.get_full_name()} {mentor.username}'
+
+    def prepare_text(self, session):
+        return '\n'.join([session.title, session.description, *self.topics(session), self.mentor_name(session)])
+
+    def prepare_auto(self, session):
+        return ' '.join([session.title, *self.topics(session), self.mentor_name(session)])
@@ -0,0 +1,188 @@
+"""
+Signal handlers for the learning_sessions app.
+"""
+import logging
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.notifications.outbox import outbox
+from apps.payments.models import Payment
+from .admission import admission_cache
+from .autocomplete import DOMAIN, TOPIC, autocomplete
+from .chat import chat_history
+from .models import Booking, Domain, Session, SessionRequest, Topic, topic_names
+from .recommendations import recommender
+
+logger = logging.getLogger(__name__)
+
+# Fields shown on dashboards; saves whose update_fields touch none of them
+# (counter and bookkeeping updates, say) leave every dashboard unchanged
+SESSION_DASHBOARD_FIELDS = frozenset({
+    'mentor', 'mentor_id', 'title', 'schedule', 'duration', 'price', 'room_code', 'status',
+})
+BOOKING_DASHBOARD_FIELDS = frozenset({'session', 'session_id', 'learner', 'learner_id', 'status'})
+
+
+def changes_dashboard(update_fields, fields):
+    """Whether a save with `update_fields` can change a dashboard showing `fields`."""
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def invalidate_session_admission(sender, instance, **kwargs):
+    """Drop cached room admission data when a session changes."""
+    admission_cache.invalidate_session(instance.pk)
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def refresh_session_recommendations(sender, instance, **kwargs):
+    """Re-index a session for recommendations once its transaction commits."""
+    transaction.on_commit(partial(recommender.session_changed, instance.pk))
+
+
+@receiver(post_save, sender=Session)
+def end_session_chat(sender, instance, update_fields=None, **kwargs):
+    """Close a room's chat once its session is ended, however it was ended."""
+    if instance.status not in (Session.COMPLETED, Session.CANCELLED):
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    transaction.on_commit(partial(close_room_chat, instance.room_code))
+
+
+def close_room_chat(room_code):
+    """
+    Save and drop the room's chat buffer in this process, and ask the room
+    consumers of every worker to do the same with theirs.
+    """
+    from .consumers import room_group_name
+
+    try:
+        chat_history.close(room_code)
+        channel_layer = get_channel_layer()
+        if channel_layer is not None:
+            async_to_sync(channel_layer.group_send)(room_group_name(room_code), {'type': 'chat_closed'})
+    except Exception as e:
+        logger.error("Error closing chat for room %s: %s", room_code, e)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_admission(sender, instance, **kwargs):
+    """Drop cached room admission data when one of its bookings changes."""
+    admission_cache.invalidate_session(instance.session_id)
+
+
+@receiver(post_delete, sender=Booking)
+def uncount_deleted_booking(sender, instance, **kwargs):
+    """Take a deleted confirmed booking off its session's confirmed count."""
+    session_id, status = getattr(instance, '_loaded', (instance.session_id, instance.status))
+    if status == Booking.CONFIRMED:
+        Session.add_confirmed_bookings({session_id: -1})
+
+
+@receiver(post_delete, sender=Session)
+def uncount_deleted_session_topics(sender, instance, **kwargs):
+    """Take a deleted session off the Topic index."""
+    topics = getattr(instance, '_loaded_topics', None)
+    if topics is None:
+        topics = topic_names(instance.topics)
+    Topic.add_sessions({name: -1 for name in topics})
+
+
+@receiver(post_save, sender=Session)
+def suggest_session_topics(sender, instance, update_fields=None, **kwargs):
+    """Have autocomplete pick up topics it does not suggest yet, once committed."""
+    if update_fields is None or 'topics' in update_fields:
+        for name in topic_names(instance.topics):
+            transaction.on_commit(partial(autocomplete.note, TOPIC, name, name))
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def suggest_domain(sender, instance, signal, **kwargs):
+    """Have autocomplete pick up a new, renamed or deleted domain, once committed."""
+    name = instance.name if signal is post_save else None
+    transaction.on_commit(partial(autocomplete.note, DOMAIN, instance.pk, name))
+
+
+def notify_dashboards(user_ids, event):
+    """
+    Tell the dashboards of `user_ids` that their data changed. The messages
+    go through the outbox, so they are published only once the current
+    transaction commits. Events are marked delta_only: consumers forward
+    them only if the dashboard actually changed.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    event = {**event, 'delta_only': True, 'timestamp': timezone.now().isoformat()}
+    outbox.enqueue([([f"dashboard_{user_id}" for user_id in user_ids], event)])
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_dashboard_update(sender, instance, update_fields=None, **kwargs):
+    """Update the dashboards of a session's mentor and confirmed learners."""
+    if not changes_dashboard(update_fields, SESSION_DASHBOARD_FIELDS):
+        return
+    learner_ids = []
+    if instance.pk is not None:
+        learner_ids = Booking.objects.filter(
+            session_id=instance.pk,
+            status=Booking.CONFIRMED
+        ).values_list('learner_id', flat=True)
+    notify_dashboards([instance.mentor_id, *learner_ids], {
+        'type': 'session_update',
+        'session_id': instance.pk,
+        'status': instance.status,
+    })
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_dashboard_update(sender, instance, update_fields=None, **kwargs):
+    """Update the dashboards of a booking's learner and the session's mentor."""
+    if not changes_dashboard(update_fields, BOOKING_DASHBOARD_FIELDS):
+        return
+    mentor_id = Session.objects.filter(pk=instance.session_id).values_list('mentor_id', flat=True).first()
+    notify_dashboards([instance.learner_id, mentor_id], {
+        'type': 'booking_update',
+        'booking_id': instance.pk,
+        'session_id': instance.session_id,
+        'status': instance.status,
+    })
+
+
+@receiver(post_save, sender=SessionRequest)
+@receiver(post_delete, sender=SessionRequest)
+def session_request_dashboard_update(sender, instance, **kwargs):
+    """Update the dashboards of both sides of a session request."""
+    notify_dashboards([instance.learner_id, instance.mentor_id], {
+        'type': 'session_request_update',
+        'request_id': instance.pk,
+        'status': instance.status,
+    })
+
+
+@receiver(post_save, sender=Payment)
+def payment_dashboard_update(sender, instance, **kwargs):
+    """Update a mentor's earnings when a payment for their session changes."""
+    mentor_id = Session.objects.filter(
+        bookings__id=instance.booking_id
+    ).values_list('mentor_id', flat=True).first()
+    notify_dashboards([mentor_id], {
+        'type': 'booking_update',
+        'booking_id': instance.booking_id,
+        'status': instance.status,
+        'sections': ['earnings'],
+    })
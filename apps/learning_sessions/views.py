@@ -23,11 +23,13 @@ from decimal import Decimal
 # Set up logging
 logger = logging.getLogger(__name__)
 
-from .models import Session, SessionRequest, Booking
+from .models import Session, SessionRequest, Booking, Topic
 from .forms import SessionForm, SessionRequestForm, FeedbackForm
 from apps.users.models import CustomUser, UserRating
 from apps.notifications.models import Notification
+from apps.notifications.outbox import outbox
 from apps.payments.models import Payment
+from apps.core.search import site_search
 
 class SessionListView(ListView):
     """View to list all public sessions."""
@@ -51,10 +53,12 @@ class SessionListView(ListView):
         if category:
             queryset = queryset.filter(topics__contains=[category])
         
-        # Apply search filter if provided
+        # Apply search filter if provided, listing the best matches first
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(title__icontains=search)
+            return site_search.search(
+                queryset, search, status__in=[Session.SCHEDULED, Session.LIVE], schedule__gte=now
+            )
         
         return queryset.order_by('schedule')
     
@@ -72,12 +76,8 @@ class SessionListView(ListView):
         return context
     
     def get_categories(self):
-        """Get list of all categories from session topics."""
-        categories = set()
-        sessions = Session.objects.all()
-        for session in sessions:
-            categories.update(session.topics)
-        return sorted(list(categories))
+        """Get list of all categories from the session topic index."""
+        return list(Topic.objects.in_use().values_list('name', flat=True))
 
 class SessionDetailView(DetailView):
     """View to show details of a session."""
@@ -536,7 +536,7 @@ def join_session_room(request, room_code):
                 # Log this action
                 import logging
                 logger = logging.getLogger(__name__)
-                logger.info(f"Session {session.id} marked as live by mentor {request.user.id}")
+                logger.info("Session %s marked as live by mentor %s", session.id, request.user.id)
                 
             # Redirect to room page
             return redirect('sessions:room', room_code=session.room_code)
@@ -549,7 +549,7 @@ def join_session_room(request, room_code):
         
     except Exception as e:
         # Log the error for debugging
-        print(f"Error in join_session_room: {e}")
+        logger.error("Error in join_session_room: %s", e)
         messages.error(request, f"Error accessing session: {str(e)}")
         return redirect('home')
 
@@ -586,7 +586,7 @@ def session_by_room_code(request, room_code):
             role = 'mentor'
             is_authorized = True
             # Log access
-            logger.info(f"Mentor {request.user.username} (ID: {request.user.id}) accessing room {room_code}")
+            logger.info("Mentor %s (ID: %s) accessing room %s", request.user.username, request.user.id, room_code)
         else:
             # Check if user has a booking for this session
             has_booking = session.bookings.filter(
@@ -598,11 +598,11 @@ def session_by_room_code(request, room_code):
                 role = 'learner'
                 is_authorized = True
                 # Log access
-                logger.info(f"Learner {request.user.username} (ID: {request.user.id}) accessing room {room_code}")
+                logger.info("Learner %s (ID: %s) accessing room %s", request.user.username, request.user.id, room_code)
             else:
                 # Detailed logging for debugging access issues
                 existing_bookings = list(session.bookings.all().values('learner_id', 'status'))
-                logger.warning(f"Unauthorized access attempt: User {request.user.username} (ID: {request.user.id}) to room {room_code}. Session bookings: {existing_bookings}")
+                logger.warning("Unauthorized access attempt: User %s (ID: %s) to room %s. Session bookings: %s", request.user.username, request.user.id, room_code, existing_bookings)
         
         if not is_authorized:
             messages.error(request, "You don't have permission to access this session. Only the booked learner and assigned mentor can join this session room.")
@@ -633,7 +633,7 @@ def session_by_room_code(request, room_code):
         return redirect('sessions:room', room_code=session.room_code)
     
     except Exception as e:
-        print(f"Error in session_by_room_code: {e}")
+        logger.error("Error in session_by_room_code: %s", e)
         messages.error(request, "Error accessing session")
         return redirect('sessions:list')
 
@@ -670,66 +670,59 @@ def session_room(request, room_code):
     
     # If mentor is joining and session is scheduled, make it live
     if user_role == 'mentor' and session.status == Session.SCHEDULED:
-        # Set session to live and record when it started
-        session.status = Session.LIVE
-        session.live_started_at = timezone.now()
-        session.save()
+        join_url = f"/sessions/{session.room_code}/join/?direct=true"
         
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Session {session.id} set to live by mentor {request.user.id} in session_room view")
-        
-        # Notify learners with confirmed bookings
-        for booking in session.bookings.filter(status=Booking.CONFIRMED):
-            try:
-                # Create a notification
-                notification = Notification.objects.create(
-                    user=booking.learner,
+        # Notifications and their WebSocket messages are written with the
+        # status change; the outbox publishes the messages after commit
+        with transaction.atomic():
+            # Set session to live and record when it started
+            session.status = Session.LIVE
+            session.live_started_at = timezone.now()
+            session.save()
+            
+            logger.info("Session %s set to live by mentor %s in session_room view", session.id, request.user.id)
+            
+            # Notify learners with confirmed bookings
+            learner_ids = list(
+                session.bookings.filter(status=Booking.CONFIRMED).values_list('learner_id', flat=True)
+            )
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    user_id=learner_id,
                     title="Session is Live",
                     message=f"The session '{session.title}' is now live! Join to start learning.",
-                    link=f"/sessions/{session.room_code}/join/?direct=true"
+                    link=join_url
                 )
-                
-                # Send WebSocket notification if channel layer is available
-                try:
-                    from channels.layers import get_channel_layer
-                    from asgiref.sync import async_to_sync
-                    
-                    channel_layer = get_channel_layer()
-                    if channel_layer:
-                        # Send to user's notification group
-                        async_to_sync(channel_layer.group_send)(
-                            f"notifications_{booking.learner.id}",
-                            {
-                                "type": "notification_message",
-                                "message": {
-                                    "id": notification.id,
-                                    "title": notification.title,
-                                    "message": notification.message,
-                                    "link": notification.link,
-                                    "created_at": notification.created_at.isoformat(),
-                                    "is_read": False
-                                }
-                            }
-                        )
-                        
-                        # Send to user's dashboard group
-                        async_to_sync(channel_layer.group_send)(
-                            f"dashboard_{booking.learner.id}",
-                            {
-                                "type": "session_update",
-                                "message": {
-                                    "session_id": session.id,
-                                    "status": "live",
-                                    "room_code": str(session.room_code),
-                                    "join_url": f"/sessions/{session.room_code}/join/?direct=true"
-                                }
-                            }
-                        )
-                except Exception as e:
-                    logger.error(f"Error sending WebSocket notification: {str(e)}")
-            except Exception as e:
-                logger.error(f"Error creating notification: {str(e)}")
+                for learner_id in learner_ids
+            ])
+            
+            # Send each notification to its user's notification group
+            events = [
+                ([f"notifications_{learner_id}"], {
+                    "type": "notification_message",
+                    "message": {
+                        "id": notification.id,
+                        "title": notification.title,
+                        "message": notification.message,
+                        "link": notification.link,
+                        "created_at": notification.created_at.isoformat(),
+                        "is_read": False
+                    }
+                })
+                for learner_id, notification in zip(learner_ids, notifications)
+            ]
+            
+            # Send to the learners' dashboard groups
+            events.append(([f"dashboard_{learner_id}" for learner_id in learner_ids], {
+                "type": "session_update",
+                "message": {
+                    "session_id": session.id,
+                    "status": "live",
+                    "room_code": str(session.room_code),
+                    "join_url": join_url
+                }
+            }))
+            outbox.enqueue(events)
     
     # Check if this is a direct access request and what role was specified
     is_direct = request.GET.get('direct') == 'true'
@@ -1195,127 +1188,94 @@ def go_live_session(request, room_code):
         )
         return redirect('users:mentor_session_detail', session_id=session.id)
     
-    # Update session status to live and record the start time
-    session.status = Session.LIVE
-    session.live_started_at = timezone.now()
-    session.save()
-    
-    # Set up logging
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"Session {session.id} set to live by mentor {request.user.id} in go_live_session view")
-    
-    # Import necessary modules
-    from apps.notifications.models import Notification
-    from channels.layers import get_channel_layer
-    from asgiref.sync import async_to_sync
-    
-    # Get the channel layer for WebSocket communications
-    channel_layer = get_channel_layer()
-    
-    # Import improved notification utility
-    from apps.notifications.utils import send_notification_to_user
     import time
+    from apps.notifications.utils import serialize_notification
     
     # Get session details for notifications
     session_title = session.title
     mentor_name = session.mentor.get_full_name() or session.mentor.username
     join_url = f"/sessions/{session.room_code}/join/?direct=true"
     
-    # Get all confirmed bookings for this session
-    confirmed_bookings = session.bookings.filter(status=Booking.CONFIRMED)
-    booking_count = confirmed_bookings.count()
-    
-    # Log the notification attempt with clear count
-    logger.info(f"Sending 'Session is Live' notifications to {booking_count} learners for session {session.id}")
-    
-    # Notify all confirmed learners with improved notifications
-    for booking in confirmed_bookings:
-        try:
-            learner = booking.learner
-            learner_id = learner.id
-            learner_name = learner.get_full_name() or learner.username
-            
-            # Create an urgent notification in the database with improved formatting and clearer call-to-action
-            notification = Notification.objects.create(
-                user=learner,
-                title="🔴 Your Session is Live Now!",
-                message=f"Your booked session '{session_title}' with {mentor_name} is now live! Click here to join immediately.",
-                notification_type='success',  # Changed to success type for better visibility
-                reference_id=session.id,
-                link=join_url
-            )
-            
-            logger.info(f"Created database notification {notification.id} for learner {learner_id}")
-            
-            # For redundancy, also use the notification utility which handles WebSocket communication
-            send_notification_to_user(
-                user_id=learner_id,
-                title="🔴 Join Your Live Session Now",
-                message=f"Your session '{session_title}' with {mentor_name} has started! Join now to avoid missing any content.",
-                notification_type="success",
-                reference_id=session.id
+    # The status change, the learners' notifications and their WebSocket
+    # messages are written together; the outbox publishes the messages
+    # after commit, so going live does not wait on every learner's sockets
+    with transaction.atomic():
+        # Update session status to live and record the start time
+        session.status = Session.LIVE
+        session.live_started_at = timezone.now()
+        session.save()
+        
+        logger.info("Session %s set to live by mentor %s in go_live_session view", session.id, request.user.id)
+        
+        # Get all confirmed learners for this session
+        learner_ids = list(
+            session.bookings.filter(status=Booking.CONFIRMED).values_list('learner_id', flat=True)
+        )
+        
+        # Log the notification attempt with clear count
+        logger.info("Sending 'Session is Live' notifications to %s learners for session %s", len(learner_ids), session.id)
+        
+        # Each learner gets an urgent notification with a clear call-to-action,
+        # plus a shorter reminder that is pushed to their notification feed
+        notifications = Notification.objects.bulk_create([
+            notification
+            for learner_id in learner_ids
+            for notification in (
+                Notification(
+                    user_id=learner_id,
+                    title="🔴 Your Session is Live Now!",
+                    message=f"Your booked session '{session_title}' with {mentor_name} is now live! Click here to join immediately.",
+                    notification_type='success',
+                    reference_id=session.id,
+                    link=join_url
+                ),
+                Notification(
+                    user_id=learner_id,
+                    title="🔴 Join Your Live Session Now",
+                    message=f"Your session '{session_title}' with {mentor_name} has started! Join now to avoid missing any content.",
+                    notification_type='success',
+                    reference_id=session.id
+                ),
             )
-            
-            # Send real-time WebSocket notifications for immediate alerts (multiple channels for redundancy)
-            if channel_layer:
-                try:
-                    # 1. Send to user's notification group with improved formatting
-                    async_to_sync(channel_layer.group_send)(
-                        f"notif_{learner_id}",  # Corrected group name format
-                        {
-                            "type": "notification_message",
-                            "notification": {  # Correct key name for improved compatibility
-                                "id": notification.id,
-                                "title": "🔴 Session Started - Join Now!",
-                                "message": notification.message,
-                                "link": notification.link,
-                                "created_at": notification.created_at.isoformat(),
-                                "read": False,
-                                "notification_type": "success"
-                            }
-                        }
-                    )
-                    
-                    # 2. Send to user's dashboard group with enhanced data
-                    async_to_sync(channel_layer.group_send)(
-                        f"dashboard_{learner_id}",
-                        {
-                            "type": "session_update",
-                            "message": {
-                                "session_id": session.id,
-                                "title": session_title,
-                                "mentor_name": mentor_name,
-                                "status": "live",
-                                "room_code": str(session.room_code),
-                                "join_url": join_url,
-                                "timestamp": int(time.time())  # Add timestamp for easier frontend handling
-                            }
-                        }
-                    )
-                    
-                    # 3. Also try the notifications group name format for maximum compatibility
-                    async_to_sync(channel_layer.group_send)(
-                        f"notifications_{learner_id}",
-                        {
-                            "type": "notification_message",
-                            "message": {
-                                "id": notification.id,
-                                "title": "🔴 Session Started - Join Now!",
-                                "message": notification.message,
-                                "link": notification.link,
-                                "created_at": notification.created_at.isoformat(),
-                                "is_read": False
-                            }
-                        }
-                    )
-                    
-                    logger.info(f"Successfully sent WebSocket notifications to learner {learner_id}")
-                except Exception as e:
-                    logger.error(f"Error sending WebSocket notification to learner {learner_id}: {str(e)}")
-                    # Continue despite WebSocket errors - we have the database notification as backup
-        except Exception as e:
-            logger.error(f"Error processing notification for learner {booking.learner.id}: {str(e)}")
+        ])
+        
+        # Real-time WebSocket notifications for immediate alerts (multiple channels for redundancy)
+        events = []
+        for index, learner_id in enumerate(learner_ids):
+            notification, reminder = notifications[2 * index], notifications[2 * index + 1]
+            live_alert = {
+                "id": notification.id,
+                "title": "🔴 Session Started - Join Now!",
+                "message": notification.message,
+                "link": notification.link,
+                "created_at": notification.created_at.isoformat(),
+            }
+            events.append(([f"notif_{learner_id}"], {
+                "type": "notification_message",
+                "notification": serialize_notification(reminder)
+            }))
+            events.append(([f"notif_{learner_id}"], {
+                "type": "notification_message",
+                "notification": {**live_alert, "read": False, "notification_type": "success"}
+            }))
+            events.append(([f"notifications_{learner_id}"], {
+                "type": "notification_message",
+                "message": {**live_alert, "is_read": False}
+            }))
+        
+        events.append(([f"dashboard_{learner_id}" for learner_id in learner_ids], {
+            "type": "session_update",
+            "message": {
+                "session_id": session.id,
+                "title": session_title,
+                "mentor_name": mentor_name,
+                "status": "live",
+                "room_code": str(session.room_code),
+                "join_url": join_url,
+                "timestamp": int(time.time())  # Add timestamp for easier frontend handling
+            }
+        }))
+        outbox.enqueue(events)
     
     messages.success(request, 'Session is now live. Joining room...')
     
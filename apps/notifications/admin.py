@@ -5,7 +5,7 @@ Admin configuration for the notifications app.
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Notification
+from .models import Notification, NotificationCounter, OutboxEvent
 
 class NotificationAdmin(admin.ModelAdmin):
     """Admin configuration for the Notification model."""
@@ -21,5 +21,38 @@ class NotificationAdmin(admin.ModelAdmin):
         return obj.message
     
     message_short.short_description = _('Message')
+    
+    # Edits and deletes here bypass the unread counters, so the affected
+    # users' counters are rebuilt afterwards
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and {'read', 'user'} & set(form.changed_data):
+            for user_id in {obj.user_id, form.initial.get('user')} - {None}:
+                NotificationCounter.recount(user_id)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        NotificationCounter.recount(obj.user_id)
+    
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            NotificationCounter.recount(user_id)
 
 admin.site.register(Notification, NotificationAdmin)
+
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Admin configuration for the OutboxEvent model."""
+    list_display = ('id', 'group_count', 'created_at', 'published_at', 'attempts')
+    list_filter = ('published_at', 'created_at')
+    readonly_fields = ('created_at', 'claimed_at', 'published_at')
+    
+    def group_count(self, obj):
+        """Display the number of groups the event is sent to."""
+        return len(obj.groups)
+    
+    group_count.short_description = _('Groups')
+
+admin.site.register(OutboxEvent, OutboxEventAdmin)
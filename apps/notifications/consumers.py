@@ -5,17 +5,27 @@ WebSocket consumers for real-time notifications.
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from django.conf import settings
 
-from .models import Notification
+from apps.core.metrics import InstrumentedConsumerMixin, database_sync_to_async
+from apps.core.ratelimit import RateLimitedConsumerMixin
+from .models import Notification, NotificationCounter
+from .utils import format_cursor, parse_cursor
 
 logger = logging.getLogger(__name__)
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(InstrumentedConsumerMixin, RateLimitedConsumerMixin, AsyncWebsocketConsumer):
     """
     Consumer for real-time user notifications.
+    Client actions are rate limited per action (WEBSOCKET_RATE_LIMITS['notifications']).
+    On connect the client gets its unread count and the newest unread
+    notifications; older ones are paged with `fetch_unread` and the cursor
+    from the previous page.
     """
     
+    rate_limit_scope = 'notifications'
+    page_size = getattr(settings, 'NOTIFICATION_UNREAD_PAGE_SIZE', 20)
+    
     async def connect(self):
         """
         Called when the websocket is handshaking.
@@ -39,7 +49,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
-        # Send all unread notifications on connect
+        # Send the unread count and the newest unread notifications on connect
         await self.send_unread_notifications()
     
     async def disconnect(self, close_code):
@@ -52,7 +62,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.notification_group_name,
                 self.channel_name
             )
-            logger.info(f"User removed from notification group: {self.notification_group_name}")
+            logger.debug("User removed from notification group: %s", self.notification_group_name)
     
     async def receive(self, text_data):
         """
@@ -61,6 +71,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         data = json.loads(text_data)
         action = data.get('action')
         
+        if not await self.allow_message(action):
+            return
+        
         if action == 'mark_read':
             notification_id = data.get('notification_id')
             if notification_id:
@@ -76,6 +89,16 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.send(text_data=json.dumps({
                 'type': 'all_notifications_read'
             }))
+        
+        elif action == 'fetch_unread':
+            cursor = parse_cursor(data.get('cursor'))
+            if cursor is None:
+                await self.send(text_data=json.dumps({
+                    'type': 'error',
+                    'message': 'A valid cursor is required'
+                }))
+                return
+            await self.send_unread_notifications(cursor)
     
     async def notification_message(self, event):
         """
@@ -90,34 +113,48 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
         """Mark a notification as read."""
-        try:
-            notification = Notification.objects.get(id=notification_id, user=self.scope['user'])
-            if not notification.read:
-                notification.read = True
-                notification.save()
-            return True
-        except Notification.DoesNotExist:
+        notifications = Notification.objects.filter(id=notification_id, user=self.scope['user'])
+        if not notifications.exists():
             return False
+        notifications.mark_read()
+        return True
     
     @database_sync_to_async
     def mark_all_notifications_read(self):
         """Mark all notifications as read for the user."""
-        Notification.objects.filter(user=self.scope['user'], read=False).update(read=True)
+        Notification.objects.filter(user=self.scope['user'], read=False).mark_read()
     
-    async def send_unread_notifications(self):
-        """Send all unread notifications to the client."""
-        notifications = await self.get_unread_notifications()
-        
-        await self.send(text_data=json.dumps({
+    async def send_unread_notifications(self, cursor=None):
+        """
+        Send one page of unread notifications. The first page (no cursor)
+        also carries the unread count.
+        """
+        notifications, next_cursor = await self.get_unread_notifications(cursor)
+        message = {
             'type': 'unread_notifications',
-            'notifications': notifications
-        }))
+            'notifications': notifications,
+            'next_cursor': format_cursor(next_cursor),
+        }
+        if cursor is None:
+            message['unread_count'] = await self.get_unread_count()
+        
+        await self.send(text_data=json.dumps(message))
     
     @database_sync_to_async
-    def get_unread_notifications(self):
-        """Get all unread notifications for the user."""
+    def get_unread_count(self):
+        """Get the user's unread count from their counter."""
+        return NotificationCounter.unread_for(self.scope['user'].id)
+    
+    @database_sync_to_async
+    def get_unread_notifications(self, cursor=None):
+        """Get one page of unread notifications for the user, newest first."""
+        page, next_cursor = Notification.objects.filter(
+            user=self.scope['user'],
+            read=False
+        ).page(self.page_size, cursor)
+        
         notifications = []
-        for notification in Notification.objects.filter(user=self.scope['user'], read=False).order_by('-created_at'):
+        for notification in page:
             # Extract first sentence as title or use a default title
             title = notification.message.split('.')[0] if notification.message else "New Notification"
             
@@ -131,9 +168,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             }
             
             # Add link if available
-            if hasattr(notification, 'link') and notification.link:
+            if notification.link:
                 notification_data['link'] = notification.link
                 
             notifications.append(notification_data)
             
-        return notifications
\ No newline at end of file
+        return notifications, next_cursor
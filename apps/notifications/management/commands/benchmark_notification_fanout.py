@@ -0,0 +1,71 @@
+"""
+Command to measure per-recipient cost of notification fan-out.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.notifications.utils import send_notification_to_multiple_users, send_notification_to_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Compare the bulk fan-out with one send_notification_to_user per recipient."""
+
+    help = 'Notifies 10, 100 and 1000 synthetic users and reports time and queries per recipient'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10, 100, 1000],
+            help='Recipient counts to benchmark',
+        )
+
+    def handle(self, *args, **options):
+        """Run both paths for each size inside a rolled back transaction."""
+        self.stdout.write(
+            f"{'recipients':>10} {'path':>10} {'total ms':>10} {'ms/recipient':>13} "
+            f"{'queries':>8} {'delivered':>10}"
+        )
+        for size in options['sizes']:
+            with transaction.atomic():
+                user_ids = self.create_users(size)
+                for name, send in (('per-user', self.send_per_user), ('bulk', send_notification_to_multiple_users)):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        results = send(user_ids, 'Benchmark', 'Fan-out benchmark notification.')
+                        elapsed = (time.perf_counter() - started) * 1000
+                    self.stdout.write(
+                        f"{size:>10} {name:>10} {elapsed:>10.1f} {elapsed / size:>13.3f} "
+                        f"{len(queries.captured_queries):>8} {sum(results.values()):>10}"
+                    )
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Notification fan-out benchmark complete'))
+
+    @staticmethod
+    def send_per_user(user_ids, title, message):
+        """The previous implementation: one full send per recipient."""
+        return {
+            user_id: send_notification_to_user(user_id, title, message)
+            for user_id in user_ids
+        }
+
+    @staticmethod
+    def create_users(count):
+        """Create throwaway recipients and return their IDs."""
+        prefix = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create([
+            User(username=f'bench_{prefix}_{i}', email=f'bench_{prefix}_{i}@example.com')
+            for i in range(count)
+        ])
+        if users and users[0].pk is None:
+            users = User.objects.filter(username__startswith=f'bench_{prefix}_')
+        return [user.pk for user in users]
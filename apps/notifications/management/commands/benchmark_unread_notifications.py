@@ -0,0 +1,99 @@
+"""
+Command to measure what a notification socket connect costs for users with
+many unread notifications.
+"""
+import json
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.notifications.models import Notification, NotificationCounter
+from apps.notifications.utils import format_cursor
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Compare the paged connect payload with sending every unread notification."""
+
+    help = 'Builds the connect payload for users with 10, 1000 and 10000 unread notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10, 1000, 10000],
+            help='Unread notification counts to benchmark',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=20,
+            help='Unread notifications sent on connect',
+        )
+
+    def handle(self, *args, **options):
+        """Build both payloads for each size inside a rolled back transaction."""
+        self.stdout.write(
+            f"{'unread':>8} {'payload':>8} {'ms':>8} {'queries':>8} {'items':>8} {'bytes':>9}"
+        )
+        for size in options['sizes']:
+            with transaction.atomic():
+                user = self.create_user(size)
+                for name, build in (('all', self.build_all), ('paged', self.build_paged)):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        payload = build(user, options['page_size'])
+                        elapsed = (time.perf_counter() - started) * 1000
+                    self.stdout.write(
+                        f"{size:>8} {name:>8} {elapsed:>8.1f} {len(queries.captured_queries):>8} "
+                        f"{len(payload['notifications']):>8} {len(json.dumps(payload)):>9}"
+                    )
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Unread notification benchmark complete'))
+
+    @staticmethod
+    def serialize(notification):
+        return {
+            'id': notification.id,
+            'title': notification.message.split('.')[0],
+            'message': notification.message,
+            'created_at': notification.created_at.isoformat(),
+            'read': notification.read,
+        }
+
+    def build_all(self, user, page_size):
+        """The previous connect payload: every unread notification."""
+        notifications = Notification.objects.filter(user=user, read=False).order_by('-created_at')
+        return {
+            'type': 'unread_notifications',
+            'notifications': [self.serialize(notification) for notification in notifications],
+        }
+
+    def build_paged(self, user, page_size):
+        """The current connect payload: the unread count and the newest page."""
+        page, next_cursor = Notification.objects.filter(user=user, read=False).page(page_size)
+        return {
+            'type': 'unread_notifications',
+            'notifications': [self.serialize(notification) for notification in page],
+            'next_cursor': format_cursor(next_cursor),
+            'unread_count': NotificationCounter.unread_for(user.id),
+        }
+
+    @staticmethod
+    def create_user(unread):
+        """Create a throwaway user with `unread` unread notifications."""
+        prefix = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'bench_{prefix}', email=f'bench_{prefix}@example.com')
+        NotificationCounter.recount(user.id)
+        Notification.objects.bulk_create([
+            Notification(user=user, message=f'Benchmark notification {i}. Details follow.')
+            for i in range(unread)
+        ])
+        return user
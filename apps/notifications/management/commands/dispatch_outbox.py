@@ -0,0 +1,68 @@
+"""
+Command that publishes outbox events to the channel layer.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.outbox import outbox
+
+
+class Command(BaseCommand):
+    """Run the outbox dispatcher worker."""
+
+    help = 'Publishes committed outbox events to the channel layer in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=outbox.batch_size,
+            help='Events claimed and sent per batch',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the outbox is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        """Drain the outbox, then keep polling unless --once is given."""
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            raise CommandError('No channel layer is configured')
+        if isinstance(channel_layer, InMemoryChannelLayer):
+            # Events sent here would never reach the web process's sockets;
+            # there NOTIFICATION_OUTBOX_DISPATCH_ON_COMMIT publishes them
+            raise CommandError('The in-memory channel layer only delivers within one process; configure Redis')
+
+        if options['once']:
+            published = asyncio.run(outbox.drain(channel_layer, options['batch_size']))
+            self.stdout.write(self.style.SUCCESS(f'Dispatched {published} outbox events'))
+            return
+
+        self.stdout.write(f"Dispatching outbox events every {options['poll_interval']}s (Ctrl+C to stop)")
+        try:
+            asyncio.run(self.run(channel_layer, options['batch_size'], options['poll_interval']))
+        except KeyboardInterrupt:
+            self.stdout.write('Outbox dispatcher stopped')
+
+    async def run(self, channel_layer, batch_size, poll_interval):
+        """Poll the outbox and purge old published events about once an hour."""
+        purged_at = 0
+        while True:
+            claimed = await outbox.drain(channel_layer, batch_size)
+            if time.monotonic() - purged_at > 3600:
+                await sync_to_async(outbox.purge)()
+                purged_at = time.monotonic()
+            if not claimed:
+                await asyncio.sleep(poll_interval)
@@ -0,0 +1,103 @@
+"""
+Command to load test the notifications_list polling endpoint.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from apps.notifications.models import Notification, NotificationCounter
+from apps.notifications.views import notifications_list
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Compare polling throughput of notifications_list before and after conditional GET."""
+
+    help = 'Polls notifications_list for a user with many notifications and reports requests per second'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--notifications',
+            type=int,
+            default=2000,
+            help='Notifications owned by the polling user (a quarter of them unread)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests per polling path',
+        )
+
+    def handle(self, *args, **options):
+        """Poll each path inside a rolled back transaction."""
+        factory = RequestFactory()
+        with transaction.atomic():
+            user = self.create_user(options['notifications'])
+            etag = notifications_list(self.request(factory, user))['ETag']
+
+            paths = (
+                ('before: full list', self.legacy_notifications_list, {}),
+                ('after: full list', notifications_list, {}),
+                ('after: unchanged (304)', notifications_list, {'HTTP_IF_NONE_MATCH': etag}),
+            )
+            self.stdout.write(f"{'path':>24} {'status':>7} {'req/s':>9} {'ms/req':>8} {'queries':>8}")
+            for name, view, headers in paths:
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(self.request(factory, user, **headers))
+                started = time.perf_counter()
+                for _ in range(options['requests']):
+                    view(self.request(factory, user, **headers))
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:>24} {response.status_code:>7} {options['requests'] / elapsed:>9.0f} "
+                    f"{elapsed * 1000 / options['requests']:>8.2f} {len(queries.captured_queries):>8}"
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('notifications_list load test complete'))
+
+    @staticmethod
+    def request(factory, user, **headers):
+        request = factory.get('/users/api/notifications/', **headers)
+        request.user = user
+        return request
+
+    @staticmethod
+    def legacy_notifications_list(request):
+        """The previous view: count unread and serialize the 50 newest on every poll."""
+        unread_count = Notification.objects.filter(user=request.user, read=False).count()
+        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:50]
+        return JsonResponse({
+            'notifications': [
+                {
+                    'id': notification.id,
+                    'title': notification.title,
+                    'message': notification.message,
+                    'created_at': notification.created_at.isoformat(),
+                    'read': notification.read,
+                    'link': notification.link
+                }
+                for notification in notifications
+            ],
+            'unread_count': unread_count
+        })
+
+    @staticmethod
+    def create_user(count):
+        """Create a throwaway user with `count` notifications, a quarter unread."""
+        prefix = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'bench_{prefix}', email=f'bench_{prefix}@example.com')
+        Notification.objects.bulk_create([
+            Notification(user=user, title=f'Notification {i}', message=f'Load test notification {i}.', read=i % 4 != 0)
+            for i in range(count)
+        ])
+        NotificationCounter.recount(user.id)
+        return user
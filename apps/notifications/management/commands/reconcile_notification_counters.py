@@ -0,0 +1,59 @@
+"""
+Command to repair drift in NotificationCounter.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.notifications.models import Notification, NotificationCounter
+
+
+class Command(BaseCommand):
+    """Recount unread notifications and fix the counters that drifted."""
+
+    help = (
+        'Recounts unread notifications per user and corrects NotificationCounter, e.g. after '
+        'notifications were marked read or deleted in the admin or with update()'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted counters without changing them',
+        )
+
+    def handle(self, *args, **options):
+        """Compare every counter with a fresh count in one query, then fix the drifted ones."""
+        notifications = Notification.objects.filter(user=OuterRef('user_id')).order_by().values('user')
+        unread = notifications.annotate(count=Count('id', filter=Q(read=False))).values('count')
+        latest = notifications.annotate(latest=Max('id')).values('latest')
+        drifted = [
+            row
+            for row in NotificationCounter.objects.annotate(
+                actual_unread=Coalesce(Subquery(unread), 0),
+                actual_latest_id=Coalesce(Subquery(latest), 0)
+            ).values_list('user_id', 'unread', 'actual_unread', 'latest_id', 'actual_latest_id').iterator()
+            if row[1] != row[2] or row[3] != row[4]
+        ]
+
+        now = timezone.now()
+        for user_id, stored, actual, stored_latest_id, actual_latest_id in drifted:
+            self.stdout.write(
+                f"User {user_id}: counted {stored} unread (latest {stored_latest_id}), "
+                f"actually {actual} (latest {actual_latest_id})"
+            )
+            if not options['dry_run']:
+                # Apply the difference rather than the total so notifications
+                # created or read since the count above are not lost
+                NotificationCounter.objects.filter(user_id=user_id).update(
+                    unread=Greatest(F('unread') + (actual - stored), Value(0)),
+                    latest_id=actual_latest_id,
+                    updated_at=now
+                )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} counters have drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {len(drifted)} counters'))
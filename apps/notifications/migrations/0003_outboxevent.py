@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:18
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_notification_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('groups', models.JSONField(default=list, help_text='The channel layer groups the message still has to be sent to.')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The message passed to group_send.')),
+                ('notifications', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Notification fields and recipient IDs to store before the message is sent.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the event was written.')),
+                ('claimed_at', models.DateTimeField(blank=True, help_text='When a dispatcher last took the event for publishing.', null=True)),
+                ('published_at', models.DateTimeField(blank=True, help_text='When the event was sent to the channel layer.', null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of failed publish attempts.')),
+                ('last_error', models.TextField(blank=True, help_text='Error raised by the last failed publish attempt.')),
+            ],
+            options={
+                'verbose_name': 'Outbox Event',
+                'verbose_name_plural': 'Outbox Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['published_at', 'id'], name='notificatio_publish_4d70d9_idx')],
+            },
+        ),
+    ]
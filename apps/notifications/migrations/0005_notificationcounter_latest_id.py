@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:23
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notificationcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='latest_id',
+            field=models.PositiveBigIntegerField(default=0, help_text='ID of the newest notification.'),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Date and time when the notifications last changed.'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notificatio_user_id_90f3d6_idx'),
+        ),
+    ]
@@ -2,10 +2,64 @@
 Models for user notifications.
 """
 
-from django.db import models
+from collections import Counter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
+# Counters changed per UPDATE, keeping its parameter count within database limits
+COUNTER_BATCH_SIZE = 500
+
+
+class NotificationQuerySet(models.QuerySet):
+    """
+    Notification queries that keep each user's unread counter in step.
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert notifications and record them in their users' counters."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        NotificationCounter.add_created(objs)
+        return objs
+    
+    def mark_read(self):
+        """
+        Mark the unread notifications in this queryset as read and lower
+        their users' unread counters. Returns the number marked.
+        """
+        with transaction.atomic():
+            rows = list(self.filter(read=False).select_for_update().values_list('id', 'user_id'))
+            if not rows:
+                return 0
+            self.model.objects.filter(id__in=[row[0] for row in rows]).update(read=True)
+            NotificationCounter.add_read(Counter(user_id for _, user_id in rows))
+        return len(rows)
+    
+    def page(self, limit, cursor=None):
+        """
+        Return up to `limit` notifications of this queryset, newest first,
+        starting after `cursor` (a (created_at, id) pair), and the cursor of
+        the next page or None.
+        """
+        notifications = self
+        if cursor is not None:
+            created_at, notification_id = cursor
+            notifications = notifications.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=notification_id)
+            )
+        page = list(notifications.order_by('-created_at', '-id')[:limit + 1])
+        if len(page) <= limit:
+            return page, None
+        page = page[:limit]
+        return page, (page[-1].created_at, page[-1].id)
+
+
 class Notification(models.Model):
     """
     Model for user notifications.
@@ -69,12 +123,207 @@ class Notification(models.Model):
         verbose_name = _('Notification')
         verbose_name_plural = _('Notifications')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'read', '-created_at']),
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+    
+    objects = NotificationQuerySet.as_manager()
     
     def __str__(self):
         title_display = self.title if self.title else self.message[:30]
         return f"Notification for {self.user.username}: {title_display}..."
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            NotificationCounter.add_created([self])
+    
     def mark_as_read(self):
         """Mark the notification as read."""
+        Notification.objects.filter(pk=self.pk).mark_read()
         self.read = True
-        self.save()
+
+
+class NotificationCounter(models.Model):
+    """
+    Number of unread notifications per user and the newest notification ID,
+    kept up to date as notifications are created and marked read so neither
+    has to be queried from Notification on the hot path. A user's row is
+    built from their notifications the first time it is read; until then
+    changes to it are skipped.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter',
+        help_text=_('The user whose notifications are counted.')
+    )
+    
+    unread = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Number of unread notifications.')
+    )
+    
+    latest_id = models.PositiveBigIntegerField(
+        default=0,
+        help_text=_('ID of the newest notification.')
+    )
+    
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        help_text=_('Date and time when the notifications last changed.')
+    )
+    
+    class Meta:
+        verbose_name = _('Notification Counter')
+        verbose_name_plural = _('Notification Counters')
+    
+    def __str__(self):
+        return f"{self.unread} unread notifications for user {self.user_id}"
+    
+    @classmethod
+    def add_created(cls, notifications):
+        """Record new notifications in their users' existing counters."""
+        created = {}
+        for notification in notifications:
+            unread, latest_id = created.get(notification.user_id, (0, 0))
+            created[notification.user_id] = (
+                unread + (not notification.read),
+                max(latest_id, notification.id or 0)
+            )
+        
+        # One UPDATE per distinct unread delta (usually one for a fan-out),
+        # each user's newest ID picked out with a CASE
+        by_unread = {}
+        for user_id, (unread, latest_id) in created.items():
+            by_unread.setdefault(unread, {})[user_id] = latest_id
+        now = timezone.now()
+        for unread, latest_ids in by_unread.items():
+            for user_ids in cls.batches(list(latest_ids)):
+                latest_id = Case(
+                    *[When(user_id=user_id, then=Value(latest_ids[user_id])) for user_id in user_ids],
+                    output_field=models.PositiveBigIntegerField()
+                )
+                cls.objects.filter(user_id__in=user_ids).update(
+                    unread=F('unread') + unread,
+                    latest_id=Greatest('latest_id', latest_id),
+                    updated_at=now
+                )
+    
+    @classmethod
+    def add_read(cls, changes):
+        """Lower existing counters by {user_id: notifications marked read}."""
+        by_count = {}
+        for user_id, count in changes.items():
+            if count:
+                by_count.setdefault(count, []).append(user_id)
+        now = timezone.now()
+        for count, user_ids in by_count.items():
+            for batch in cls.batches(user_ids):
+                # Never below zero, even if the counter had drifted
+                cls.objects.filter(user_id__in=batch).update(
+                    unread=Greatest(F('unread') - count, Value(0)),
+                    updated_at=now
+                )
+    
+    @staticmethod
+    def batches(user_ids):
+        for start in range(0, len(user_ids), COUNTER_BATCH_SIZE):
+            yield user_ids[start:start + COUNTER_BATCH_SIZE]
+    
+    @classmethod
+    def for_user(cls, user_id):
+        """Return a user's counter, building it the first time."""
+        counter = cls.objects.filter(user_id=user_id).first()
+        if counter is None:
+            counter, _ = cls.objects.get_or_create(user_id=user_id, defaults=cls.count(user_id))
+        return counter
+    
+    @classmethod
+    def unread_for(cls, user_id):
+        """Return a user's unread count."""
+        return cls.for_user(user_id).unread
+    
+    @classmethod
+    def recount(cls, user_id):
+        """Rebuild a user's counter from their notifications."""
+        counter, _ = cls.objects.update_or_create(user_id=user_id, defaults=cls.count(user_id))
+        return counter.unread
+    
+    @staticmethod
+    def count(user_id):
+        """Count a user's notifications the slow way."""
+        totals = Notification.objects.filter(user_id=user_id).aggregate(
+            unread=Count('id', filter=Q(read=False)),
+            latest_id=Max('id')
+        )
+        return {
+            'unread': totals['unread'],
+            'latest_id': totals['latest_id'] or 0,
+            'updated_at': timezone.now(),
+        }
+
+
+class OutboxEvent(models.Model):
+    """
+    A channel layer message written in the same transaction as the change it
+    announces, and published to its groups by the outbox dispatcher after
+    commit. Events from rolled back transactions are never published.
+    """
+    groups = models.JSONField(
+        default=list,
+        help_text=_('The channel layer groups the message still has to be sent to.')
+    )
+    
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text=_('The message passed to group_send.')
+    )
+    
+    notifications = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        blank=True,
+        null=True,
+        help_text=_('Notification fields and recipient IDs to store before the message is sent.')
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text=_('Date and time when the event was written.')
+    )
+    
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_('When a dispatcher last took the event for publishing.')
+    )
+    
+    published_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_('When the event was sent to the channel layer.')
+    )
+    
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=_('Number of failed publish attempts.')
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        help_text=_('Error raised by the last failed publish attempt.')
+    )
+    
+    class Meta:
+        verbose_name = _('Outbox Event')
+        verbose_name_plural = _('Outbox Events')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['published_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"Outbox event {self.id} for {len(self.groups)} groups"
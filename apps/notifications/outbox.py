@@ -0,0 +1,281 @@
+"""
+Transactional outbox for channel layer fan-out.
+
+Views that change data and announce it over WebSockets write the messages
+to the OutboxEvent table inside their transaction instead of calling
+group_send there. Nothing is sent for writes that roll back, and the
+request never waits on the channel layer, however many users are told.
+A message sent to many groups is stored once, with the list of groups, and
+notifications for many users are stored once as a template that the
+dispatcher expands into Notification rows.
+
+Events are published in batches after commit, either by the
+`dispatch_outbox` management command or, when
+NOTIFICATION_OUTBOX_DISPATCH_ON_COMMIT is set, by the process that wrote
+them. With a broker such as channels_redis that process drains the outbox
+in a background thread. The in-memory channel layer only wakes consumers
+for sends made on the server's event loop, so there the drain is started
+as a task on that loop (recorded by OutboxLoopMiddleware, which wraps the
+ASGI application) and the committing request does not wait for it.
+Dispatchers claim events before sending, so
+several of them can run at once; an event whose dispatcher died is picked
+up again once its claim is older than NOTIFICATION_OUTBOX_CLAIM_TIMEOUT.
+Groups whose send failed are retried after the same delay, up to
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS times.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Notification, OutboxEvent
+from .utils import group_send_many
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """
+    Writes channel layer messages to the outbox and publishes them in batches.
+    """
+
+    def __init__(self, batch_size=200, max_attempts=5, claim_timeout=30, retention=86400,
+                 dispatch_on_commit=True):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self.retention = retention
+        self.dispatch_on_commit = dispatch_on_commit
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_task = None
+        self._loop_again = False
+
+    def enqueue(self, messages):
+        """
+        Write (groups, message) pairs to the outbox with one insert, where
+        `groups` lists the groups the message is sent to. Call this inside the
+        transaction that makes the change the messages announce. Returns the
+        number of events written.
+        """
+        events = OutboxEvent.objects.bulk_create([
+            OutboxEvent(groups=list(groups), payload=message)
+            for groups, message in messages
+            if groups
+        ])
+        if events and self.dispatch_on_commit:
+            transaction.on_commit(self.wake)
+        return len(events)
+
+    def notify(self, user_ids, notification, message=None):
+        """
+        Store a Notification with the `notification` fields for each of
+        `user_ids` when the current transaction commits, then send `message`,
+        if given, to their notif_<id> groups. Returns the number of events
+        written.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+        OutboxEvent.objects.create(
+            groups=[f"notif_{user_id}" for user_id in user_ids] if message else [],
+            payload=message or {},
+            notifications={'user_ids': user_ids, 'fields': notification}
+        )
+        if self.dispatch_on_commit:
+            transaction.on_commit(self.wake)
+        return 1
+
+    def claim(self, batch_size=None):
+        """
+        Take the oldest unpublished events that no other dispatcher holds.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            pending = OutboxEvent.objects.filter(
+                published_at__isnull=True,
+                attempts__lt=self.max_attempts
+            ).filter(
+                Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=self.claim_timeout))
+            ).order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                pending = pending.select_for_update(skip_locked=True)
+
+            events = list(pending[:batch_size or self.batch_size])
+            if events:
+                OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(claimed_at=now)
+        return events
+
+    def store_notifications(self, events):
+        """
+        Create the notifications carried by `events` and drop them from the
+        events in the same transaction, so they are stored exactly once.
+        """
+        events = [event for event in events if event.notifications]
+        if not events:
+            return 0
+
+        with transaction.atomic():
+            created = Notification.objects.bulk_create([
+                Notification(user_id=user_id, **event.notifications['fields'])
+                for event in events
+                for user_id in event.notifications['user_ids']
+            ])
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(notifications=None)
+        return len(created)
+
+    def record(self, events, sends, outcomes):
+        """
+        Mark events whose groups were all sent as published. Events with
+        failed groups keep only those groups and their claim, so they are
+        retried once it expires.
+        """
+        failed = {}
+        for (event, group), outcome in zip(sends, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("Error publishing outbox event %s to %s: %s", event.id, group, outcome)
+                failed.setdefault(event, []).append((group, outcome))
+
+        for event, errors in failed.items():
+            OutboxEvent.objects.filter(id=event.id).update(
+                groups=[group for group, _ in errors],
+                attempts=F('attempts') + 1,
+                last_error=str(errors[-1][1])
+            )
+
+        published = {event.id for event in events} - {event.id for event in failed}
+        if published:
+            OutboxEvent.objects.filter(id__in=published).update(published_at=timezone.now())
+        return len(published)
+
+    async def dispatch_batch(self, channel_layer, batch_size=None):
+        """
+        Claim one batch, store its notifications, and send every message to
+        its groups concurrently. Returns the number of events claimed.
+        """
+        events = await sync_to_async(self.claim)(batch_size)
+        if not events:
+            return 0
+
+        await sync_to_async(self.store_notifications)(events)
+        sends = [(event, group) for event in events for group in event.groups]
+        outcomes = await group_send_many(channel_layer, [(group, event.payload) for event, group in sends])
+        published = await sync_to_async(self.record)(events, sends, outcomes)
+        logger.info("Published %s of %s outbox events to %s groups", published, len(events), len(sends))
+        return len(events)
+
+    async def drain(self, channel_layer, batch_size=None):
+        """
+        Publish batches until no claimable events are left. Returns the
+        number of events claimed.
+        """
+        batch_size = batch_size or self.batch_size
+        total = 0
+        while True:
+            claimed = await self.dispatch_batch(channel_layer, batch_size)
+            total += claimed
+            if claimed < batch_size:
+                return total
+
+    def purge(self):
+        """
+        Delete events published more than `retention` seconds ago.
+        """
+        cutoff = timezone.now() - timedelta(seconds=self.retention)
+        deleted, _ = OutboxEvent.objects.filter(published_at__lt=cutoff).delete()
+        return deleted
+
+    def bind_loop(self, loop):
+        """Record the server's event loop, where in-memory layer sends must run."""
+        self._loop = loop
+
+    def wake(self):
+        """
+        Publish committed events without waiting for them: in a task on the
+        server's event loop with the in-memory channel layer, otherwise by
+        asking the background dispatcher thread to drain the outbox,
+        starting it if needed.
+        """
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        loop = self._loop
+        if isinstance(channel_layer, InMemoryChannelLayer) and loop is not None and not loop.is_closed():
+            # A fresh context, so the task does not inherit the request's
+            # (asgiref would take it for a sync_to_async call still running)
+            loop.call_soon_threadsafe(self._start_loop_drain, channel_layer, context=contextvars.Context())
+            return
+
+        # Without a server loop nothing in this process listens on an
+        # in-memory layer, but notifications still have to be stored
+        self._wake.set()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _start_loop_drain(self, channel_layer):
+        """Start a drain task on the server loop, or have the running one go again."""
+        if self._loop_task is not None and not self._loop_task.done():
+            self._loop_again = True
+            return
+        self._loop_task = asyncio.ensure_future(self._drain_on_loop(channel_layer))
+
+    async def _drain_on_loop(self, channel_layer):
+        while True:
+            self._loop_again = False
+            try:
+                await self.drain(channel_layer)
+            except Exception as e:
+                logger.error("Error dispatching outbox events: %s", e)
+            if not self._loop_again:
+                return
+
+    def _run(self):
+        """
+        Background dispatcher loop, off every request's critical path.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                channel_layer = get_channel_layer()
+                if channel_layer is not None:
+                    async_to_sync(self.drain)(channel_layer)
+            except Exception as e:
+                logger.error("Error dispatching outbox events: %s", e)
+            finally:
+                connections.close_all()
+
+
+class OutboxLoopMiddleware:
+    """
+    ASGI middleware telling the outbox which event loop serves requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        outbox.bind_loop(asyncio.get_running_loop())
+        return await self.app(scope, receive, send)
+
+
+outbox = Outbox(
+    batch_size=getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 200),
+    max_attempts=getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5),
+    claim_timeout=getattr(settings, 'NOTIFICATION_OUTBOX_CLAIM_TIMEOUT', 30),
+    retention=getattr(settings, 'NOTIFICATION_OUTBOX_RETENTION', 86400),
+    dispatch_on_commit=getattr(settings, 'NOTIFICATION_OUTBOX_DISPATCH_ON_COMMIT', True),
+)
@@ -1,18 +1,59 @@
 """
 Utility functions for notifications module
 """
+import asyncio
 import logging
 import json
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
+
+from apps.core.ratelimit import stamp
 
 from .models import Notification
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+def serialize_notification(notification):
+    """
+    Format a notification the way NotificationConsumer sends it to clients.
+    """
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat(),
+        'read': notification.read,
+        'notification_type': notification.notification_type,
+        'reference_id': notification.reference_id,
+    }
+
+def format_cursor(cursor):
+    """
+    Encode a (created_at, id) paging cursor for clients, or None.
+    """
+    if cursor is None:
+        return None
+    created_at, notification_id = cursor
+    return f"{created_at.isoformat()}|{notification_id}"
+
+def parse_cursor(value):
+    """
+    Decode a paging cursor sent by a client, or return None if it is invalid.
+    """
+    try:
+        created_at, notification_id = str(value).rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        notification_id = int(notification_id)
+    except (TypeError, ValueError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, notification_id
+
 def send_notification_to_user(user_id, title, message, notification_type='info', reference_id=None):
     """
     Create a notification and send it to the user via WebSocket.
@@ -41,15 +82,7 @@ def send_notification_to_user(user_id, title, message, notification_type='info',
         )
         
         # Format notification data for sending
-        notification_data = {
-            'id': notification.id,
-            'title': notification.title,
-            'message': notification.message,
-            'created_at': notification.created_at.isoformat(),
-            'read': notification.read,
-            'notification_type': notification.notification_type,
-            'reference_id': notification.reference_id,
-        }
+        notification_data = serialize_notification(notification)
         
         # Send to WebSocket group
         channel_layer = get_channel_layer()
@@ -66,20 +99,35 @@ def send_notification_to_user(user_id, title, message, notification_type='info',
             }
         )
         
-        logger.info(f"Sent notification '{title}' to user {user_id}")
+        logger.info("Sent notification '%s' to user %s", title, user_id)
         return True
         
     except User.DoesNotExist:
-        logger.error(f"Failed to send notification: User with ID {user_id} does not exist")
+        logger.error("Failed to send notification: User with ID %s does not exist", user_id)
         return False
     except Exception as e:
-        logger.exception(f"Error sending notification to user {user_id}: {str(e)}")
+        logger.exception("Error sending notification to user %s: %s", user_id, e)
         return False
 
+async def group_send_many(channel_layer, messages):
+    """
+    Send (group, message) pairs concurrently on one event loop, stamped so
+    receiving consumers can tell how far behind they are.
+    Returns one result per pair: None on success or the raised exception.
+    """
+    return await asyncio.gather(
+        *(channel_layer.group_send(group, stamp(message)) for group, message in messages),
+        return_exceptions=True
+    )
+
 def send_notification_to_multiple_users(user_ids, title, message, notification_type='info', reference_id=None):
     """
     Send the same notification to multiple users.
     
+    Existing recipients are found with one query, their notifications are
+    written with one bulk insert, and every WebSocket group send is issued
+    concurrently from a single async_to_sync call.
+    
     Args:
         user_ids (list): List of user IDs to send the notification to
         title (str): The notification title
@@ -90,9 +138,60 @@ def send_notification_to_multiple_users(user_ids, title, message, notification_t
     Returns:
         dict: Dictionary with user_id keys and boolean values indicating success
     """
-    results = {}
-    for user_id in user_ids:
-        results[user_id] = send_notification_to_user(
-            user_id, title, message, notification_type, reference_id
-        )
-    return results
\ No newline at end of file
+    results = {user_id: False for user_id in user_ids}
+    if not results:
+        return results
+    
+    # Map each requested ID to its integer primary key, dropping unknown users
+    primary_keys = {}
+    for user_id in results:
+        try:
+            primary_keys[user_id] = int(user_id)
+        except (TypeError, ValueError):
+            logger.error("Failed to send notification: invalid user ID %r", user_id)
+    
+    try:
+        existing_ids = set(User.objects.filter(id__in=primary_keys.values()).values_list('id', flat=True))
+        recipients = []
+        for user_id, pk in primary_keys.items():
+            if pk in existing_ids:
+                recipients.append(user_id)
+            else:
+                logger.error("Failed to send notification: User with ID %s does not exist", user_id)
+        
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user_id=primary_keys[user_id],
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                reference_id=reference_id
+            )
+            for user_id in recipients
+        ])
+    except Exception as e:
+        logger.exception("Error creating notifications for %s users: %s", len(results), e)
+        return results
+    
+    messages = [
+        (f'notif_{user_id}', {
+            'type': 'notification_message',
+            'notification': serialize_notification(notification)
+        })
+        for user_id, notification in zip(recipients, notifications)
+    ]
+    
+    try:
+        outcomes = async_to_sync(group_send_many)(get_channel_layer(), messages)
+    except Exception as e:
+        logger.exception("Error sending notifications to %s users: %s", len(messages), e)
+        return results
+    
+    for user_id, outcome in zip(recipients, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("Error sending notification to user %s: %s", user_id, outcome)
+        else:
+            results[user_id] = True
+    
+    logger.info("Sent notification '%s' to %s of %s users", title, sum(results.values()), len(results))
+    return results
@@ -2,32 +2,75 @@
 API views for notifications.
 """
 
+import hashlib
 import json
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
-from django.views.decorators.http import require_POST, require_GET
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST, require_GET
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 
-from .models import Notification
+from .models import Notification, NotificationCounter
+from .utils import format_cursor, parse_cursor
+
+# Notifications per page of notifications_list, and the most a client may ask for
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def notification_counter(request):
+    """
+    The requesting user's notification counter, loaded once per request.
+    """
+    if not hasattr(request, '_notification_counter'):
+        request._notification_counter = NotificationCounter.for_user(request.user.id)
+    return request._notification_counter
+
+
+def notifications_etag(request):
+    """
+    ETag for a notifications page: changes whenever a notification is
+    created or marked read, and differs per cursor and limit.
+    """
+    counter = notification_counter(request)
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()[:8]
+    return f"{counter.latest_id}-{counter.unread}-{query}"
+
+
+def notifications_last_modified(request):
+    """
+    Last-Modified for a notifications page: when the notifications last changed.
+    """
+    return notification_counter(request).updated_at
 
 
 @login_required
 @require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=notifications_etag, last_modified_func=notifications_last_modified)
 def notifications_list(request):
     """
-    Get a list of notifications for the current user.
+    Get a page of notifications for the current user, newest first.
+    
+    Pages are keyed by the `cursor` returned as `next_cursor` by the previous
+    page, and hold up to `limit` notifications (50 by default). Responses
+    carry an ETag and Last-Modified taken from the user's notification
+    counter, so an unchanged poll gets a 304 without reading notifications.
     """
-    # Get unread count first
-    unread_count = Notification.objects.filter(
-        user=request.user,
-        read=False
-    ).count()
+    cursor = None
+    if request.GET.get('cursor'):
+        cursor = parse_cursor(request.GET['cursor'])
+        if cursor is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
     
-    # Get the user's notifications
-    notifications = Notification.objects.filter(
-        user=request.user
-    ).order_by('-created_at')[:50]  # Limit to 50 most recent notifications
+    try:
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    # Get one page of the user's notifications
+    notifications, next_cursor = Notification.objects.filter(user=request.user).page(limit, cursor)
     
     # Format the notifications for JSON response
     notifications_data = []
@@ -44,7 +87,8 @@ def notifications_list(request):
     # Return JSON response
     return JsonResponse({
         'notifications': notifications_data,
-        'unread_count': unread_count
+        'unread_count': notification_counter(request).unread,
+        'next_cursor': format_cursor(next_cursor)
     })
 
 
@@ -58,8 +102,7 @@ def mark_notification_read(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
     
     # Mark as read
-    notification.read = True
-    notification.save()
+    notification.mark_as_read()
     
     # Return success response
     return JsonResponse({'success': True})
@@ -71,11 +114,8 @@ def mark_all_read(request):
     """
     Mark all notifications as read.
     """
-    # Get unread notifications
-    notifications = Notification.objects.filter(user=request.user, read=False)
-    
-    # Mark all as read
-    notifications.update(read=True)
+    # Mark all unread notifications as read
+    count = Notification.objects.filter(user=request.user, read=False).mark_read()
     
     # Return success response
-    return JsonResponse({'success': True, 'count': notifications.count()})
\ No newline at end of file
+    return JsonResponse({'success': True, 'count': count})
\ No newline at end of file
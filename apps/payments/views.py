@@ -30,7 +30,7 @@ try:
 except Exception as e:
     import logging
     logger = logging.getLogger(__name__)
-    logger.error(f"Failed to initialize Razorpay client: {str(e)}")
+    logger.error("Failed to initialize Razorpay client: %s", e)
     client = None
 
 @login_required
@@ -108,7 +108,7 @@ def payment_create(request, booking_id):
             amount = int(float(decimal_price) * 100)  # Amount in paise
     except Exception as conv_error:
         # Fallback if conversion fails
-        logger.error(f"Price conversion error: {str(conv_error)}")
+        logger.error("Price conversion error: %s", conv_error)
         amount = max(100, int(float(str(booking.session.price).replace(',', '')) * 100))  # Minimum amount
     currency = 'INR'
     
@@ -132,7 +132,7 @@ def payment_create(request, booking_id):
             # Log the detailed error
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"Razorpay order creation failed: {str(razorpay_error)}")
+            logger.error("Razorpay order creation failed: %s", razorpay_error)
             
             # Fall back to auto-confirm for demo purposes
             messages.warning(request, 'Payment gateway is temporarily unavailable. For demonstration purposes, we will automatically confirm your booking.')
@@ -216,7 +216,7 @@ def payment_create(request, booking_id):
         # Log the error with more details
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Payment creation error: {str(e)}")
+        logger.error("Payment creation error: %s", e)
         
         messages.error(request, f'Error creating payment: {str(e)}')
         return redirect('sessions:detail', pk=booking.session.id)
@@ -293,7 +293,7 @@ def payment_webhook(request):
     
     except Exception as e:
         # Log the error
-        print(f"Webhook error: {str(e)}")
+        logger.error("Webhook error: %s", e)
         return HttpResponse(status=500)
 
 @login_required
@@ -325,7 +325,7 @@ def payment_success(request, payment_id):
             client.utility.verify_payment_signature(params_dict)
             payment_verified = True
         except Exception as e:
-            print(f"Signature verification failed: {str(e)}")
+            logger.error("Signature verification failed: %s", e)
             payment_verified = False
         
         # Fetch payment details from Razorpay
@@ -336,7 +336,7 @@ def payment_success(request, payment_id):
             else:
                 payment_succeeded = False
         except Exception as e:
-            print(f"Payment fetch failed: {str(e)}")
+            logger.error("Payment fetch failed: %s", e)
             payment_succeeded = payment_verified  # Fall back to signature verification
             
         # Process successful payment
@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import CustomUser, UserRating
+from .models import CustomUser, MentorRanking, UserRating
 
 class CustomUserAdmin(UserAdmin):
     """Admin configuration for the CustomUser model."""
@@ -42,5 +42,12 @@ class UserRatingAdmin(admin.ModelAdmin):
     search_fields = ('mentor__username', 'learner__username', 'review')
     ordering = ('-created_at',)
 
+class MentorRankingAdmin(admin.ModelAdmin):
+    """Read-only view of the mentor leaderboard."""
+    list_display = ('mentor', 'score', 'avg_rating', 'rating_count', 'upcoming_sessions_count', 'live_sessions_count', 'refreshed_at')
+    search_fields = ('mentor__username', 'mentor__email')
+    readonly_fields = list_display + ('sessions_count',)
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(UserRating, UserRatingAdmin)
+admin.site.register(MentorRanking, MentorRankingAdmin)
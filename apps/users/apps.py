@@ -0,0 +1,16 @@
+"""
+App configuration for the users app.
+"""
+
+from django.apps import AppConfig
+
+
+class UsersConfig(AppConfig):
+    """Configuration for the users app."""
+    
+    name = 'apps.users'
+    label = 'users'
+    
+    def ready(self):
+        """Connect model signal handlers."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,169 @@
+"""
+Materialized mentor leaderboard.
+
+MentorRanking keeps one row per active mentor with a scheduled upcoming or
+live session: their rating average and count, session counts and a
+composite score. The learner dashboard and the home page read the top rows
+with one indexed query instead of aggregating sessions and ratings on each
+request.
+
+Saving or deleting a session or rating marks its mentor stale, and the
+mentor's row is recomputed once the transaction commits. Sessions stop
+being upcoming as time passes without any write, so the
+refresh_mentor_rankings command rebuilds every row and should run
+periodically.
+
+The score is the rating average pulled towards RATING_PRIOR_MEAN as if the
+mentor had RATING_PRIOR_COUNT more ratings, so one 5-star rating does not
+outrank a long record, plus a bonus for being live and a small one per
+upcoming session.
+"""
+import threading
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import CustomUser, MentorRanking
+
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_COUNT = 5
+LIVE_BONUS = 0.5
+UPCOMING_WEIGHT = 0.05
+UPCOMING_CAP = 10
+
+
+def score(avg_rating, rating_count, upcoming_sessions_count, live_sessions_count):
+    """The composite score ranking mentors on the leaderboard."""
+    weighted_rating = (
+        (avg_rating * rating_count + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT)
+        / (rating_count + RATING_PRIOR_COUNT)
+    )
+    return (
+        weighted_rating
+        + (LIVE_BONUS if live_sessions_count else 0)
+        + UPCOMING_WEIGHT * min(upcoming_sessions_count, UPCOMING_CAP)
+    )
+
+
+class MentorLeaderboard:
+    """
+    Computes MentorRanking rows and refreshes them after writes.
+    """
+
+    def __init__(self):
+        # Mentors marked stale in each thread and not refreshed yet
+        self._local = threading.local()
+
+    def compute(self, mentor_ids=None):
+        """
+        Return unsaved MentorRanking rows for the ranked mentors among
+        `mentor_ids` (all mentors if None), with two queries.
+        """
+        from apps.learning_sessions.models import Session
+
+        now = timezone.now()
+        mentors = CustomUser.objects.filter(role=CustomUser.MENTOR, is_active=True)
+        if mentor_ids is not None:
+            mentors = mentors.filter(id__in=mentor_ids)
+
+        session_counts = Session.objects.filter(mentor__in=mentors).order_by().values('mentor').annotate(
+            upcoming=Count('id', filter=Q(status=Session.SCHEDULED, schedule__gte=now)),
+            live=Count('id', filter=Q(status=Session.LIVE)),
+            total=Count('id'),
+        )
+        # Rating aggregates are stored on the user by UserRating writes
+        ratings = {
+            mentor_id: (average, count)
+            for mentor_id, average, count in mentors.values_list('id', '_rating_average', '_rating_count')
+        }
+
+        rows = []
+        for counts in session_counts:
+            if not counts['upcoming'] and not counts['live']:
+                continue
+            average, count = ratings.get(counts['mentor'], (0, 0))
+            rows.append(MentorRanking(
+                mentor_id=counts['mentor'],
+                avg_rating=average,
+                rating_count=count,
+                upcoming_sessions_count=counts['upcoming'],
+                live_sessions_count=counts['live'],
+                sessions_count=counts['total'],
+                score=score(average, count, counts['upcoming'], counts['live']),
+            ))
+        return rows
+
+    def refresh(self, mentor_ids=None):
+        """
+        Recompute the rows of `mentor_ids`, or of every mentor if None,
+        removing mentors that are no longer ranked. Returns the rows saved.
+        """
+        if mentor_ids is not None:
+            mentor_ids = list(mentor_ids)
+            if not mentor_ids:
+                return []
+
+        with transaction.atomic():
+            started = timezone.now()
+            rows = self.compute(mentor_ids)
+            MentorRanking.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['mentor'],
+                update_fields=[
+                    'avg_rating', 'rating_count', 'upcoming_sessions_count', 'live_sessions_count',
+                    'sessions_count', 'score', 'refreshed_at',
+                ],
+                batch_size=500,
+            )
+            # Every row still ranked was just rewritten; older ones are stale
+            stale = MentorRanking.objects.filter(refreshed_at__lt=started)
+            if mentor_ids is not None:
+                stale = stale.filter(mentor_id__in=mentor_ids)
+            stale.delete()
+        return rows
+
+    def mark_stale(self, mentor_id):
+        """Recompute `mentor_id`'s row when the current transaction commits."""
+        if not mentor_id:
+            return
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = set()
+        pending.add(mentor_id)
+        # Registered on every call: a rolled back transaction drops its
+        # callbacks but not `pending`, so it cannot be used to skip this
+        transaction.on_commit(self.refresh_pending)
+
+    def refresh_pending(self):
+        """
+        Recompute the rows of the mentors marked stale in this thread. The
+        first callback of a commit refreshes them all; the rest find nothing
+        left. Mentors left over from a rolled back transaction are refreshed
+        too, which is harmless.
+        """
+        pending = getattr(self._local, 'pending', None)
+        if pending:
+            self._local.pending = set()
+            self.refresh(pending)
+
+    def top_mentors(self, limit=6):
+        """
+        The `limit` highest ranked mentors, with avg_rating, rating count
+        and session counts set on each user as the dashboard templates
+        expect.
+        """
+        mentors = []
+        for ranking in MentorRanking.objects.select_related('mentor')[:limit]:
+            mentor = ranking.mentor
+            mentor.avg_rating = ranking.avg_rating
+            mentor.rating_count_annotated = ranking.rating_count
+            mentor.upcoming_sessions_count = ranking.upcoming_sessions_count
+            mentor.active_sessions_count = ranking.live_sessions_count
+            mentor.ranking_score = ranking.score
+            mentors.append(mentor)
+        return mentors
+
+
+leaderboard = MentorLeaderboard()
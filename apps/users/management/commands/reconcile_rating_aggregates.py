@@ -0,0 +1,58 @@
+"""
+Command to repair drift in the stored mentor rating averages and counts.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.users.models import CustomUser, UserRating
+
+
+class Command(BaseCommand):
+    """Recompute every user's rating aggregates and fix the ones that drifted."""
+
+    help = 'Recomputes rating averages and counts from UserRating and corrects the stored values'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted users without changing them',
+        )
+
+    def handle(self, *args, **options):
+        """Compare every stored aggregate with a fresh one in one query, then fix the drifted ones."""
+        ratings = UserRating.objects.filter(mentor=OuterRef('pk')).order_by().values('mentor')
+        users = CustomUser.objects.annotate(
+            actual_count=Coalesce(
+                Subquery(ratings.annotate(count=Count('id')).values('count'), output_field=IntegerField()),
+                Value(0)
+            ),
+            actual_total=Coalesce(
+                Subquery(ratings.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()),
+                Value(0)
+            ),
+            actual_average=Coalesce(
+                Subquery(ratings.annotate(average=Avg('rating')).values('average'), output_field=FloatField()),
+                Value(0.0)
+            ),
+        ).values_list('id', '_rating_average', '_rating_count', 'actual_average', 'actual_count', 'actual_total')
+
+        drifted = [
+            row for row in users.iterator()
+            if row[2] != row[4] or abs(row[1] - row[3]) > 1e-6
+        ]
+        for user_id, average, count, actual_average, actual_count, actual_total in drifted:
+            self.stdout.write(
+                f"User {user_id}: stored {count} ratings averaging {average:.2f}, "
+                f"actually {actual_count} averaging {actual_average:.2f}"
+            )
+            if not options['dry_run']:
+                # Apply the difference rather than the totals so ratings
+                # written since the query above are not lost
+                CustomUser.add_ratings(user_id, actual_count - count, actual_total - average * count)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} users have drifted rating aggregates'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {len(drifted)} users'))
@@ -0,0 +1,22 @@
+"""
+Command to rebuild the mentor leaderboard.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.users.leaderboard import leaderboard
+
+
+class Command(BaseCommand):
+    """Recompute every MentorRanking row; run it periodically, e.g. every few minutes from cron."""
+
+    help = 'Recomputes the mentor leaderboard, ranking mentors with upcoming or live sessions'
+
+    def handle(self, *args, **options):
+        """Rebuild the table in one transaction and report how many mentors are ranked."""
+        started = time.perf_counter()
+        rows = leaderboard.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ranked {len(rows)} mentors in {time.perf_counter() - started:.2f}s'
+        ))
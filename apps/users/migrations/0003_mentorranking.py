@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+
+def rank_mentors(apps, schema_editor):
+    from apps.users.leaderboard import score
+
+    CustomUser = apps.get_model('users', 'CustomUser')
+    MentorRanking = apps.get_model('users', 'MentorRanking')
+    Session = apps.get_model('learning_sessions', 'Session')
+    UserRating = apps.get_model('users', 'UserRating')
+    now = timezone.now()
+    mentors = CustomUser.objects.filter(role='mentor', is_active=True)
+    ratings = {
+        row['mentor']: row
+        for row in UserRating.objects.filter(mentor__in=mentors).order_by().values('mentor').annotate(
+            average=Avg('rating'), count=Count('id'))
+    }
+    rows = []
+    for counts in Session.objects.filter(mentor__in=mentors).order_by().values('mentor').annotate(
+            upcoming=Count('id', filter=Q(status='scheduled', schedule__gte=now)),
+            live=Count('id', filter=Q(status='live')),
+            total=Count('id')):
+        if counts['upcoming'] or counts['live']:
+            rating = ratings.get(counts['mentor'], {'average': 0, 'count': 0})
+            rows.append(MentorRanking(
+                mentor_id=counts['mentor'],
+                avg_rating=rating['average'] or 0,
+                rating_count=rating['count'],
+                upcoming_sessions_count=counts['upcoming'],
+                live_sessions_count=counts['live'],
+                sessions_count=counts['total'],
+                score=score(rating['average'] or 0, rating['count'], counts['upcoming'], counts['live']),
+            ))
+    MentorRanking.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser__rating_average_customuser__rating_count'),
+        ('learning_sessions', '0007_topic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorRanking',
+            fields=[
+                ('mentor', models.OneToOneField(help_text='The ranked mentor.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('avg_rating', models.FloatField(default=0, help_text='Average rating received.')),
+                ('rating_count', models.PositiveIntegerField(default=0, help_text='Number of ratings received.')),
+                ('upcoming_sessions_count', models.PositiveIntegerField(default=0, help_text='Scheduled sessions that have not started yet.')),
+                ('live_sessions_count', models.PositiveIntegerField(default=0, help_text='Sessions currently live.')),
+                ('sessions_count', models.PositiveIntegerField(default=0, help_text='All sessions hosted, in any status.')),
+                ('score', models.FloatField(default=0, help_text='Composite ranking score; higher ranks first.')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='Date and time when this row was last computed.')),
+            ],
+            options={
+                'verbose_name': 'Mentor Ranking',
+                'verbose_name_plural': 'Mentor Rankings',
+                'ordering': ['-score', '-upcoming_sessions_count', '-live_sessions_count'],
+                'indexes': [models.Index(fields=['-score', '-upcoming_sessions_count', '-live_sessions_count'], name='mentor_ranking_order')],
+            },
+        ),
+        migrations.RunPython(rank_mentors, migrations.RunPython.noop),
+    ]
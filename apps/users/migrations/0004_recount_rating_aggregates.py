@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:50
+
+from django.db import migrations
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_rating_aggregates(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    UserRating = apps.get_model('users', 'UserRating')
+    ratings = UserRating.objects.filter(mentor=OuterRef('pk')).order_by().values('mentor')
+    CustomUser.objects.update(
+        _rating_average=Coalesce(
+            Subquery(ratings.annotate(average=Avg('rating')).values('average'), output_field=FloatField()),
+            Value(0.0)
+        ),
+        _rating_count=Coalesce(
+            Subquery(ratings.annotate(count=Count('id')).values('count'), output_field=IntegerField()),
+            Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_mentorranking'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,9 @@
 User models for the PeerLearn platform.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Value, When
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
@@ -118,37 +120,21 @@ class CustomUser(AbstractUser):
             return '/admin/'
         return '/'
         
-    # Rating fields stored in the database
+    # Rating aggregates, kept in step by UserRating writes
     _rating_average = models.FloatField(default=0, db_column='rating_average')
     _rating_count = models.IntegerField(default=0, db_column='rating_count')
     
     @property
     def rating_average(self):
-        """Calculate the average rating for this user."""
+        """Average rating received by this mentor."""
         # Only applies to mentors
         if not self.is_mentor:
             return 0
         
         if hasattr(self, 'avg_rating') and self.avg_rating is not None:
             return self.avg_rating
-            
-        # If we have the stored value and no annotation, use it
-        if self._rating_average > 0:
-            return self._rating_average
-            
-        # Otherwise calculate
-        ratings = self.ratings_received.all()
-        if not ratings.exists():
-            return 0
-            
-        total_rating = sum(r.rating for r in ratings)
-        avg_rating = int(total_rating / ratings.count())
-        
-        # Store for future use
-        self._rating_average = avg_rating
-        self.save(update_fields=['_rating_average'])
         
-        return avg_rating
+        return self._rating_average
     
     @rating_average.setter
     def rating_average(self, value):
@@ -157,34 +143,45 @@ class CustomUser(AbstractUser):
     
     @property
     def rating_count(self):
-        """Get the number of ratings for this user."""
+        """Number of ratings received by this mentor."""
         if not self.is_mentor:
             return 0
         
         if hasattr(self, 'rating_count_annotated') and self.rating_count_annotated is not None:
             return self.rating_count_annotated
-            
-        # If we have the stored value and no annotation, use it
-        if self._rating_count > 0:
-            return self._rating_count
-        
-        # Otherwise calculate
-        count = self.ratings_received.count()
-        
-        # Store for future use
-        self._rating_count = count
-        self.save(update_fields=['_rating_count'])
         
-        return count
+        return self._rating_count
         
     @rating_count.setter
     def rating_count(self, value):
         """Setter for rating_count."""
         self._rating_count = value
+    
+    @classmethod
+    def add_ratings(cls, mentor_id, count, total):
+        """
+        Apply `count` more ratings (fewer if negative) adding `total` to
+        their sum to a mentor's stored average and count, in one UPDATE.
+        """
+        if not count and not total:
+            return
+        new_count = F('_rating_count') + count
+        cls.objects.filter(pk=mentor_id).update(
+            _rating_average=Case(
+                When(_rating_count__lte=-count, then=Value(0.0)),
+                default=ExpressionWrapper(
+                    (F('_rating_average') * F('_rating_count') + total) / new_count,
+                    output_field=models.FloatField()
+                ),
+            ),
+            _rating_count=Greatest(new_count, Value(0)),
+        )
 
 class UserRating(models.Model):
     """
     Model to store ratings given to mentors by learners.
+    Each rating is counted in its mentor's stored rating average and count
+    by save() and the post_delete signal.
     """
     mentor = models.ForeignKey(
         CustomUser,
@@ -222,3 +219,98 @@ class UserRating(models.Model):
     
     def __str__(self):
         return f"Rating for {self.mentor.username} by {self.learner.username}: {self.rating}/5"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored mentor and rating to update the aggregates on save."""
+        rating = super().from_db(db, field_names, values)
+        if 'mentor_id' in rating.__dict__ and 'rating' in rating.__dict__:
+            rating._loaded = (rating.mentor_id, rating.rating)
+        return rating
+    
+    def save(self, *args, **kwargs):
+        """Save the rating and apply the change to its mentor's aggregates."""
+        update_fields = kwargs.get('update_fields')
+        tracked = self._state.adding or hasattr(self, '_loaded')
+        if update_fields is not None and not {'rating', 'mentor', 'mentor_id'} & set(update_fields):
+            tracked = False
+        
+        loaded = getattr(self, '_loaded', None) if not self._state.adding else None
+        # One transaction, so on_commit hooks fired by post_save (such as
+        # the leaderboard refresh) see the updated aggregates
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not tracked:
+                # Loaded with mentor or rating deferred; reconcile_rating_aggregates
+                # picks up any change
+                return
+            
+            if loaded is None:
+                CustomUser.add_ratings(self.mentor_id, 1, self.rating)
+            elif loaded[0] != self.mentor_id:
+                CustomUser.add_ratings(loaded[0], -1, -loaded[1])
+                CustomUser.add_ratings(self.mentor_id, 1, self.rating)
+            else:
+                CustomUser.add_ratings(self.mentor_id, 0, self.rating - loaded[1])
+        self._loaded = (self.mentor_id, self.rating)
+
+
+class MentorRanking(models.Model):
+    """
+    Precomputed leaderboard row for a mentor with upcoming or live sessions.
+    Rows are refreshed per mentor when their ratings or sessions change and
+    rebuilt by the refresh_mentor_rankings command (see leaderboard.py).
+    """
+    mentor = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        help_text=_('The ranked mentor.')
+    )
+    
+    avg_rating = models.FloatField(
+        default=0,
+        help_text=_('Average rating received.')
+    )
+    
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Number of ratings received.')
+    )
+    
+    upcoming_sessions_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Scheduled sessions that have not started yet.')
+    )
+    
+    live_sessions_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Sessions currently live.')
+    )
+    
+    sessions_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('All sessions hosted, in any status.')
+    )
+    
+    score = models.FloatField(
+        default=0,
+        help_text=_('Composite ranking score; higher ranks first.')
+    )
+    
+    refreshed_at = models.DateTimeField(
+        auto_now=True,
+        help_text=_('Date and time when this row was last computed.')
+    )
+    
+    class Meta:
+        verbose_name = _('Mentor Ranking')
+        verbose_name_plural = _('Mentor Rankings')
+        ordering = ['-score', '-upcoming_sessions_count', '-live_sessions_count']
+        indexes = [
+            models.Index(fields=['-score', '-upcoming_sessions_count', '-live_sessions_count'], name='mentor_ranking_order'),
+        ]
+    
+    def __str__(self):
+        return f"{self.mentor.username}: {self.score:.2f}"
@@ -0,0 +1,49 @@
+"""
+Search index for users and mentor profiles (see apps.core.search).
+"""
+from haystack import indexes
+
+from .models import CustomUser
+
+
+class UserIndex(indexes.SearchIndex, indexes.Indexable):
+    """
+    Indexes a user's names and email and, for mentors, their expertise,
+    skills and bio. `auto` holds word prefixes of the names, email,
+    expertise and skills so partly typed words match.
+    """
+
+    text = indexes.CharField(document=True)
+    auto = indexes.EdgeNgramField()
+    role = indexes.CharField(model_attr='role')
+
+    # Saving only other fields (last_login on every sign-in, for one)
+    # leaves the document unchanged
+    indexed_fields = frozenset({'username', 'first_name', 'last_name', 'email', 'role', 'expertise', 'skills', 'bio'})
+
+    # Searched in the database while the index is not built yet
+    fallback_fields = ('username', 'first_name', 'last_name', 'email', 'expertise', 'skills', 'bio')
+
+    def get_model(self):
+        return CustomUser
+
+    def get_updated_field(self):
+        return 'date_updated'
+
+    @staticmethod
+    def profile_terms(user):
+        terms = []
+        for values in (user.expertise, user.skills):
+            if isinstance(values, list):
+                terms.extend(str(value) for value in values)
+            elif values:
+                terms.append(str(values))
+        return terms
+
+    def prepare_text(self, user):
+        return '\n'.join([
+            user.username, user.get_full_name(), user.email, *self.profile_terms(user), user.bio or '',
+        ])
+
+    def prepare_auto(self, user):
+        return ' '.join([user.username, user.get_full_name(), user.email, *self.profile_terms(user)])
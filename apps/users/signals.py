@@ -0,0 +1,40 @@
+"""
+Signal handlers for the users app.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.learning_sessions.autocomplete import MENTOR, autocomplete
+from apps.learning_sessions.models import Session
+from .leaderboard import leaderboard
+from .models import CustomUser, UserRating
+
+
+@receiver(post_save, sender=UserRating)
+@receiver(post_delete, sender=UserRating)
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def refresh_mentor_ranking(sender, instance, **kwargs):
+    """Recompute the leaderboard row of the mentor a rating or session belongs to."""
+    leaderboard.mark_stale(instance.mentor_id)
+
+
+@receiver(post_delete, sender=UserRating)
+def uncount_deleted_rating(sender, instance, **kwargs):
+    """Take a deleted rating off its mentor's stored average and count."""
+    mentor_id, rating = getattr(instance, '_loaded', (instance.mentor_id, instance.rating))
+    CustomUser.add_ratings(mentor_id, -1, -rating)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def suggest_mentor(sender, instance, signal, update_fields=None, **kwargs):
+    """Have autocomplete pick up a mentor who joined, left or was renamed, once committed."""
+    if update_fields is not None and not {'username', 'first_name', 'last_name', 'role', 'is_active'} & set(update_fields):
+        return
+    suggested = signal is post_save and instance.role == CustomUser.MENTOR and instance.is_active
+    label = (instance.get_full_name() or instance.username) if suggested else None
+    transaction.on_commit(partial(autocomplete.note, MENTOR, instance.pk, label))
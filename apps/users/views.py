@@ -15,6 +15,7 @@ import json
 
 from .models import CustomUser, UserRating
 from apps.learning_sessions.models import Session, Booking
+from apps.core.search import site_search
 from .forms import (
     LearnerSignUpForm, MentorSignUpForm, 
     UserLoginForm, LearnerProfileForm, 
@@ -131,8 +132,12 @@ class MentorListView(ListView):
     context_object_name = 'mentors'
     
     def get_queryset(self):
-        """Filter to only show mentors."""
-        return CustomUser.objects.filter(role=CustomUser.MENTOR)
+        """Filter to only show mentors, best matches first when searching."""
+        mentors = CustomUser.objects.filter(role=CustomUser.MENTOR)
+        query = self.request.GET.get('query')
+        if query:
+            return site_search.search(mentors, query, role=CustomUser.MENTOR)
+        return mentors
 
 @method_decorator(login_required, name='dispatch')
 class MentorDetailView(DetailView):
@@ -196,108 +201,10 @@ def rate_mentor(request, pk):
     return redirect('users:mentor_detail', pk=pk)
 
 def get_top_mentors(user, limit=6):
-    """Get top rated mentors for recommendation."""
-    from apps.users.models import CustomUser
-    from django.db.models import Avg, Count, Q, F, Case, When, Value, IntegerField
-    from apps.learning_sessions.models import Session
-    import logging
-    from django.utils import timezone
-    
-    # Set up logger for debugging
-    logger = logging.getLogger(__name__)
-    
-    # Get current time to filter out mentors with no upcoming sessions
-    now = timezone.now()
-    
-    # First, get only valid mentors with proper profiles and upcoming sessions
-    # This ensures we only show mentors who are active and have sessions
-    all_active_mentors = CustomUser.objects.filter(
-        role=CustomUser.MENTOR,
-        is_active=True,
-        # Ensure mentors have properly configured profiles
-        first_name__isnull=False,
-        last_name__isnull=False
-    ).filter(
-        # Only include mentors who have at least one upcoming session
-        # Use the correct related_name from Session model to CustomUser
-        Q(session__schedule__gte=now, session__status='scheduled') |
-        Q(session__status='live')
-    ).distinct().annotate(
-        # Calculate ratings properly
-        avg_rating=Avg('ratings_received__rating'),
-        rating_count=Count('ratings_received'),
-        # Count valid upcoming sessions with correct related_name
-        upcoming_sessions_count=Count(
-            'session',
-            filter=Q(session__schedule__gte=now) & Q(session__status='scheduled')
-        ),
-        # Count active sessions with correct related_name
-        active_sessions_count=Count(
-            'session',
-            filter=Q(session__status='live')
-        )
-    )
+    """Get top rated mentors for recommendation from the precomputed leaderboard."""
+    from apps.users.leaderboard import leaderboard
     
-    # Log how many valid mentors we have
-    mentor_count = all_active_mentors.count()
-    logger.info(f"Found {mentor_count} valid active mentors with upcoming/live sessions")
-    
-    # If we have no valid mentors at all, return an empty list
-    if mentor_count == 0:
-        return []
-    
-    # First try to get well-rated mentors with at least one session
-    top_rated = all_active_mentors.filter(
-        # Must have at least one rating and a good score
-        Q(rating_count__gte=1, avg_rating__gte=4) |
-        # OR at least have some upcoming or active sessions
-        Q(upcoming_sessions_count__gte=1) |
-        Q(active_sessions_count__gte=1)
-    ).order_by('-avg_rating', '-upcoming_sessions_count', '-active_sessions_count')[:limit]
-    
-    # Log how many top rated mentors we found
-    top_rated_count = top_rated.count()
-    logger.info(f"Found {top_rated_count} top rated mentors")
-    
-    # If we don't have enough top rated mentors, include other active mentors
-    if top_rated_count < limit:
-        # Get the IDs of mentors we already have - use a list of IDs instead of mentor objects
-        existing_ids = list(top_rated.values_list('id', flat=True))
-        
-        # How many more mentors we need
-        additional_needed = limit - top_rated_count
-        logger.info(f"Need {additional_needed} more mentors to fill quota")
-        
-        # Get additional mentors based on session count
-        active_mentors = all_active_mentors.exclude(
-            id__in=existing_ids
-        ).annotate(
-            session_count=Count('session')
-        ).order_by('-session_count')[:additional_needed]
-        
-        # Log how many active mentors we found to supplement
-        active_mentors_count = active_mentors.count()
-        logger.info(f"Found {active_mentors_count} additional active mentors")
-        
-        # Combine the lists
-        top_rated = list(top_rated) + list(active_mentors)
-    
-    # If we still don't have any mentors (unlikely, but possible with no ratings and no sessions)
-    # Just get any mentors up to the limit
-    if len(top_rated) == 0:
-        logger.info("No rated or active mentors found, getting any available mentors")
-        top_rated = list(all_active_mentors.order_by('?')[:limit])
-    
-    # Make sure all mentors have avg_rating and rating_count attributes
-    for mentor in top_rated:
-        if mentor.avg_rating is None:
-            mentor.avg_rating = 0
-        if mentor.rating_count is None:
-            mentor.rating_count = 0
-    
-    # Log final count before returning
-    logger.info(f"Returning {len(top_rated)} mentors")
-    return top_rated
+    return leaderboard.top_mentors(limit)
 
 def learner_dashboard(request):
     """View for learner dashboard with tab navigation support."""
@@ -319,96 +226,38 @@ def learner_dashboard(request):
     if active_tab not in valid_tabs:
         active_tab = 'home'
     
-    # Get real ML-based recommendations (no fake data)
-    from apps.learning_sessions.models import Session, Booking, SessionRequest
-    from django.db.models import Q, Count, Avg, F, ExpressionWrapper, fields
+    from apps.learning_sessions.models import SessionRequest
+    from django.db.models import Q
     from django.utils import timezone
-    import json
     import logging
     
     logger = logging.getLogger(__name__)
     now = timezone.now()
     
-    # Recommended sessions based on the learner's interests and career goal
-    recommended_sessions = []
+    # Recommended sessions based on the learner's interests and career goal,
+    # or the most booked upcoming sessions if nothing matches
+    from apps.learning_sessions.recommendations import recommender, sessions_in_order
+
+    upcoming_sessions = recommender.upcoming_sessions(now).select_related('mentor')
+    recommended_sessions = sessions_in_order(recommender.for_learner(request.user, limit=6), upcoming_sessions)
     trending_sessions = []
-    
-    logger.info(f"Finding recommendations for user {request.user.id} with schedule after {now}")
-    
-    # Try to fetch personalized recommendations - strictly future sessions only
-    if hasattr(request.user, 'interests') and request.user.interests:
-        # Convert interests string to list if stored as JSON string
-        user_interests = request.user.interests if isinstance(request.user.interests, list) else json.loads(request.user.interests or '[]')
-        
-        if user_interests:
-            # Get ONLY future sessions or currently live sessions related to user interests
-            interest_filter = Q(topics__overlap=user_interests)
-            if hasattr(request.user, 'career_goal') and request.user.career_goal:
-                interest_filter = interest_filter | Q(title__icontains=request.user.career_goal) | Q(description__icontains=request.user.career_goal)
-            
-            status_filter = Q(status='scheduled') | Q(status='live')
-            time_filter = Q(schedule__gte=now)
-            
-            # Combined filter with strict time enforcement
-            combined_filter = status_filter & time_filter & interest_filter
-            
-            # Select only sessions with valid mentors (properly configured)
-            from apps.users.models import CustomUser
-            recommended_sessions = Session.objects.filter(combined_filter).filter(
-                mentor__role=CustomUser.MENTOR,
-                mentor__is_active=True
-            ).select_related('mentor').distinct().order_by('schedule')[:6]
-            
-            logger.info(f"Found {recommended_sessions.count()} personalized recommendations")
-    
-    # If no personalized recommendations, get trending sessions with strict time filters
-    if not recommended_sessions or recommended_sessions.count() == 0:
-        logger.info("No personalized recommendations found, getting trending sessions")
-        # Get trending sessions by number of bookings - ONLY future or live sessions
-        status_filter = Q(status='scheduled') | Q(status='live')
-        time_filter = Q(schedule__gte=now)
-        
-        # Combined filter with strict time enforcement
-        combined_filter = status_filter & time_filter
-        
-        # Get sessions with confirmed bookings and valid mentors only
-        from apps.users.models import CustomUser
-        trending_sessions = Session.objects.filter(combined_filter).filter(
-            mentor__role=CustomUser.MENTOR,
-            mentor__is_active=True
-        ).select_related('mentor').annotate(
-            booking_count=Count('bookings', filter=Q(bookings__status='confirmed'))
-        ).order_by('-booking_count', 'schedule')[:6]
-        
-        logger.info(f"Found {trending_sessions.count()} trending sessions")
-        
-    # If still no sessions found, just get ANY upcoming sessions as a final fallback
-    if (not recommended_sessions or recommended_sessions.count() == 0) and (not trending_sessions or trending_sessions.count() == 0):
-        logger.info("No trending sessions found either, getting ANY upcoming sessions as fallback")
-        from apps.users.models import CustomUser
-        fallback_sessions = Session.objects.filter(
-            Q(status='scheduled') | Q(status='live'),
-            schedule__gte=now,
-            mentor__role=CustomUser.MENTOR,
-            mentor__is_active=True
-        ).select_related('mentor').order_by('schedule')[:6]
-        
-        trending_sessions = fallback_sessions
-        logger.info(f"Found {fallback_sessions.count()} fallback sessions")
+    if not recommended_sessions:
+        trending_sessions = sessions_in_order(recommender.trending(limit=6, now=now), upcoming_sessions)
+    logger.debug(
+        "Learner %s: %s recommended, %s trending sessions",
+        request.user.id, len(recommended_sessions), len(trending_sessions)
+    )
     
     # Mark sessions that are already booked by this learner
     booked_session_ids = Booking.objects.filter(
         learner=request.user
     ).values_list('session_id', flat=True)
     
-    # Add attendee_count to recommended sessions
-    for session in recommended_sessions:
-        session.attendee_count = Booking.objects.filter(session=session, status__in=['confirmed', 'completed']).count()
-        session.is_booked = session.id in booked_session_ids
+    booked_session_ids = set(booked_session_ids)
     
-    # Add attendee_count to trending sessions
-    for session in trending_sessions:
-        session.attendee_count = Booking.objects.filter(session=session, status__in=['confirmed', 'completed']).count()
+    # Add attendee_count to recommended and trending sessions
+    for session in [*recommended_sessions, *trending_sessions]:
+        session.attendee_count = session.confirmed_bookings_count
         session.is_booked = session.id in booked_session_ids
     
     # Get activities (consolidated from bookings and requests)
@@ -494,14 +343,10 @@ def learner_dashboard(request):
     activities.sort(key=lambda x: x['timestamp'], reverse=True)
     
     # Get unread notifications count
-    from apps.notifications.models import Notification
-    unread_notifications_count = Notification.objects.filter(
-        user=request.user,
-        read=False
-    ).count()
+    from apps.notifications.models import NotificationCounter
+    unread_notifications_count = NotificationCounter.unread_for(request.user.id)
     
     # Get all active sessions for topic filtering
-    from apps.learning_sessions.models import Session
     time_filter = now - timezone.timedelta(hours=1)
     all_sessions = Session.objects.filter(
         Q(status='scheduled') | Q(status='live'),
@@ -661,7 +506,7 @@ def learner_activity_partial(request):
                           time_diff > -booking.session.duration)
             
             # Log session info for debugging
-            logger.info(f"Session {booking.session.id} for booking {booking.id}: time_diff={time_diff}, is_joinable={is_joinable}, status={booking.session.status}")
+            logger.debug("Session %s for booking %s: time_diff=%s, is_joinable=%s, status=%s", booking.session.id, booking.id, time_diff, is_joinable, booking.session.status)
         else:
             is_today = False
             can_go_live = False
@@ -726,7 +571,7 @@ def learner_activity_partial(request):
         if booking.status == 'completed' and not booking.feedback_submitted:
             action_buttons.append({
                 'type': 'link',
-                'url': reverse('sessions:submit_feedback', kwargs={'booking_id': booking.id}),
+                'url': reverse('sessions:feedback', kwargs={'booking_id': booking.id}),
                 'text': 'Submit Feedback',
                 'icon': 'star',
                 'border_class': 'border-transparent',
@@ -811,7 +656,7 @@ def learner_activity_partial(request):
         if session_req.status == 'pending':
             action_buttons.append({
                 'type': 'link',
-                'url': reverse('sessions:cancel_session_request', kwargs={'request_id': session_req.id}),
+                'url': reverse('sessions:cancel_request', kwargs={'request_id': session_req.id}),
                 'text': 'Cancel Request',
                 'icon': 'x',
                 'border_class': 'border-transparent',
@@ -888,13 +733,13 @@ def learner_activity(request):
     
     # Use the filtered bookings
     bookings = valid_bookings
-    logger.info(f"Found {len(bookings)} valid bookings for learner {request.user.id}")
+    logger.info("Found %s valid bookings for learner %s", len(bookings), request.user.id)
     
     # Get session requests, limiting to most recent 20
     session_requests = SessionRequest.objects.filter(
         learner=request.user
     ).select_related('mentor').order_by('-created_at')[:20]
-    logger.info(f"Found {len(session_requests)} session requests for learner {request.user.id}")
+    logger.info("Found %s session requests for learner %s", len(session_requests), request.user.id)
     
     # Create activities list for the combined view
     activities = []
@@ -989,7 +834,9 @@ def mentor_sessions(request):
     
     # Set up logging
     logger = logging.getLogger(__name__)
-    logger.info(f"Loading sessions for mentor: {request.user.username} (ID: {request.user.id})")
+    logger.debug("Loading sessions for mentor: %s (ID: %s)", request.user.username, request.user.id)
+    # Per-session details are only gathered when DEBUG logging is on
+    debug = logger.isEnabledFor(logging.DEBUG)
     
     # Get today's date and time
     now = timezone.now()
@@ -997,7 +844,7 @@ def mentor_sessions(request):
     
     # Get current tab from query parameter
     current_tab = request.GET.get('tab', 'today')
-    logger.info(f"Current sessions tab: {current_tab}")
+    logger.debug("Current sessions tab: %s", current_tab)
     
     try:
         # Fetch all sessions by this mentor with DISTINCT to eliminate duplicates
@@ -1018,7 +865,7 @@ def mentor_sessions(request):
                 valid_today_sessions.append(session)
         
         today_sessions = valid_today_sessions
-        logger.info(f"Found {len(today_sessions)} valid sessions for today")
+        logger.debug("Found %s valid sessions for today", len(today_sessions))
         
         # Get upcoming sessions
         upcoming_sessions = Session.objects.filter(
@@ -1026,35 +873,29 @@ def mentor_sessions(request):
             schedule__date__gt=today,
             status='scheduled'  # Use string literal
         ).distinct().order_by('schedule')
-        logger.info(f"Found {upcoming_sessions.count()} upcoming sessions")
+        if debug:
+            logger.debug("Found %s upcoming sessions", upcoming_sessions.count())
         
         # Get past sessions, but limit to most recent 20
         past_sessions = Session.objects.filter(
             models.Q(mentor=request.user, schedule__date__lt=today) |
             models.Q(mentor=request.user, status__in=['completed', 'cancelled'])  # Use string literals
         ).distinct().order_by('-schedule')[:20]  # Limit to most recent 20 past sessions
-        logger.info(f"Found {len(past_sessions)} past sessions (limited to 20)")
-        logger.info(f"Found {past_sessions.count()} past sessions")
+        if debug:
+            logger.debug("Found %s past sessions (limited to 20)", len(past_sessions))
     
-        # Add booking count and go-live status to each session
+        # Add go-live status to each session (confirmed_bookings_count is a column)
         for session_list in [today_sessions, upcoming_sessions, past_sessions]:
             for session in session_list:
-                # Get confirmed bookings count
-                session.confirmed_bookings_count = Booking.objects.filter(
-                    session=session, 
-                    status='confirmed'  # Use string literal
-                ).count()
-                
                 # We don't need to manually set can_go_live here as it's already a property in the Session model
                 # Just ensure the session is loaded with proper related fields
                 time_until_session = session.schedule - now
                 session_end_time = session.schedule + timezone.timedelta(minutes=session.duration)
                 
-                # Log the session's can_go_live property for debugging
-                logger.info(f"Session {session.id}: can_go_live={session.can_go_live}, is_near_start_time={session.is_near_start_time}")
-                
-                # Log session details for debugging
-                logger.info(f"Session {session.id}: Title={session.title}, Status={session.status}")
+                # Log the session's go-live state and details for debugging
+                if debug:
+                    logger.debug("Session %s: can_go_live=%s, is_near_start_time=%s", session.id, session.can_go_live, session.is_near_start_time)
+                    logger.debug("Session %s: Title=%s, Status=%s", session.id, session.title, session.status)
                 
                 # Check if session is currently live
                 session.is_live = (session.status == 'live')
@@ -1094,12 +935,12 @@ def mentor_sessions(request):
                     session.room_url = f"/sessions/room/{session.room_code}/"
                 
         # Debug data
-        if current_tab == 'today':
+        if debug and current_tab == 'today':
             for i, session in enumerate(today_sessions):
-                logger.info(f"Today session {i+1}: ID={session.id}, Title={session.title}, Status={session.status}, Can Go Live={session.can_go_live}")
+                logger.debug("Today session %s: ID=%s, Title=%s, Status=%s, Can Go Live=%s", i+1, session.id, session.title, session.status, session.can_go_live)
                 
     except Exception as e:
-        logger.error(f"Error loading sessions: {str(e)}", exc_info=True)
+        logger.error("Error loading sessions: %s", e, exc_info=True)
         messages.error(request, f"Error loading sessions. Please try again later.")
         today_sessions = []
         upcoming_sessions = []
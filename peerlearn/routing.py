@@ -3,6 +3,7 @@ ASGI routing configuration for peerlearn project.
 """
 
 import os
+import logging
 import django
 from django.urls import path, re_path, include
 from django.core.asgi import get_asgi_application
@@ -14,25 +15,23 @@ import importlib
 # Import websocket patterns from all apps
 from apps.learning_sessions.routing import websocket_urlpatterns as session_urlpatterns
 from apps.notifications.routing import websocket_urlpatterns as notification_urlpatterns
+from apps.notifications.outbox import OutboxLoopMiddleware
+
+logger = logging.getLogger(__name__)
 
 # Get Django ASGI application for HTTP handling
 django_asgi_app = get_asgi_application()
 
-# Print all imported WebSocket URL patterns for debugging
-print("Session WebSocket URL patterns:")
-for pattern in session_urlpatterns:
-    print(f" - {pattern.pattern}")
-
-print("Notification WebSocket URL patterns:")
-for pattern in notification_urlpatterns:
-    print(f" - {pattern.pattern}")
+# Log all imported WebSocket URL patterns for debugging
+logger.debug("Session WebSocket URL patterns: %s", [str(pattern.pattern) for pattern in session_urlpatterns])
+logger.debug("Notification WebSocket URL patterns: %s", [str(pattern.pattern) for pattern in notification_urlpatterns])
 
 # Define a 404 catch-all handler for debugging
 async def ws_404_handler(scope, receive, send):
     """
     Handle WebSocket 404 errors by logging the URL that wasn't matched.
     """
-    print(f"WebSocket 404 - Path not found: {scope['path']}")
+    logger.warning("WebSocket 404 - Path not found: %s", scope['path'])
     await send({
         "type": "websocket.close",
         "code": 4004,
@@ -49,7 +48,7 @@ except ImportError:
     try:
         from apps.learning_sessions.dashboard_consumer import DashboardConsumer
     except ImportError:
-        print("WARNING: DashboardConsumer could not be imported")
+        logger.warning("DashboardConsumer could not be imported")
         DashboardConsumer = None
 
 # Combine all websocket URL patterns
@@ -71,8 +70,9 @@ websocket_urlpatterns = [
     re_path(r'^ws/.*$', ws_404_handler),
 ]
 
-# Define the ASGI application with both HTTP and WebSocket support
-application = ProtocolTypeRouter({
+# Define the ASGI application with both HTTP and WebSocket support; the
+# outbox publishes in-memory channel layer events on the loop it serves
+application = OutboxLoopMiddleware(ProtocolTypeRouter({
     # Django's ASGI application for handling HTTP requests
     "http": django_asgi_app,
     
@@ -82,4 +82,4 @@ application = ProtocolTypeRouter({
             websocket_urlpatterns
         )
     ),
-})
\ No newline at end of file
+}))
\ No newline at end of file
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'crispy_forms',
     'crispy_bootstrap4',
+    'haystack',
     
     # Local apps
     'apps.core',
@@ -54,6 +55,8 @@ MIDDLEWARE = [
     'apps.users.middleware.LearnerRequiredMiddleware',
     # Dashboard detection middleware
     'apps.core.middleware.DashboardDetectionMiddleware',
+    # Per-request SQL and timing profiles (PROFILING_* settings)
+    'apps.core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'peerlearn.urls'
@@ -86,23 +89,42 @@ DATABASES = {
 }
 
 # Channel Layers Configuration
-# Use in-memory channel layer for simplicity and reliability during development
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
-}
+# CHANNEL_REDIS_URLS takes a comma-separated list of Redis URLs. Each URL is a
+# shard: channels_redis consistently hashes every group name (room_<md5>,
+# dashboard_<id>, notif_<id>) onto one of them, so room signaling works across
+# several daphne workers. With no broker configured we fall back to the
+# in-memory layer, which only delivers within a single process.
+# CHANNEL_LAYER_CAPACITY bounds each connection's queue of undelivered
+# events; group sends past it are dropped (see apps/core/ratelimit.py).
+CHANNEL_LAYER_CAPACITY = int(os.getenv('CHANNEL_LAYER_CAPACITY', os.getenv('CHANNEL_REDIS_CAPACITY', 1500)))
+
+CHANNEL_REDIS_URLS = [
+    url.strip()
+    for url in os.getenv('CHANNEL_REDIS_URLS', os.getenv('REDIS_URL', '')).split(',')
+    if url.strip()
+]
 
-# Redis channel layer configuration (commented out for now - enable when Redis is available)
-# CHANNEL_LAYERS = {
-#     'default': {
-#         'BACKEND': 'channels_redis.core.RedisChannelLayer',
-#         'CONFIG': {
-#             'hosts': [(os.getenv('REDIS_HOST', 'localhost'), 
-#                       int(os.getenv('REDIS_PORT', 6379)))],
-#         },
-#     },
-# }
+if CHANNEL_REDIS_URLS:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': CHANNEL_REDIS_URLS,
+                'prefix': os.getenv('CHANNEL_REDIS_PREFIX', 'peerlearn'),
+                'capacity': CHANNEL_LAYER_CAPACITY,
+                'expiry': 10,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+            'CONFIG': {
+                'capacity': CHANNEL_LAYER_CAPACITY,
+            },
+        },
+    }
 
 # Cache configuration
 CACHES = {
@@ -115,6 +137,20 @@ CACHES = {
     }
 }
 
+# Full-text search over sessions and users (see apps/core/search.py): a
+# Whoosh index on local disk, updated as sessions and users are saved once
+# their transaction commits. Build it with `manage.py rebuild_index`.
+HAYSTACK_CONNECTIONS = {
+    'default': {
+        'ENGINE': 'haystack.backends.whoosh_backend.WhooshEngine',
+        'PATH': os.getenv('SEARCH_INDEX_PATH', str(BASE_DIR / 'search_index')),
+    },
+}
+HAYSTACK_SIGNAL_PROCESSOR = 'apps.core.search.OnCommitSignalProcessor'
+
+# Search results ranked per query; matches beyond these are not listed
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -180,6 +216,151 @@ TURN_SERVER = os.getenv('TURN_SERVER', '')
 TURN_USERNAME = os.getenv('TURN_USERNAME', '')
 TURN_CREDENTIAL = os.getenv('TURN_CREDENTIAL', '')
 
+# Coalesce ICE candidate bursts per sender into one `ice_candidates` message
+# relayed after this many milliseconds (0 disables batching; 20-50 is typical)
+SESSION_ICE_BATCH_WINDOW_MS = int(os.getenv('SESSION_ICE_BATCH_WINDOW_MS', 0))
+
+# Room keep-alive: ping every interval seconds, close after this many missed pongs
+SESSION_HEARTBEAT_INTERVAL = int(os.getenv('SESSION_HEARTBEAT_INTERVAL', 30))
+SESSION_HEARTBEAT_MAX_MISSED = int(os.getenv('SESSION_HEARTBEAT_MAX_MISSED', 2))
+
+# Seconds a room's admission data (mentor, confirmed learners) is cached for reconnects
+SESSION_ADMISSION_CACHE_TTL = int(os.getenv('SESSION_ADMISSION_CACHE_TTL', 60))
+
+# Learner dashboard recommendations: seconds between full rebuilds of the
+# in-process upcoming session index, seconds a learner's top sessions are
+# cached for, and how many learners' top sessions are kept per process
+RECOMMENDATION_INDEX_TTL = int(os.getenv('RECOMMENDATION_INDEX_TTL', 300))
+RECOMMENDATION_CACHE_TTL = int(os.getenv('RECOMMENDATION_CACHE_TTL', 300))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', 10000))
+
+# Seconds before the in-process typeahead index of topics, domains and mentor
+# names is rebuilt even if no local write marked it stale
+AUTOCOMPLETE_TTL = int(os.getenv('AUTOCOMPLETE_TTL', 300))
+
+# Room presence is kept in process memory unless a Redis URL is available
+SESSION_PRESENCE_REDIS_URL = os.getenv(
+    'SESSION_PRESENCE_REDIS_URL',
+    CHANNEL_REDIS_URLS[0] if CHANNEL_REDIS_URLS else ''
+)
+
+# Room chat: messages kept in memory for replay, replay page size, and how
+# many unsaved messages trigger a background write to the chat log
+SESSION_CHAT_BUFFER_SIZE = int(os.getenv('SESSION_CHAT_BUFFER_SIZE', 500))
+SESSION_CHAT_PAGE_SIZE = int(os.getenv('SESSION_CHAT_PAGE_SIZE', 100))
+SESSION_CHAT_FLUSH_BATCH_SIZE = int(os.getenv('SESSION_CHAT_FLUSH_BATCH_SIZE', 200))
+
+# Chat sequence numbers are shared between workers through Redis when a URL
+# is available, and counted in process memory otherwise
+SESSION_CHAT_REDIS_URL = os.getenv(
+    'SESSION_CHAT_REDIS_URL',
+    CHANNEL_REDIS_URLS[0] if CHANNEL_REDIS_URLS else ''
+)
+
+# Per-connection WebSocket rate limits: (messages per second, burst) per
+# message type, with 'default' for types not listed
+WEBSOCKET_RATE_LIMITS = {
+    'room': {
+        'default': (10, 20),
+        'ice_candidate': (50, 100),
+        'chat_message': (5, 10),
+        'media_status': (5, 10),
+    },
+    'dashboard': {
+        'default': (5, 10),
+        'get_data': (0.5, 3),
+        'fetch_sessions': (1, 5),
+    },
+    'notifications': {
+        'default': (5, 10),
+        'fetch_unread': (2, 5),
+    },
+}
+
+# Outbound backpressure: seconds a low-priority event may wait in a
+# connection's channel before it is coalesced to the latest one per sender,
+# and how far behind its channel a connection may fall before it is closed
+WEBSOCKET_STALE_FRAMES = {
+    'media_status': 1.0,
+}
+WEBSOCKET_SLOW_CONSUMER_LAG = float(os.getenv('WEBSOCKET_SLOW_CONSUMER_LAG', 30))
+
+# Seconds a dashboard connection serves get_data from its materialized state
+# before rebuilding it (time-based fields such as countdowns go stale)
+DASHBOARD_STATE_MAX_AGE = int(os.getenv('DASHBOARD_STATE_MAX_AGE', 300))
+
+# Notification outbox: events published per batch, failed sends retried up to
+# MAX_ATTEMPTS times, seconds before an unacknowledged claim (or a failed
+# send) is retried, and seconds published events are kept. With
+# DISPATCH_ON_COMMIT the writing process publishes its own events without
+# holding up the request: in a task on the server loop with the in-memory
+# channel layer (required there, as dispatch_outbox refuses that layer), or
+# from a background thread with Redis. Without it only `manage.py dispatch_outbox`
+# does.
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv('NOTIFICATION_OUTBOX_BATCH_SIZE', 200))
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5))
+NOTIFICATION_OUTBOX_CLAIM_TIMEOUT = int(os.getenv('NOTIFICATION_OUTBOX_CLAIM_TIMEOUT', 30))
+NOTIFICATION_OUTBOX_RETENTION = int(os.getenv('NOTIFICATION_OUTBOX_RETENTION', 86400))
+NOTIFICATION_OUTBOX_DISPATCH_ON_COMMIT = os.getenv('NOTIFICATION_OUTBOX_DISPATCH_ON_COMMIT', 'True').lower() == 'true'
+
+# Unread notifications sent per page on connect and per `fetch_unread`
+NOTIFICATION_UNREAD_PAGE_SIZE = int(os.getenv('NOTIFICATION_UNREAD_PAGE_SIZE', 20))
+
+# Request profiling: the share of requests profiled at random (0 disables
+# sampling), the header that profiles one request (honoured for staff, or
+# anyone when DEBUG is on), how many profiles the admin panel summarises and
+# how often one SQL fingerprint must run in a request to count as N+1
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Profile')
+PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', 500))
+PROFILING_DUPLICATE_THRESHOLD = int(os.getenv('PROFILING_DUPLICATE_THRESHOLD', 3))
+
+# WebSocket metrics at /metrics/: the bearer token Prometheus scrapes with
+# (without one the page is staff-only unless DEBUG is on) and the most label
+# combinations kept per metric before new ones are folded into 'other'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_MAX_SERIES = int(os.getenv('METRICS_MAX_SERIES', 2000))
+
+# Logging: records are queued and written by a background thread so log I/O
+# never blocks the event loop, as one JSON object per line ('json') or as
+# plain text ('text'). LOG_QUEUE_SIZE records may wait to be written before
+# new ones are dropped.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'apps.core.log.JsonFormatter',
+        },
+        'text': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'apps.core.log.AsyncStreamHandler',
+            'formatter': LOG_FORMAT,
+            'queue_size': LOG_QUEUE_SIZE,
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # CSRF settings
 CSRF_TRUSTED_ORIGINS = [
     'https://peerlearn-app-2.onrender.com',
@@ -0,0 +1,72 @@
+/**
+ * Typeahead suggestions for PeerLearn
+ * Attaches a datalist to every input with a data-autocomplete attribute
+ * listing the suggestion kinds (topic, domain, mentor) and fills it from
+ * the autocomplete API as the user types. In comma-separated inputs only
+ * the text after the last comma is completed.
+ */
+
+// Use an IIFE to prevent variable name collisions
+(function() {
+if (typeof window.peerLearnAutocomplete !== 'undefined') {
+    return;
+}
+
+const AUTOCOMPLETE_URL = '/sessions/api/autocomplete/';
+const DEBOUNCE_MS = 80;
+
+function attach(input, index) {
+    const datalist = document.createElement('datalist');
+    datalist.id = `autocomplete-${index}`;
+    input.insertAdjacentElement('afterend', datalist);
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const value = input.value;
+            const comma = value.lastIndexOf(',');
+            const head = comma >= 0 ? value.slice(0, comma + 1) + ' ' : '';
+            const prefix = value.slice(comma + 1).trim();
+            if (!prefix) {
+                datalist.innerHTML = '';
+                return;
+            }
+
+            // Only the latest keystroke's answer matters
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            const params = new URLSearchParams({q: prefix, kinds: input.dataset.autocomplete});
+            try {
+                const response = await fetch(`${AUTOCOMPLETE_URL}?${params}`, {signal: controller.signal});
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                datalist.innerHTML = '';
+                for (const result of data.results) {
+                    const option = document.createElement('option');
+                    option.value = head + result.label;
+                    datalist.appendChild(option);
+                }
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    console.error('Autocomplete request failed:', error);
+                }
+            }
+        }, DEBOUNCE_MS);
+    });
+}
+
+window.peerLearnAutocomplete = {attach};
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-autocomplete]').forEach(attach);
+});
+})();
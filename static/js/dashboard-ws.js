@@ -34,6 +34,10 @@ let reconnectAttempts = 0;
 let reconnectInterval = 2000; // Start with 2s
 const maxReconnectAttempts = 5;
 
+// Last full dashboard received and its server version; update events carry
+// JSON Patch deltas against it
+let dashboardState = null;
+
 /**
  * Initialize dashboard WebSocket connection
  * @param {string} userId - User ID for WebSocket connection
@@ -163,21 +167,27 @@ function onDashboardSocketMessage(event) {
     const data = JSON.parse(event.data);
     console.log('Dashboard message received:', data.type);
     
+    // Apply dashboard deltas before the type-specific handling
+    if (data.patch && !applyDashboardPatch(data)) {
+        return;
+    }
+    
     // Handle different message types
     switch (data.type) {
         case 'session_update':
-            handleSessionUpdate(data);
+            if (!data.delta_only) handleSessionUpdate(data);
             break;
         case 'booking_update':
-            handleBookingUpdate(data);
+            if (!data.delta_only) handleBookingUpdate(data);
             break;
         case 'session_request_update':
-            handleSessionRequestUpdate(data);
+            if (!data.delta_only) handleSessionRequestUpdate(data);
             break;
         case 'notification_update':
             handleNotificationUpdate(data);
             break;
         case 'dashboard_data':
+            dashboardState = { version: data.version, data: data.data };
             handleDashboardData(data);
             break;
         case 'connection_established':
@@ -637,6 +647,73 @@ function handleNotificationUpdate(data) {
     }
 }
 
+/**
+ * Apply a JSON Patch delta from an update message to the stored dashboard.
+ * If the delta was computed against another version, ask the server for
+ * the full dashboard instead.
+ * @param {Object} data - Update message with base_version, version and patch
+ * @returns {boolean} Whether the message should still be handled
+ */
+function applyDashboardPatch(data) {
+    if (!dashboardState || dashboardState.version !== data.base_version) {
+        sendDashboardMessage({
+            type: 'get_data',
+            version: dashboardState ? dashboardState.version : null
+        });
+        return !data.delta_only;
+    }
+    
+    try {
+        data.patch.forEach(operation => applyPatchOperation(dashboardState.data, operation));
+    } catch (error) {
+        console.warn('Could not apply dashboard patch, requesting full data:', error);
+        sendDashboardMessage({ type: 'get_data', version: null });
+        return !data.delta_only;
+    }
+    dashboardState.version = data.version;
+    
+    handleDashboardData({
+        type: 'dashboard_data',
+        version: dashboardState.version,
+        data: dashboardState.data
+    });
+    return true;
+}
+
+/**
+ * Apply one JSON Patch (RFC 6902) add, replace or remove operation in place
+ * @param {Object} document - Document to modify
+ * @param {Object} operation - Patch operation
+ */
+function applyPatchOperation(document, operation) {
+    const keys = operation.path.split('/').slice(1).map(
+        key => key.replace(/~1/g, '/').replace(/~0/g, '~')
+    );
+    const last = keys.pop();
+    let target = document;
+    for (const key of keys) {
+        target = target[Array.isArray(target) ? parseInt(key, 10) : key];
+        if (target === undefined || target === null) {
+            throw new Error(`Invalid patch path ${operation.path}`);
+        }
+    }
+    
+    if (Array.isArray(target)) {
+        const index = last === '-' ? target.length : parseInt(last, 10);
+        if (operation.op === 'remove') {
+            target.splice(index, 1);
+        } else if (operation.op === 'add') {
+            target.splice(index, 0, operation.value);
+        } else {
+            target[index] = operation.value;
+        }
+    } else if (operation.op === 'remove') {
+        delete target[last];
+    } else {
+        target[last] = operation.value;
+    }
+}
+
 /**
  * Handle dashboard data message
  * @param {Object} data - Dashboard data
@@ -159,14 +159,16 @@
             
             // Try to get notifications from API if not already loaded
             if (this.notifications.length === 0) {
-                fetch(`/api/notifications/`)
+                // The endpoint answers unchanged polls with 304 (private,
+                // no-cache), so the browser revalidates its cached copy
+                fetch(`/users/api/notifications/`, { credentials: 'same-origin' })
                     .then(response => {
                         if (!response.ok) throw new Error('Failed to fetch notifications');
                         return response.json();
                     })
                     .then(data => {
                         console.debug('Loaded notifications from API:', data);
-                        this.updateNotifications(data.results || data);
+                        this.updateNotifications(data.notifications || data.results || data, data.unread_count);
                     })
                     .catch(error => {
                         console.error('Error loading notifications:', error);
@@ -203,12 +205,15 @@
         /**
          * Update notifications from dashboard data
          * @param {Array} notifications - List of notifications
+         * @param {number} [unreadCount] - Total unread count, if known
          */
-        updateNotifications(notifications) {
+        updateNotifications(notifications, unreadCount) {
             this.notifications = notifications || [];
             
-            // Count unread notifications
-            this.unreadCount = this.notifications.filter(n => !n.read).length;
+            // Use the server's unread count when given, as the list is only one page
+            this.unreadCount = typeof unreadCount === 'number'
+                ? unreadCount
+                : this.notifications.filter(n => !n.read).length;
             
             // Update the UI
             this.updateBadges();
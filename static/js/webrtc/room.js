@@ -20,6 +20,7 @@ function initWebRTCRoom(roomCode, userId, userName, userRole, iceServers) {
             otherParticipants: [], // Array of connected participants
             participantMediaStatus: {}, // Keep track of participants' media status
             chatMessages: [],
+            lastChatSequence: 0, // Highest chat sequence received, sent on (re)join
             newMessage: "",
             isAudioEnabled: true, // Flag to track audio state
             isVideoEnabled: true, // Flag to track video state
@@ -557,7 +558,11 @@ function initWebRTCRoom(roomCode, userId, userName, userRole, iceServers) {
                     type: 'join',
                     user_id: userId,
                     username: userName,
-                    role: userRole
+                    role: userRole,
+                    // Let the server relay coalesced ICE candidate batches
+                    capabilities: ['ice_candidates'],
+                    // Only the chat messages we missed are replayed
+                    last_chat_sequence: this.lastChatSequence
                 };
                 
                 console.log("Sending join message:", joinMessage);
@@ -613,6 +618,26 @@ function initWebRTCRoom(roomCode, userId, userName, userRole, iceServers) {
                             // Server-initiated heartbeat, just acknowledge receipt
                             break;
                             
+                        case 'room_roster':
+                            // Everyone already in the room, sent once when we join
+                            message.participants.forEach(participant => {
+                                if (participant.user_id === userId ||
+                                    this.otherParticipants.some(p => p.id === participant.user_id)) {
+                                    return;
+                                }
+                                this.otherParticipants.push({
+                                    id: participant.user_id,
+                                    username: participant.username,
+                                    audioEnabled: participant.audio_enabled,
+                                    videoEnabled: participant.video_enabled
+                                });
+                                this.participantMediaStatus[participant.user_id] = {
+                                    audioEnabled: participant.audio_enabled,
+                                    videoEnabled: participant.video_enabled
+                                };
+                            });
+                            break;
+                            
                         case 'user_join':
                             // New user joined
                             if (message.user_id !== userId) {
@@ -799,8 +824,38 @@ function initWebRTCRoom(roomCode, userId, userName, userRole, iceServers) {
                             }
                             break;
                             
+                        case 'ice_candidates':
+                            // Received a coalesced batch of ICE candidates
+                            if (message.target === userId && this.peerConnections[message.user_id]) {
+                                for (const candidate of message.candidates) {
+                                    await this.peerConnections[message.user_id].addIceCandidate(new RTCIceCandidate(candidate));
+                                }
+                            }
+                            break;
+                            
+                        case 'chat_history':
+                            // Chat messages we missed, one page at a time
+                            message.messages.forEach(chat => {
+                                if (chat.sequence <= this.lastChatSequence) return;
+                                this.lastChatSequence = chat.sequence;
+                                this.chatMessages.push({
+                                    sender: chat.username,
+                                    content: chat.content,
+                                    timestamp: new Date(chat.timestamp)
+                                });
+                            });
+                            if (message.has_more) {
+                                this.websocket.send(JSON.stringify({
+                                    type: 'chat_history',
+                                    after_sequence: this.lastChatSequence
+                                }));
+                            }
+                            break;
+                            
                         case 'chat_message':
                             // Received chat message
+                            if (message.sequence <= this.lastChatSequence) break;
+                            this.lastChatSequence = message.sequence;
                             this.chatMessages.push({
                                 sender: message.username,
                                 content: message.content,